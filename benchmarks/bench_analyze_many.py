@@ -0,0 +1,63 @@
+"""
+Benchmark : analyse d'un grand lot de résultats en échec.
+
+Compare une boucle d'appels `Debugger.analyze` (un dictionnaire et un
+enregistrement de log par résultat) à `Debugger.analyze_many`, qui consomme
+un générateur et ne produit qu'un résumé et un log par lot.
+
+Usage : python benchmarks/bench_analyze_many.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from loguru import logger
+
+from src.debugger import Debugger
+from src.execution_result import ExceptionInfo, ExecutionResult, FrameInfo
+
+N = 200_000
+ERRORS = [
+    ExceptionInfo('ZeroDivisionError', 'ZeroDivisionError', 'division by zero',
+                  ('ZeroDivisionError', 'ArithmeticError', 'Exception', 'BaseException'),
+                  (FrameInfo('<module>', 3),)),
+    ExceptionInfo('NameError', 'NameError', "name 'x' is not defined",
+                  ('NameError', 'Exception', 'BaseException'), (FrameInfo('<module>', 1),)),
+    ExceptionInfo('IndentationError', 'IndentationError', 'unexpected indent',
+                  ('IndentationError', 'SyntaxError', 'Exception', 'BaseException'),
+                  (FrameInfo('<module>', 2),)),
+]
+
+
+def results():
+    for i in range(N):
+        exception = ERRORS[i % len(ERRORS)]
+        yield ExecutionResult(error=f"{exception.type}: {exception.message}", exception=exception)
+
+
+def main():
+    # Sink de log sans E/S pour ne mesurer que le coût d'analyse et de formatage
+    logger.remove()
+    logger.add(lambda message: None, level="INFO")
+    debugger = Debugger()
+
+    start = time.perf_counter()
+    for result in results():
+        debugger.analyze(result)
+    one_by_one = time.perf_counter() - start
+
+    start = time.perf_counter()
+    debugger.analyze_many(results())
+    batched = time.perf_counter() - start
+
+    print(f"Analyse de {N} résultats en échec")
+    print(f"  analyze() par résultat : {one_by_one:.2f} s")
+    print(f"  analyze_many()         : {batched:.2f} s")
+    print(f"  accélération           : x{one_by_one / batched:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark : diffusion d'événements par le serveur de collaboration.
+
+`CLIENTS` clients, dans la même boucle que le serveur, s'abonnent chacun à
+`SESSIONS_PER_CLIENT` sessions (chaque session a deux abonnés), puis chaque
+client publie une correction dans chacune de ses sessions. Mesure le débit
+d'événements publiés et de messages reçus.
+
+Usage : python benchmarks/bench_collab_server.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from loguru import logger
+
+from src.collab_server import CollaborationClient, CollaborationServer
+
+CLIENTS = 1000
+SESSIONS_PER_CLIENT = 4
+
+
+def sessions_of(n):
+    # Client n shares each of its sessions with client n ^ 1
+    return [f"s{n // 2}-{k}" for k in range(SESSIONS_PER_CLIENT)]
+
+
+async def run():
+    async with CollaborationServer(port=0) as server:
+        clients = [await CollaborationClient(server.host, server.port).connect() for _ in range(CLIENTS)]
+        start = time.perf_counter()
+        await asyncio.gather(*(client.subscribe(session)
+                               for n, client in enumerate(clients) for session in sessions_of(n)))
+        subscribed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client.log_correction(session, f"user{n}", "NameError")
+                               for n, client in enumerate(clients) for session in sessions_of(n)))
+        expected = CLIENTS * SESSIONS_PER_CLIENT * 2
+        while sum(client.events.qsize() for client in clients) < expected:
+            await asyncio.sleep(0.01)
+        published = time.perf_counter() - start
+        stats = server.stats()
+        for client in clients:
+            await client.close()
+    return subscribed, published, stats
+
+
+def main():
+    logger.remove()
+    subscribed, published, stats = asyncio.run(run())
+    print(f"{stats['sessions']} sessions, {CLIENTS} connexions, {stats['subscriptions']} abonnements")
+    print(f"  abonnements          : {subscribed:.2f} s")
+    print(f"  {stats['events_published']} événements, {stats['messages_sent']} messages envoyés en {published:.2f} s "
+          f"({stats['events_published'] / published:,.0f} événements/s)")
+
+
+if __name__ == "__main__":
+    main()
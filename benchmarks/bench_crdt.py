@@ -0,0 +1,81 @@
+"""
+Benchmark : document de code partagé (CRDT).
+
+Trois collaborateurs modifient un fichier de 6 000 caractères : chacun tape
+et efface des caractères isolés à un endroit différent du code. Mesure le
+débit des modifications locales, la fusion des opérations des deux autres
+répliques, la taille des deltas et de l'état encodés, et le débit à travers
+`CollaborationManager` (événements `edit`, sans journal).
+
+Usage : python benchmarks/bench_crdt.py
+"""
+
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from loguru import logger
+
+from src.collaboration import CollaborationManager
+from src.crdt import Document
+
+EDITS = 5000
+SOURCE = "def f(x):\n    return x * 2\n" * 220
+
+
+def type_edits(doc, position, rnd):
+    ops = []
+    for _ in range(EDITS):
+        if rnd.random() < 0.2 and position > 0:
+            ops += doc.delete(position - 1, 1)
+            position -= 1
+        else:
+            ops += doc.insert(position, rnd.choice("abcxyz_ ()\n"))
+            position += 1
+    return ops
+
+
+def main():
+    logger.remove()
+    rnd = random.Random(0)
+    replicas = [Document(client) for client in (1, 2, 3)]
+    base = replicas[0].insert(0, SOURCE)
+    for doc in replicas[1:]:
+        doc.apply(base)
+
+    start = time.perf_counter()
+    streams = [type_edits(doc, len(SOURCE) * (n + 1) // 4, rnd) for n, doc in enumerate(replicas)]
+    local = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for n, doc in enumerate(replicas):
+        doc.apply(op for other, ops in enumerate(streams) if other != n for op in ops)
+    merge = time.perf_counter() - start
+    assert len({doc.text() for doc in replicas}) == 1
+
+    state = json.dumps(replicas[0].encode_delta())
+    behind = Document(4)
+    behind.apply(base)
+    delta = json.dumps(replicas[0].encode_delta(behind.state_vector()))
+
+    manager = CollaborationManager("bench")
+    manager.insert_code("Alice", 0, SOURCE)
+    start = time.perf_counter()
+    for i in range(EDITS):
+        manager.insert_code("Alice", 100 + i, "x")
+    managed = time.perf_counter() - start
+
+    total = EDITS * len(replicas)
+    print(f"Modifications locales : {total / local:,.0f} /s")
+    print(f"Fusion distante       : {2 * total / merge:,.0f} opérations/s")
+    print(f"Via CollaborationManager : {EDITS / managed:,.0f} modifications/s")
+    print(f"État encodé : {len(state):,} octets ({replicas[0].stats()['ops']} opérations, "
+          f"{len(replicas[0])} caractères) ; delta depuis le code initial : {len(delta):,} octets")
+
+
+if __name__ == "__main__":
+    main()
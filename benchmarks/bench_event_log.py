@@ -0,0 +1,63 @@
+"""
+Benchmark : redémarrage des sessions de collaboration depuis le journal.
+
+Écrit `SESSIONS` sessions de `EVENTS` événements chacune, puis mesure le
+temps de reconstruction de toutes les sessions dans un nouveau journal, avec
+instantanés périodiques (relecture de la fin du journal seulement) et sans
+(relecture complète).
+
+Usage : python benchmarks/bench_event_log.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from loguru import logger
+
+from src.collaboration import CollaborationManager
+from src.event_log import FileEventLog
+
+SESSIONS = 2000
+EVENTS = 300
+
+
+def populate(directory, snapshot_every):
+    log = FileEventLog(directory)
+    start = time.perf_counter()
+    for n in range(SESSIONS):
+        manager = CollaborationManager(f"session-{n}", log, snapshot_every=snapshot_every)
+        manager.register_collaborator("Alice")
+        for i in range(EVENTS - 2):
+            manager.log_correction("Alice", "NameError", f"correction {i}")
+    log.close()
+    return time.perf_counter() - start
+
+
+def restart(directory, snapshot_every):
+    log = FileEventLog(directory)
+    start = time.perf_counter()
+    managers = [CollaborationManager(session_id, log, snapshot_every=snapshot_every)
+                for session_id in log.sessions()]
+    elapsed = time.perf_counter() - start
+    log.close()
+    assert all(len(manager.correction_history) == EVENTS - 2 for manager in managers)
+    return elapsed
+
+
+def main():
+    logger.remove()
+    total = SESSIONS * EVENTS
+    for label, snapshot_every in (("sans instantané", 10 ** 9), ("instantané / 100", 100)):
+        with tempfile.TemporaryDirectory() as tmp:
+            write = populate(tmp, snapshot_every)
+            reload = restart(tmp, snapshot_every)
+        print(f"{label:18}: écriture {total / write:,.0f} événements/s, "
+              f"redémarrage de {SESSIONS} sessions en {reload:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark : coût du logging par appel à `Debugger.analyze`.
+
+Compare trois configurations : aucun sink (coût d'analyse seul), sink
+fichier JSON synchrone (ancien comportement, écriture dans le thread appelant)
+et sink fichier JSON mis en file (`configure_logging`, enqueue=True), où
+la sérialisation et l'écriture sont faites par le thread écrivain.
+
+Chaque échec est à une ligne différente, donc dans un nouveau groupe
+d'erreurs : toutes les analyses sont journalisées en ERROR (un doublon ne
+l'est qu'en DEBUG et ne mesurerait rien).
+
+Usage : python benchmarks/bench_logging.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.debugger import Debugger
+from src.logging_config import configure_logging, flush_logging, shutdown_logging
+
+N = 20_000
+RESULTS = [{'success': False, 'error': f"ZeroDivisionError: division by zero (line {i})"}
+           for i in range(1, N + 1)]
+
+
+def measure(results):
+    # Fresh debugger: no error group exists yet, every failure is logged
+    debugger = Debugger()
+    start = time.perf_counter()
+    for result in results:
+        debugger.analyze(result)
+    return (time.perf_counter() - start) / len(results) * 1e6
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.log')
+
+        configure_logging(path=None)
+        baseline = measure(RESULTS)
+        repeated = measure(RESULTS[:1] * N)
+
+        configure_logging(path=path, enqueue=False)
+        synchronous = measure(RESULTS)
+
+        configure_logging(path=path, enqueue=True)
+        queued = measure(RESULTS)
+        start = time.perf_counter()
+        flush_logging()
+        drain = time.perf_counter() - start
+        shutdown_logging()
+
+    print(f"Coût par analyse ({N} appels, sink fichier JSON)")
+    print(f"  sans sink          : {baseline:.1f} µs (même erreur répétée : {repeated:.1f} µs)")
+    print(f"  fichier synchrone  : {synchronous:.1f} µs (logging : {synchronous - baseline:.1f} µs)")
+    print(f"  fichier en file    : {queued:.1f} µs (logging : {queued - baseline:.1f} µs)")
+    print(f"  écriture restante après la boucle : {drain:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
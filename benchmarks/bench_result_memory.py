@@ -0,0 +1,62 @@
+"""
+Benchmark : mémoire occupée par un résultat conservé dans l'historique.
+
+Compare l'ancien format (dictionnaire résultat à 7 clés + horodatage
+`time.strftime` + dictionnaire d'historique avec préfixe du code) à
+l'enregistrement compact ExecutionResult.
+
+Usage : python benchmarks/bench_result_memory.py
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.execution_result import ExecutionResult
+
+N = 100_000
+CODE = "x = 1\n" * 40
+
+
+def legacy_entry(i):
+    result = {
+        'success': True,
+        'output': '',
+        'error': '',
+        'execution_time': i * 1e-6,
+        'memory_used': 0.0,
+        'traceback': '',
+        'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    return {'code': CODE[:100], 'result': result}
+
+
+def compact_entry(i):
+    result = ExecutionResult(success=True, execution_time=i * 1e-6)
+    result.code_preview = CODE[:100]
+    return result
+
+
+def measure(factory):
+    tracemalloc.start()
+    entries = [factory(i) for i in range(N)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del entries
+    return size / N
+
+
+def main():
+    before = measure(legacy_entry)
+    after = measure(compact_entry)
+    print(f"Mémoire par résultat conservé ({N} entrées)")
+    print(f"  avant (dicts + horodatage str) : {before:.0f} octets")
+    print(f"  après (ExecutionResult)        : {after:.0f} octets")
+    print(f"  réduction                      : {100 * (1 - after / before):.0f} %")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Micro-benchmark : coût par exécution de la préparation des builtins restreints.
+
+Compare l'ancienne approche (copie de tous les builtins + suppression des
+fonctions dangereuses à chaque appel) à la vue fournie par SandboxPolicy.
+
+Usage : python benchmarks/bench_sandbox_builtins.py
+"""
+
+import builtins
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.execution_engine import ExecutionEngine
+from src.sandbox import DEFAULT_DENY, DEFAULT_POLICY
+
+N = 200_000
+
+
+def legacy_builtins():
+    safe_builtins = vars(builtins).copy()
+    for func in DEFAULT_DENY:
+        safe_builtins.pop(func, None)
+    return safe_builtins
+
+
+def main():
+    before = timeit.timeit(legacy_builtins, number=N) / N * 1e6
+    after = timeit.timeit(DEFAULT_POLICY.builtins_view, number=N) / N * 1e6
+    print(f"Préparation des builtins (moyenne sur {N} appels)")
+    print(f"  avant (copie + pop)     : {before:.3f} µs/appel")
+    print(f"  après (SandboxPolicy)   : {after:.3f} µs/appel")
+    print(f"  gain                    : x{before / after:.1f}")
+
+    engine = ExecutionEngine()
+    runs = 2_000
+    per_run = timeit.timeit(lambda: engine.execute_code("pass"), number=runs) / runs * 1e6
+    print(f"\nexecute_code('pass') complet : {per_run:.1f} µs/appel")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark : registre de sessions réparties sur plusieurs processus.
+
+Ouvre `SESSIONS` sessions réparties par hachage cohérent, y enregistre des
+corrections depuis plusieurs threads, décharge les sessions inactives puis
+les recharge. Affiche le débit d'appels et la charge de chaque shard.
+
+Usage : python benchmarks/bench_session_registry.py [shards]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from loguru import logger
+
+from src.session_registry import SessionRegistry
+
+SESSIONS = 2000
+CALLS_PER_SESSION = 5
+
+
+def work(registry, session_ids):
+    for session_id in session_ids:
+        session = registry.session(session_id)
+        for i in range(CALLS_PER_SESSION):
+            session.log_correction(f"user{i}", "NameError", "variable définie")
+
+
+def main():
+    logger.remove()
+    shards = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count()
+    session_ids = [f"session-{n}" for n in range(SESSIONS)]
+    with tempfile.TemporaryDirectory() as tmp, SessionRegistry(shards=shards, directory=tmp) as registry:
+        threads = shards * 2
+        start = time.perf_counter()
+        with ThreadPoolExecutor(threads) as executor:
+            list(executor.map(lambda k: work(registry, session_ids[k::threads]), range(threads)))
+        elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        evicted = registry.evict_idle(max_idle=0)
+        evict_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for session_id in session_ids:
+            registry.session(session_id).get_session_summary(include_fixes=False)
+        reload_time = time.perf_counter() - start
+        stats = registry.stats()
+
+    print(f"{shards} shards, {SESSIONS} sessions")
+    print(f"  {SESSIONS * CALLS_PER_SESSION / elapsed:,.0f} corrections/s")
+    print(f"  {evicted} sessions déchargées en {evict_time:.2f} s, rechargées en {reload_time:.2f} s")
+    for shard in stats['shards']:
+        print(f"  shard {shard['shard']} : {shard['sessions']} sessions, {shard['calls']} appels, "
+              f"{shard['busy_time']:.2f} s occupé, {shard['rss_mb']:.0f} Mo")
+
+
+if __name__ == "__main__":
+    main()
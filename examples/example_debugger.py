@@ -14,6 +14,7 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src.debugger import Debugger
+from src.logging_config import configure_logging
 
 def example_1_analyze_syntax_error():
     """Exemple 1: Analyse d'une erreur de syntaxe"""
@@ -71,4 +72,5 @@ def main():
     print("\n Démonstrations de Ilies terminées!\n")
 
 if __name__ == "__main__":
+    configure_logging(console=True)
     main()
@@ -14,6 +14,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 from src.execution_engine import ExecutionEngine
 from src.debugger import Debugger
+from src.logging_config import configure_logging
 from src.collaboration import CollaborationManager
 
 def example_full_workflow():
@@ -61,4 +62,5 @@ def main():
     print("\n✅ Démonstration d'Abderrahman terminée!\n")
 
 if __name__ == "__main__":
+    configure_logging(console=True)
     main()
@@ -0,0 +1,135 @@
+"""
+Module: Capture des sorties
+Description: Capture stdout/stderr du code utilisateur avec une limite en
+             octets et une diffusion optionnelle des morceaux en temps réel.
+             La redirection est propre à chaque thread, ce qui permet
+             plusieurs exécutions in-process simultanées.
+"""
+
+import io
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+# Signature des callbacks de diffusion : (nom du flux, texte)
+OutputCallback = Callable[[str, str], None]
+
+TRUNCATION_MARKER = "\n[... sortie tronquée ...]\n"
+
+
+class OutputCapture(io.TextIOBase):
+    """
+    Tampon texte borné à `max_bytes` octets (UTF-8).
+
+    Au-delà de la limite, la sortie est ignorée et `truncated` passe à True.
+    Si `on_chunk` est fourni, chaque écriture conservée lui est transmise
+    immédiatement.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None, on_chunk: Optional[OutputCallback] = None,
+                 name: str = 'stdout'):
+        self.max_bytes = max_bytes
+        self.on_chunk = on_chunk
+        self.name = name
+        self.truncated = False
+        self._parts = []
+        self._size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        if not isinstance(text, str):
+            raise TypeError(f"write() argument must be str, not {type(text).__name__}")
+        written = len(text)
+        if self.truncated or not text:
+            return written
+        size = len(text) if text.isascii() else len(text.encode('utf-8', 'surrogatepass'))
+        if self.max_bytes is not None and self._size + size > self.max_bytes:
+            room = self.max_bytes - self._size
+            text = text.encode('utf-8', 'surrogatepass')[:room].decode('utf-8', 'ignore')
+            size = room
+            self.truncated = True
+        if text:
+            self._parts.append(text)
+            self._size += size
+            if self.on_chunk is not None:
+                self.on_chunk(self.name, text)
+        return written
+
+    def getvalue(self) -> str:
+        value = ''.join(self._parts)
+        return value + TRUNCATION_MARKER if self.truncated else value
+
+
+class _ThreadRouter(io.TextIOBase):
+    """Remplaçant de sys.stdout/sys.stderr qui aiguille chaque thread vers sa capture."""
+
+    def __init__(self, name: str, fallback):
+        self._name = name
+        self._fallback = fallback
+
+    def _target(self):
+        return getattr(_local, self._name, None) or self._fallback
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        return self._target().write(text)
+
+    def flush(self) -> None:
+        target = self._target()
+        if hasattr(target, 'flush'):
+            target.flush()
+
+
+_local = threading.local()
+_router_lock = threading.Lock()
+_active_captures = 0
+_originals = {}
+# Routers are created once and never released: on 3.11 `print` only borrows
+# its reference to sys.stdout, so a router freed by another thread restoring
+# the original stream mid-print would crash the printing thread.
+_routers = {}
+
+
+def _install_routers():
+    for name in ('stdout', 'stderr'):
+        current = getattr(sys, name)
+        _originals[name] = current._fallback if isinstance(current, _ThreadRouter) else current
+        router = _routers.setdefault(name, _ThreadRouter(name, _originals[name]))
+        router._fallback = _originals[name]
+        setattr(sys, name, router)
+
+
+def _restore_routers():
+    for name, original in _originals.items():
+        if isinstance(getattr(sys, name), _ThreadRouter):
+            setattr(sys, name, original)
+    _originals.clear()
+
+
+@contextmanager
+def capture_output(stdout: OutputCapture, stderr: OutputCapture) -> Iterator[None]:
+    """
+    Redirige stdout/stderr du thread courant vers les captures fournies.
+
+    Les routeurs ne sont installés sur `sys` que tant qu'au moins une capture
+    est active ; les autres threads continuent d'écrire sur les flux d'origine.
+    """
+    global _active_captures
+    with _router_lock:
+        if _active_captures == 0:
+            _install_routers()
+        _active_captures += 1
+    _local.stdout, _local.stderr = stdout, stderr
+    try:
+        yield
+    finally:
+        _local.stdout = _local.stderr = None
+        with _router_lock:
+            _active_captures -= 1
+            if _active_captures == 0:
+                _restore_routers()
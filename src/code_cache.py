@@ -0,0 +1,128 @@
+"""
+Module: Cache de code compilé
+Description: Évite de recompiler les soumissions identiques. Les objets code
+             (et les SyntaxError) sont mis en cache par empreinte de contenu
+             et version de Python, en mémoire (LRU) et optionnellement sur
+             disque, à la manière de __pycache__.
+"""
+
+import builtins
+import marshal
+import os
+import sys
+import tempfile
+from types import CodeType
+from typing import Any, Dict, Optional, Tuple
+
+from src.utils import LRUCache, code_hash
+
+# Les objets code ne sont valides que pour un interpréteur donné.
+CACHE_TAG = sys.implementation.cache_tag or f"python-{sys.version_info[0]}{sys.version_info[1]}"
+FILENAME = '<string>'
+
+
+class _Entry:
+    """Résultat d'une compilation : objet code ou SyntaxError à relever."""
+    __slots__ = ('code', 'error', 'blob')
+
+    def __init__(self, code: Optional[CodeType] = None, error: Optional[Tuple[str, tuple]] = None):
+        self.code = code
+        self.error = error
+        self.blob = None
+
+    def unwrap(self) -> CodeType:
+        if self.error is not None:
+            name, args = self.error
+            raise getattr(builtins, name, SyntaxError)(*args)
+        return self.code
+
+
+class CodeCache:
+    """
+    Cache LRU `empreinte -> objet code` partagé par `execute_code` et
+    `validate_code`.
+
+    Les erreurs de syntaxe sont aussi mises en cache : `compile` relève alors
+    une nouvelle SyntaxError identique à celle d'origine.
+    """
+
+    def __init__(self, maxsize: int = 1024, cache_dir: Optional[str] = None):
+        self._entries = LRUCache(maxsize)
+        self.cache_dir = os.path.join(cache_dir, CACHE_TAG) if cache_dir else None
+        self.disk_hits = 0
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def compile(self, code: str) -> CodeType:
+        """Équivalent caché de `compile(code, '<string>', 'exec')`."""
+        return self._entry(code).unwrap()
+
+    def dumps(self, code: str) -> Optional[bytes]:
+        """Objet code sérialisé (marshal), ou None si le code est invalide."""
+        entry = self._entry(code)
+        if entry.error is not None:
+            return None
+        if entry.blob is None:
+            entry.blob = marshal.dumps(entry.code)
+        return entry.blob
+
+    def _entry(self, code: str) -> _Entry:
+        key = (code_hash(code), CACHE_TAG)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._load(key[0])
+            if entry is None:
+                entry = _compile_entry(code)
+                self._store(key[0], entry)
+            self._entries.put(key, entry)
+        return entry
+
+    # --- Persistance disque ---
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, digest + '.bin')
+
+    def _load(self, digest: str) -> Optional[_Entry]:
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._path(digest), 'rb') as f:
+                kind, payload = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        self.disk_hits += 1
+        return _Entry(code=payload) if kind == 'code' else _Entry(error=payload)
+
+    def _store(self, digest: str, entry: _Entry) -> None:
+        if not self.cache_dir:
+            return
+        record = ('code', entry.code) if entry.error is None else ('error', entry.error)
+        try:
+            fd, tmp = tempfile.mkstemp(dir=self.cache_dir)
+            with os.fdopen(fd, 'wb') as f:
+                marshal.dump(record, f)
+            os.replace(tmp, self._path(digest))
+        except (OSError, ValueError):
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        hits, misses = self._entries.hits, self._entries.misses
+        lookups = hits + misses
+        return {
+            'size': len(self._entries),
+            'maxsize': self._entries.maxsize,
+            'hits': hits,
+            'misses': misses,
+            'disk_hits': self.disk_hits,
+            'hit_rate': (hits / lookups) * 100 if lookups else 0.0,
+        }
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+def _compile_entry(code: str) -> _Entry:
+    try:
+        return _Entry(code=compile(code, FILENAME, 'exec'))
+    except SyntaxError as e:
+        return _Entry(error=(type(e).__name__, e.args))
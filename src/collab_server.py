@@ -0,0 +1,475 @@
+"""
+Module: Serveur de collaboration
+Description: Transport temps réel autour de `CollaborationManager`. Un
+             serveur asyncio TCP échange des messages JSON, un par ligne, et
+             diffuse chaque événement d'une session à tous ses abonnés. Les
+             envois à un abonné sont regroupés par lots ; un abonné trop lent
+             (file pleine) est déconnecté sans ralentir les autres. Les accès
+             aux sessions (journal sur disque, instantanés, chargement) sont
+             exécutés hors de la boucle, dans le pool de threads par défaut.
+"""
+
+import asyncio
+import functools
+import itertools
+import json
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from loguru import logger
+
+from src.collaboration import PAGE_SIZE, SNAPSHOT_EVERY, CollaborationManager
+from src.crdt import Op
+from src.event_log import EventLog
+
+# Messages en attente au-delà desquels un abonné est considéré comme trop lent
+MAX_QUEUE = 10_000
+# Taille maximale d'une ligne reçue (octets)
+MAX_LINE = 65536
+# Délai accordé à une connexion pour vider sa file à la fermeture (secondes)
+CLOSE_TIMEOUT = 1.0
+# Requêtes traitées par le gestionnaire de la session, hors de la boucle
+SESSION_OPS = frozenset({"join", "leave", "correction", "edit", "sync", "summary", "fixes"})
+
+
+class CollaborationError(Exception):
+    """Réponse d'erreur du serveur à une requête du client."""
+
+
+def encode(message: Dict[str, Any]) -> bytes:
+    return json.dumps(message, ensure_ascii=False).encode('utf-8') + b'\n'
+
+
+class _Connection:
+    """Connexion cliente : file d'envoi bornée vidée par lots par une tâche dédiée."""
+
+    def __init__(self, writer: asyncio.StreamWriter, max_queue: int):
+        self.writer = writer
+        self.max_queue = max_queue
+        self.subscriptions: Set[str] = set()
+        self.closed = False
+        self.overflowed = False
+        # Live events held back while a catch-up replay is being read
+        self.held: Dict[str, List[Tuple[int, bytes]]] = {}
+        self._pending: deque = deque()
+        self._wakeup = asyncio.Event()
+        self._writable = asyncio.Event()
+        self._writable.set()
+        self._task = asyncio.ensure_future(self._write_loop())
+
+    def send(self, data: bytes) -> bool:
+        """Met `data` en file ; False si la connexion est fermée ou saturée."""
+        if self.closed:
+            return False
+        if len(self._pending) >= self.max_queue:
+            self.overflowed = True
+            self.abort()
+            return False
+        self._pending.append(data)
+        self._wakeup.set()
+        if len(self._pending) >= self.max_queue // 2:
+            self._writable.clear()
+        return True
+
+    async def wait_writable(self) -> None:
+        """Attend que la file d'envoi soit redescendue sous la moitié de sa capacité."""
+        await self._writable.wait()
+
+    async def _write_loop(self) -> None:
+        try:
+            while True:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                if self._pending:
+                    # Everything queued since the last write goes out in one call
+                    batch = b''.join(self._pending)
+                    self._pending.clear()
+                    self._writable.set()
+                    self.writer.write(batch)
+                    await self.writer.drain()
+                if self.closed:
+                    break
+        except (ConnectionError, asyncio.CancelledError):
+            self.closed = True
+            self._writable.set()
+
+    def abort(self) -> None:
+        self.closed = True
+        self._pending.clear()
+        self._wakeup.set()
+        self._writable.set()
+        self.writer.transport.abort()
+
+    async def close(self) -> None:
+        self.closed = True
+        self._wakeup.set()
+        self._writable.set()
+        try:
+            await asyncio.wait_for(self._task, CLOSE_TIMEOUT)
+        except asyncio.TimeoutError:
+            # The peer stopped reading: do not wait for the queue to drain
+            self.writer.transport.abort()
+            return
+        self.writer.close()
+
+
+class CollaborationServer:
+    """
+    Serveur de sessions de collaboration (une boucle d'événements, de
+    nombreuses sessions et connexions).
+
+    Requêtes du client : `{"op": ..., "session": ..., "id": ...}` avec `op`
+    parmi `subscribe` (champs optionnels `user` et `after_seq`),
+    `unsubscribe`, `join`, `leave` (`user`), `correction` (`user`,
+    `error_type`, `description`), `edit` (`user`, `ops` : opérations du
+    document partagé), `sync` (`state_vector` : opérations manquantes),
+    `summary` (résumé sans l'historique) et `fixes` (`cursor`, `limit` :
+    corrections depuis un curseur). Chaque requête reçoit `{"type": "ack"}` ou
+    `{"type": "error"}` avec le même `id` ; les abonnés d'une session
+    reçoivent `{"type": "event", "session": ..., "event": {...}}`.
+
+    Avec un `event_log`, les sessions sont persistées et un abonné qui se
+    reconnecte avec `after_seq` reçoit les événements manqués.
+
+    Les requêtes d'une connexion sont traitées dans l'ordre ; sa lecture est
+    suspendue tant que sa file d'envoi est à moitié pleine, de sorte qu'un
+    client qui ne lit pas ses réponses est freiné au lieu d'être déconnecté.
+    """
+
+    def __init__(self, event_log: Optional[EventLog] = None, host: str = '127.0.0.1',
+                 port: int = 8765, max_queue: int = MAX_QUEUE,
+                 snapshot_every: int = SNAPSHOT_EVERY):
+        self.event_log = event_log
+        self.host = host
+        self.port = port
+        self.max_queue = max_queue
+        self.snapshot_every = snapshot_every
+        self.managers: Dict[str, CollaborationManager] = {}
+        self._managers_lock = threading.Lock()
+        self._listeners: Dict[str, Callable[[Dict[str, Any]], None]] = {}
+        self._subscribers: Dict[str, Set[_Connection]] = {}
+        self._connections: Set[_Connection] = set()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self.events_published = 0
+        self.messages_sent = 0
+        self.slow_consumers = 0
+
+    # --- Cycle de vie ---
+
+    async def start(self) -> Tuple[str, int]:
+        """Démarre l'écoute ; retourne l'adresse effective (utile avec `port=0`)."""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, limit=MAX_LINE)
+        self.host, self.port = self._server.sockets[0].getsockname()[:2]
+        logger.info(f"Serveur de collaboration à l'écoute sur {self.host}:{self.port}")
+        return self.host, self.port
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        await self._server.serve_forever()
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for connection in list(self._connections):
+            await connection.close()
+        for session_id, listener in self._listeners.items():
+            self.managers[session_id].remove_listener(listener)
+        self._listeners.clear()
+        if self.event_log is not None:
+            await self._blocking(self.event_log.flush)
+
+    async def __aenter__(self) -> "CollaborationServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    # --- Sessions ---
+
+    def manager(self, session_id: str) -> CollaborationManager:
+        """Gestionnaire de la session, chargé (ou créé) au premier accès."""
+        manager = self.managers.get(session_id)
+        if manager is None:
+            with self._managers_lock:
+                manager = self.managers.get(session_id)
+                if manager is None:
+                    manager = CollaborationManager(session_id, self.event_log, self.snapshot_every)
+                    listener = self._listeners[session_id] = functools.partial(self._on_event, session_id)
+                    manager.add_listener(listener)
+                    self.managers[session_id] = manager
+        return manager
+
+    async def _blocking(self, function: Callable[..., Any], *args: Any) -> Any:
+        """Exécute `function` (accès disque, verrous de session) hors de la boucle."""
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(function, *args))
+
+    def _on_event(self, session_id: str, event: Dict[str, Any]) -> None:
+        if threading.get_ident() == self._loop_thread:
+            self._publish(session_id, event)
+        elif self._loop is not None:
+            # Manager used from another thread: hand the event to the loop
+            self._loop.call_soon_threadsafe(self._publish, session_id, event)
+
+    def _publish(self, session_id: str, event: Dict[str, Any]) -> None:
+        self.events_published += 1
+        subscribers = self._subscribers.get(session_id)
+        if not subscribers:
+            return
+        # Serialized once for all subscribers
+        data = encode({"type": "event", "session": session_id, "event": event})
+        for connection in list(subscribers):
+            held = connection.held.get(session_id)
+            if held is not None:
+                held.append((event["seq"], data))
+            else:
+                self._send(connection, data)
+
+    def _send(self, connection: _Connection, data: bytes) -> None:
+        if connection.send(data):
+            self.messages_sent += 1
+        elif connection.overflowed and connection in self._connections:
+            self.slow_consumers += 1
+            logger.warning(f"Abonné trop lent déconnecté ({connection.max_queue} messages en attente)")
+            self._drop(connection)
+
+    def _drop(self, connection: _Connection) -> None:
+        self._connections.discard(connection)
+        for session_id in connection.subscriptions:
+            subscribers = self._subscribers.get(session_id)
+            if subscribers is not None:
+                subscribers.discard(connection)
+                if not subscribers:
+                    del self._subscribers[session_id]
+        connection.subscriptions.clear()
+
+    # --- Protocole ---
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        connection = _Connection(writer, self.max_queue)
+        self._connections.add(connection)
+        try:
+            while not connection.closed:
+                await connection.wait_writable()
+                if connection.closed:
+                    break
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    self._send(connection, encode({"type": "error", "message": "Message too long"}))
+                    break
+                if not line:
+                    break
+                self._send(connection, encode(await self._dispatch(connection, line)))
+        except ConnectionError:
+            pass
+        finally:
+            self._drop(connection)
+            await connection.close()
+
+    async def _dispatch(self, connection: _Connection, line: bytes) -> Dict[str, Any]:
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            op, session_id = request["op"], request["session"]
+            reply = {"type": "ack", "id": request_id, "session": session_id}
+            if op == "subscribe":
+                reply.update(await self._subscribe(connection, session_id, request))
+            elif op == "unsubscribe":
+                self._subscribers.get(session_id, set()).discard(connection)
+                connection.subscriptions.discard(session_id)
+                manager = self.managers.get(session_id)
+                reply["seq"] = manager.last_seq if manager is not None else 0
+            elif op in SESSION_OPS:
+                reply.update(await self._blocking(self._execute, op, session_id, request))
+            else:
+                raise ValueError(f"Unknown op '{op}'")
+            return reply
+        except Exception as e:
+            if not isinstance(e, (ValueError, KeyError, TypeError, AttributeError)):
+                logger.warning(f"Requête en échec ({type(e).__name__}: {e}), connexion conservée")
+            return {"type": "error", "id": request_id, "message": f"{type(e).__name__}: {e}"}
+
+    def _execute(self, op: str, session_id: str, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Traite une requête de session ; exécuté hors de la boucle."""
+        manager = self.manager(session_id)
+        reply: Dict[str, Any] = {}
+        if op == "join":
+            manager.register_collaborator(request["user"])
+        elif op == "leave":
+            manager.remove_collaborator(request["user"])
+        elif op == "correction":
+            reply["entry"] = manager.log_correction(
+                request["user"], request["error_type"], request.get("description", ""))
+        elif op == "edit":
+            manager.edit_code(request["user"], request["ops"])
+        elif op == "sync":
+            reply["ops"], reply["state_vector"] = manager.sync_code(request.get("state_vector"))
+        elif op == "summary":
+            reply["summary"] = manager.get_session_summary(include_fixes=False)
+        elif op == "fixes":
+            reply.update(manager.get_fixes_since(int(request.get("cursor", 0)),
+                                                 int(request.get("limit", PAGE_SIZE))))
+        reply["seq"] = manager.last_seq
+        return reply
+
+    async def _subscribe(self, connection: _Connection, session_id: str,
+                         request: Dict[str, Any]) -> Dict[str, Any]:
+        after_seq = request.get("after_seq")
+        after_seq = int(after_seq) if after_seq is not None else None
+        manager = await self._blocking(self.manager, session_id)
+        self._subscribers.setdefault(session_id, set()).add(connection)
+        connection.subscriptions.add(session_id)
+        if after_seq is not None and self.event_log is not None:
+            # Events published while the log is read are held, then sent
+            # after the replay unless it already contained them
+            held = connection.held[session_id] = []
+            try:
+                missed = await self._blocking(self._missed_events, manager, after_seq)
+            finally:
+                del connection.held[session_id]
+            last_seq = after_seq
+            for event in missed:
+                self._send(connection, encode({"type": "event", "session": session_id, "event": event}))
+                last_seq = event["seq"]
+            for seq, data in held:
+                if seq > last_seq:
+                    self._send(connection, data)
+        if request.get("user"):
+            members = await self._blocking(manager.register_collaborator, request["user"])
+        else:
+            members = await self._blocking(manager.get_collaborators)
+        return {"collaborators": sorted(members), "seq": manager.last_seq}
+
+    def _missed_events(self, manager: CollaborationManager, after_seq: int) -> List[Dict[str, Any]]:
+        last_seq = manager.last_seq
+        missed = []
+        for event in self.event_log.replay(manager.session_id, after_seq):
+            if event["seq"] > last_seq:
+                break
+            missed.append(event)
+        return missed
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'sessions': len(self.managers),
+            'connections': len(self._connections),
+            'subscriptions': sum(len(subscribers) for subscribers in self._subscribers.values()),
+            'events_published': self.events_published,
+            'messages_sent': self.messages_sent,
+            'slow_consumers': self.slow_consumers,
+        }
+
+
+class CollaborationClient:
+    """
+    Client asyncio du serveur de collaboration.
+
+    Les requêtes attendent leur accusé de réception ; les événements des
+    sessions abonnées s'obtiennent avec `next_event()`.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8765):
+        self.host = host
+        self.port = port
+        self.events: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def connect(self) -> "CollaborationClient":
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port, limit=MAX_LINE)
+        self._task = asyncio.ensure_future(self._read_loop())
+        return self
+
+    async def _read_loop(self) -> None:
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                if message["type"] == "event":
+                    self.events.put_nowait(message)
+                    continue
+                future = self._pending.pop(message.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result(message)
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Connection to collaboration server lost"))
+            self._pending.clear()
+
+    async def request(self, op: str, session: str, **fields: Any) -> Dict[str, Any]:
+        request_id = next(self._ids)
+        future = self._pending[request_id] = asyncio.get_running_loop().create_future()
+        self._writer.write(encode({"op": op, "session": session, "id": request_id, **fields}))
+        await self._writer.drain()
+        reply = await future
+        if reply["type"] == "error":
+            raise CollaborationError(reply["message"])
+        return reply
+
+    async def subscribe(self, session: str, user: Optional[str] = None,
+                        after_seq: Optional[int] = None) -> Dict[str, Any]:
+        return await self.request("subscribe", session, user=user, after_seq=after_seq)
+
+    async def unsubscribe(self, session: str) -> Dict[str, Any]:
+        return await self.request("unsubscribe", session)
+
+    async def join(self, session: str, user: str) -> Dict[str, Any]:
+        return await self.request("join", session, user=user)
+
+    async def leave(self, session: str, user: str) -> Dict[str, Any]:
+        return await self.request("leave", session, user=user)
+
+    async def log_correction(self, session: str, user: str, error_type: str,
+                             description: str = "") -> Dict[str, Any]:
+        return await self.request("correction", session, user=user, error_type=error_type,
+                                  description=description)
+
+    async def edit(self, session: str, user: str, ops: List[Op]) -> Dict[str, Any]:
+        return await self.request("edit", session, user=user, ops=ops)
+
+    async def sync(self, session: str, state_vector: Optional[Dict[int, int]] = None) -> List[Op]:
+        """Opérations du document partagé absentes d'une réplique de vecteur `state_vector`."""
+        return (await self.request("sync", session, state_vector=state_vector))["ops"]
+
+    async def summary(self, session: str) -> Dict[str, Any]:
+        return (await self.request("summary", session))["summary"]
+
+    async def fixes_since(self, session: str, cursor: int = 0, limit: int = PAGE_SIZE) -> Dict[str, Any]:
+        reply = await self.request("fixes", session, cursor=cursor, limit=limit)
+        return {key: reply[key] for key in ("fixes", "cursor", "has_more")}
+
+    async def next_event(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        return await asyncio.wait_for(self.events.get(), timeout)
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except ConnectionError:
+                pass
+        if self._task is not None:
+            await self._task
+
+    async def __aenter__(self) -> "CollaborationClient":
+        return await self.connect()
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
@@ -1,22 +1,205 @@
 import datetime
+import threading
+import uuid
+from collections import Counter
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
 from loguru import logger
 
+from src.crdt import Document, Op
+from src.event_log import EventLog
+
+if TYPE_CHECKING:
+    from src.execution_engine import ExecutionEngine
+    from src.execution_result import ExecutionResult
+
+# Nombre d'événements entre deux instantanés de l'état d'une session
+SNAPSHOT_EVERY = 500
+
+# Nombre de corrections retournées par page par défaut
+PAGE_SIZE = 100
+
+EventListener = Callable[[Dict[str, Any]], None]
+
+# Champs texte obligatoires de chaque type d'événement
+EVENT_FIELDS = {
+    "start": (),
+    "join": ("user",),
+    "leave": ("user",),
+    "correction": ("timestamp", "user", "error_fixed", "description"),
+    "edit": ("user",),
+}
+
+
 class CollaborationManager:
     """
     Module 3 : Gestion de la collaboration temps réel.
     Permet de suivre les contributeurs, les sessions de correction et l'historique partagé.
+
+    Chaque action (arrivée, départ, correction) est un événement. Avec un
+    `event_log`, les événements sont ajoutés au journal de la session
+    `session_id` et l'état est reconstruit au démarrage à partir du dernier
+    instantané et des événements qui le suivent ; sans journal, la session
+    reste en mémoire. Les méthodes peuvent être appelées depuis plusieurs
+    threads ; les écouteurs (`add_listener`) reçoivent chaque événement
+    appliqué, y compris ceux écrits par un autre processus.
+
+    Les compteurs par membre et par type d'erreur sont tenus à jour à chaque
+    correction : un résumé sans la liste des corrections ne dépend pas de la
+    longueur de la session, et `get_fixes_since` pagine l'historique.
+
+    Le code étudié est un document partagé (`document`, CRDT) que les
+    membres modifient en même temps ; chaque modification est un événement
+    `edit` portant les opérations du document.
     """
-    def __init__(self):
+    def __init__(self, session_id: Optional[str] = None, event_log: Optional[EventLog] = None,
+                 snapshot_every: int = SNAPSHOT_EVERY):
+        self.session_id = session_id or uuid.uuid4().hex
+        self.event_log = event_log
+        self.snapshot_every = snapshot_every
         self.session_start = datetime.datetime.now()
         self.collaborators = set()
         self.correction_history = []
-        logger.info(f"Session de collaboration démarrée à {self.session_start}")
+        self.fixes_by_user = Counter()
+        self.fixes_by_error = Counter()
+        self.document = Document()
+        self.last_seq = 0
+        self._since_snapshot = 0
+        self._listeners = []
+        self._lock = threading.RLock()
+        if event_log is not None:
+            self._load()
+        if self.last_seq == 0:
+            self._record("start", {})
+            logger.info(f"Session de collaboration démarrée à {self.session_start}")
+        else:
+            logger.info(f"Session de collaboration {self.session_id} reprise ({self.last_seq} événements)")
+
+    # --- Journal d'événements ---
+
+    def _check_event(self, kind: str, data: Dict[str, Any]) -> None:
+        """Refuse un événement mal formé avant qu'il n'atteigne le journal."""
+        fields = EVENT_FIELDS.get(kind)
+        if fields is None:
+            raise ValueError(f"Unknown event type '{kind}'")
+        if not isinstance(data, dict):
+            raise ValueError(f"Invalid '{kind}' event data: expected a dict")
+        for field in fields:
+            if not isinstance(data.get(field), str):
+                raise ValueError(f"Invalid '{kind}' event: '{field}' must be a string")
+        if kind == "edit":
+            self.document.check(data.get("ops"))
+
+    def _record(self, kind: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            self._check_event(kind, data)
+            if self.event_log is None:
+                event = {"seq": self.last_seq + 1, "type": kind,
+                         "ts": datetime.datetime.now().timestamp(), "data": data}
+            else:
+                event = self.event_log.append(self.session_id, kind, data)
+            if event["seq"] == self.last_seq + 1:
+                self._apply(event)
+            else:
+                # Another writer shares this session: apply its events first
+                self.refresh()
+            self._since_snapshot += 1
+            if self.event_log is not None and self._since_snapshot >= self.snapshot_every:
+                self.snapshot()
+            return event
+
+    def _apply(self, event: Dict[str, Any]) -> None:
+        try:
+            self._apply_state(event["type"], event["data"], event["ts"])
+        except Exception as e:
+            # A bad event must not block the rest of the session
+            logger.warning(f"Événement {event['seq']} de la session {self.session_id} ignoré: {e!r}")
+            self.last_seq = event["seq"]
+            return
+        self.last_seq = event["seq"]
+        for listener in self._listeners:
+            listener(event)
+
+    def _apply_state(self, kind: str, data: Dict[str, Any], ts: float) -> None:
+        if kind == "join":
+            self.collaborators.add(data["user"])
+        elif kind == "leave":
+            self.collaborators.discard(data["user"])
+        elif kind == "correction":
+            user, error_fixed = data["user"], data["error_fixed"]
+            self.fixes_by_user[user] += 1
+            self.fixes_by_error[error_fixed] += 1
+            self.correction_history.append(data)
+        elif kind == "edit":
+            self.document.apply(data["ops"])
+        elif kind == "start":
+            self.session_start = datetime.datetime.fromtimestamp(ts)
+
+    def add_listener(self, listener: EventListener) -> None:
+        """`listener(event)` est appelé, sous le verrou de la session, après chaque événement."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: EventListener) -> None:
+        self._listeners.remove(listener)
+
+    def _load(self) -> None:
+        snapshot = self.event_log.load_snapshot(self.session_id)
+        if snapshot is not None:
+            state = snapshot["state"]
+            self.session_start = datetime.datetime.fromtimestamp(state["session_start"])
+            self.collaborators = set(state["collaborators"])
+            self.correction_history = state["correction_history"]
+            self.fixes_by_user = Counter(fix["user"] for fix in self.correction_history)
+            self.fixes_by_error = Counter(fix["error_fixed"] for fix in self.correction_history)
+            self.document.apply(state.get("document", ()))
+            self.last_seq = snapshot["seq"]
+        self.refresh()
+
+    def refresh(self) -> int:
+        """Applique les événements écrits par d'autres écrivains ; retourne leur nombre."""
+        if self.event_log is None:
+            return 0
+        with self._lock:
+            applied = 0
+            for event in self.event_log.replay(self.session_id, self.last_seq):
+                self._apply(event)
+                applied += 1
+            return applied
+
+    def snapshot(self) -> None:
+        """Enregistre l'état courant pour accélérer le prochain démarrage."""
+        with self._lock:
+            state = {
+                "session_start": self.session_start.timestamp(),
+                "collaborators": sorted(self.collaborators),
+                "correction_history": self.correction_history,
+                "document": self.document.encode_delta(),
+            }
+            self.event_log.save_snapshot(self.session_id, self.last_seq, state)
+            self._since_snapshot = 0
+
+    # --- Actions ---
 
     def register_collaborator(self, name):
         """Ajoute un membre à la session active."""
-        self.collaborators.add(name)
+        with self._lock:
+            self._record("join", {"user": name})
+            members = list(self.collaborators)
         logger.info(f"Collaborateur {name} a rejoint la session.")
-        return list(self.collaborators)
+        return members
+
+    def remove_collaborator(self, name):
+        """Retire un membre de la session active."""
+        with self._lock:
+            self._record("leave", {"user": name})
+            members = list(self.collaborators)
+        logger.info(f"Collaborateur {name} a quitté la session.")
+        return members
+
+    def get_collaborators(self):
+        """Liste des membres actifs."""
+        with self._lock:
+            return list(self.collaborators)
 
     def log_correction(self, collaborator, error_type, fix_description):
         """Enregistre une correction effectuée par un membre."""
@@ -26,31 +209,105 @@ class CollaborationManager:
             "error_fixed": error_type,
             "description": fix_description
         }
-        self.correction_history.append(entry)
+        self._record("correction", entry)
         logger.info(f"Correction enregistrée par {collaborator} pour l'erreur {error_type}")
         return entry
 
-    def get_session_summary(self):
-        """Retourne un résumé de l'activité de collaboration."""
-        return {
-            "duration": str(datetime.datetime.now() - self.session_start),
-            "total_collaborators": len(self.collaborators),
-            "total_fixes": len(self.correction_history),
-            "fixes": self.correction_history
-        }
+    # --- Code partagé ---
+
+    @property
+    def code(self) -> str:
+        """Contenu actuel du document partagé."""
+        with self._lock:
+            return self.document.text()
+
+    def edit_code(self, user: str, ops: List[Op]) -> Dict[str, Any]:
+        """Applique les opérations produites par la réplique d'un membre."""
+        return self._record("edit", {"user": user, "ops": ops})
+
+    def insert_code(self, user: str, index: int, text: str) -> List[Op]:
+        """Insère `text` dans le document au nom de `user` ; retourne les opérations."""
+        with self._lock:
+            ops = self.document.insert(index, text)
+            if ops:
+                self._record("edit", {"user": user, "ops": ops})
+            return ops
+
+    def delete_code(self, user: str, index: int, length: int = 1) -> List[Op]:
+        """Supprime `length` caractères du document au nom de `user`."""
+        with self._lock:
+            ops = self.document.delete(index, length)
+            if ops:
+                self._record("edit", {"user": user, "ops": ops})
+            return ops
+
+    def sync_code(self, state_vector: Optional[Dict[Any, int]] = None) -> Tuple[List[Op], Dict[int, int]]:
+        """Opérations absentes d'une réplique (`state_vector`) et vecteur d'état courant."""
+        with self._lock:
+            return self.document.encode_delta(state_vector), self.document.state_vector()
+
+    def run_code(self, engine: "ExecutionEngine", user_input: str = "", **kwargs: Any) -> "ExecutionResult":
+        """Exécute le code partagé tel qu'il est à cet instant."""
+        return engine.execute_code(self.code, user_input, **kwargs)
+
+    def get_session_summary(self, include_fixes=True):
+        """
+        Retourne un résumé de l'activité de collaboration.
+
+        Sans `include_fixes`, le résumé ne copie pas l'historique : `cursor`
+        permet ensuite de ne demander que les nouvelles corrections.
+        """
+        with self._lock:
+            summary = {
+                "duration": str(datetime.datetime.now() - self.session_start),
+                "total_collaborators": len(self.collaborators),
+                "total_fixes": len(self.correction_history),
+                "fixes_by_user": dict(self.fixes_by_user),
+                "fixes_by_error": dict(self.fixes_by_error),
+                "cursor": len(self.correction_history),
+            }
+            if include_fixes:
+                summary["fixes"] = list(self.correction_history)
+            return summary
+
+    def get_fixes_since(self, cursor=0, limit=PAGE_SIZE):
+        """
+        Corrections enregistrées après `cursor` (au plus `limit`).
+
+        Le curseur retourné est à repasser à l'appel suivant ; l'historique
+        n'étant jamais réécrit, une page n'est jamais sautée ni répétée.
+        """
+        with self._lock:
+            cursor = max(0, cursor)
+            fixes = self.correction_history[cursor:cursor + limit]
+            next_cursor = cursor + len(fixes)
+            return {
+                "fixes": fixes,
+                "cursor": next_cursor,
+                "has_more": next_cursor < len(self.correction_history),
+            }
+
+    def iter_collab_report(self, page_size=PAGE_SIZE):
+        """Produit le rapport de collaboration morceau par morceau."""
+        summary = self.get_session_summary(include_fixes=False)
+        with self._lock:
+            members = ', '.join(self.collaborators)
+        yield (f"\n{'*'*40}\n"
+               f"🤝 RAPPORT DE COLLABORATION\n"
+               f"{'*'*40}\n"
+               f"👥 Membres actifs : {members}\n"
+               f"⏳ Durée session : {summary['duration']}\n"
+               f"✅ Corrections effectuées : {summary['total_fixes']}\n")
+        cursor = 0
+        while cursor < summary["cursor"]:
+            page = self.get_fixes_since(cursor, min(page_size, summary["cursor"] - cursor))
+            if not page["fixes"]:
+                break
+            yield "".join(f"  - [{fix['timestamp']}] {fix['user']} a corrigé {fix['error_fixed']}\n"
+                          for fix in page["fixes"])
+            cursor = page["cursor"]
+        yield f"{'*'*40}"
 
     def format_collab_report(self):
         """Génère un affichage convivial pour le travail d'équipe."""
-        summary = self.get_session_summary()
-        report = f"\n{'*'*40}\n"
-        report += f"🤝 RAPPORT DE COLLABORATION\n"
-        report += f"{'*'*40}\n"
-        report += f"👥 Membres actifs : {', '.join(self.collaborators)}\n"
-        report += f"⏳ Durée session : {summary['duration']}\n"
-        report += f"✅ Corrections effectuées : {summary['total_fixes']}\n"
-        
-        for fix in summary['fixes']:
-            report += f"  - [{fix['timestamp']}] {fix['user']} a corrigé {fix['error_fixed']}\n"
-        
-        report += f"{'*'*40}"
-        return report
+        return "".join(self.iter_collab_report())
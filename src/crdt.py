@@ -0,0 +1,389 @@
+"""
+Module: Document de code partagé (CRDT)
+Description: Tampon de texte que plusieurs collaborateurs modifient en même
+             temps sans coordination. Chaque caractère a un identifiant
+             unique (client, numéro) ; les insertions concurrentes au même
+             endroit sont ordonnées par horloge de Lamport (algorithme RGA),
+             si bien que toutes les répliques convergent vers le même texte
+             quel que soit l'ordre de réception des opérations.
+"""
+
+import random
+from bisect import bisect_right
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+INSERT = 'i'
+DELETE = 'd'
+
+# Opérations (listes, compactes une fois sérialisées en JSON) :
+#   ['i', client, seq, ts, origin_client, origin_seq, text]
+#       `text` occupe les numéros seq..seq+len-1 et les horloges ts..ts+len-1 ;
+#       il est placé après le caractère `origin` (None : en tête du document).
+#   ['d', client, seq, ts, [[client, seq, length], ...]]
+#       supprime les plages de caractères désignées (un seul numéro consommé).
+Op = List[Any]
+CharId = Tuple[int, int]
+
+# Écart maximal entre un numéro référencé par une opération et le dernier
+# numéro reçu du client correspondant : au-delà, l'opération est refusée
+# au lieu d'attendre indéfiniment ses dépendances.
+MAX_SEQ_GAP = 100_000
+# Nombre maximal d'opérations en attente de leurs dépendances
+MAX_PENDING = 10_000
+
+
+class _Block:
+    """Suite de caractères consécutifs d'un même client, insérés d'un seul tenant."""
+
+    __slots__ = ('client', 'seq', 'ts', 'text', 'deleted')
+
+    def __init__(self, client: int, seq: int, ts: int, text: str, deleted: bool = False):
+        self.client = client
+        self.seq = seq
+        self.ts = ts
+        self.text = text
+        self.deleted = deleted
+
+    def __repr__(self):
+        state = ' deleted' if self.deleted else ''
+        return f"<_Block {self.client}:{self.seq} {self.text!r}{state}>"
+
+
+def _seq_key(block: _Block) -> int:
+    return block.seq
+
+
+def _op_end(op: Op) -> int:
+    return op[2] + len(op[6]) - 1 if op[0] == INSERT else op[2]
+
+
+def _is_id(value: Any, minimum: int = 1) -> bool:
+    return type(value) is int and value >= minimum
+
+
+def check_op(op: Any) -> Op:
+    """Vérifie la structure et les types d'une opération ; retourne-la sous forme de liste."""
+    if not isinstance(op, (list, tuple)) or not op:
+        raise ValueError(f"Invalid op {op!r}: expected a non-empty list")
+    op = list(op)
+    if op[0] == INSERT and len(op) == 7:
+        _, client, seq, ts, origin_client, origin_seq, text = op
+        valid = (_is_id(client, 0) and _is_id(seq) and _is_id(ts)
+                 and isinstance(text, str) and text != ''
+                 and (origin_client is None and origin_seq is None
+                      or _is_id(origin_client, 0) and _is_id(origin_seq)))
+    elif op[0] == DELETE and len(op) == 5:
+        _, client, seq, ts, ranges = op
+        valid = (_is_id(client, 0) and _is_id(seq) and _is_id(ts)
+                 and isinstance(ranges, (list, tuple)) and len(ranges) > 0
+                 and all(isinstance(target, (list, tuple)) and len(target) == 3
+                         and _is_id(target[0], 0) and _is_id(target[1]) and _is_id(target[2])
+                         for target in ranges))
+    else:
+        valid = False
+    if not valid:
+        raise ValueError(f"Invalid op {op!r}")
+    return op
+
+
+class Document:
+    """
+    Réplique d'un document texte partagé.
+
+    Les modifications locales (`insert`, `delete`) retournent les opérations
+    à diffuser ; les opérations reçues s'appliquent avec `apply`, dans
+    n'importe quel ordre et éventuellement en double. Le vecteur d'état
+    (`state_vector`, dernier numéro reçu par client) permet de ne demander
+    à une autre réplique que ce qui manque (`encode_delta`).
+
+    La frappe continue d'un client est fusionnée en un seul bloc et une
+    seule opération, ce qui garde les deltas et l'état encodé compacts.
+    """
+
+    def __init__(self, client_id: Optional[int] = None, text: str = ''):
+        self.client_id = random.getrandbits(32) if client_id is None else client_id
+        self.lamport = 0
+        self._blocks: List[_Block] = []
+        self._by_client: Dict[int, List[_Block]] = {}
+        self._log: Dict[int, List[Op]] = {}
+        self._vector: Dict[int, int] = {}
+        self._pending: List[Op] = []
+        self._text: Optional[str] = ''
+        if text:
+            self.insert(0, text)
+
+    @classmethod
+    def from_state(cls, ops: Iterable[Op], client_id: Optional[int] = None) -> "Document":
+        document = cls(client_id)
+        document.apply(ops)
+        return document
+
+    # --- Lecture ---
+
+    def text(self) -> str:
+        if self._text is None:
+            self._text = ''.join([block.text for block in self._blocks if not block.deleted])
+        return self._text
+
+    def __len__(self) -> int:
+        return len(self.text())
+
+    def __str__(self) -> str:
+        return self.text()
+
+    def state_vector(self) -> Dict[int, int]:
+        return dict(self._vector)
+
+    # --- Modifications locales ---
+
+    def insert(self, index: int, text: str) -> List[Op]:
+        """Insère `text` à la position visible `index` ; retourne les opérations à diffuser."""
+        if not text:
+            return []
+        origin = self._char_id(index - 1) if index > 0 else (None, None)
+        op = [INSERT, self.client_id, self._vector.get(self.client_id, 0) + 1,
+              self.lamport + 1, origin[0], origin[1], text]
+        self._integrate(op)
+        return [op]
+
+    def delete(self, index: int, length: int = 1) -> List[Op]:
+        """Supprime `length` caractères visibles à partir de `index`."""
+        ranges: List[List[int]] = []
+        position = 0
+        for block in self._blocks:
+            if block.deleted:
+                continue
+            size = len(block.text)
+            start, stop = max(index - position, 0), min(index + length - position, size)
+            if start < stop:
+                last = ranges[-1] if ranges else None
+                if last is not None and last[0] == block.client and last[1] + last[2] == block.seq + start:
+                    last[2] += stop - start
+                else:
+                    ranges.append([block.client, block.seq + start, stop - start])
+            position += size
+            if position >= index + length:
+                break
+        if not ranges:
+            return []
+        op = [DELETE, self.client_id, self._vector.get(self.client_id, 0) + 1, self.lamport + 1, ranges]
+        self._integrate(op)
+        return [op]
+
+    def replace(self, text: str) -> List[Op]:
+        """Remplace tout le contenu (par exemple un collage complet du code)."""
+        return self.delete(0, len(self)) + self.insert(0, text)
+
+    def _char_id(self, index: int) -> CharId:
+        position = 0
+        for block in self._blocks:
+            if block.deleted:
+                continue
+            size = len(block.text)
+            if index < position + size:
+                return block.client, block.seq + index - position
+            position += size
+        raise IndexError(f"Position {index} out of range")
+
+    # --- Opérations reçues ---
+
+    def apply(self, ops: Iterable[Op]) -> int:
+        """
+        Intègre des opérations distantes ; retourne le nombre d'opérations appliquées.
+
+        Une opération dont une dépendance manque encore est mise en attente et
+        réessayée à chaque appel suivant (au plus MAX_PENDING ; les plus
+        récentes au-delà sont abandonnées et seront redemandées par
+        `encode_delta`). Un lot invalide (`check`) est refusé en entier avant
+        toute modification.
+        """
+        pending = self._pending + self.check(ops)
+        applied = 0
+        progress = True
+        while pending and progress:
+            progress = False
+            waiting = []
+            for op in pending:
+                if self._ready(op):
+                    applied += self._integrate(op)
+                    progress = True
+                else:
+                    waiting.append(op)
+            pending = waiting
+        self._pending = pending[:MAX_PENDING]
+        return applied
+
+    def check(self, ops: Iterable[Op]) -> List[Op]:
+        """
+        Vérifie un lot d'opérations reçues sans l'appliquer : structure, types
+        et numéros référencés à moins de MAX_SEQ_GAP de ce qui est connu.
+        Lève ValueError ; retourne les opérations sous forme de listes.
+        """
+        if not isinstance(ops, Iterable) or isinstance(ops, (str, bytes, dict)):
+            raise ValueError("Invalid ops: expected a list of operations")
+        checked = [check_op(op) for op in ops]
+        vector = self._vector
+        for op in checked:
+            references = [(op[1], op[2])]
+            if op[0] == INSERT:
+                if op[4] is not None:
+                    references.append((op[4], op[5]))
+            else:
+                references.extend((client, seq + length - 1) for client, seq, length in op[4])
+            for client, seq in references:
+                if seq > vector.get(client, 0) + MAX_SEQ_GAP:
+                    raise ValueError(f"Op {op[:3]!r} references {client}:{seq}, too far ahead of this replica")
+        return checked
+
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def _ready(self, op: Op) -> bool:
+        vector = self._vector
+        if op[2] > vector.get(op[1], 0) + 1:
+            return False
+        if op[0] == INSERT:
+            return op[4] is None or vector.get(op[4], 0) >= op[5]
+        return all(vector.get(client, 0) >= seq + length - 1 for client, seq, length in op[4])
+
+    def _integrate(self, op: Op) -> bool:
+        client, seq = op[1], op[2]
+        known = self._vector.get(client, 0)
+        if _op_end(op) <= known:
+            return False
+        if op[0] == INSERT and seq <= known:
+            # Partly received already (the sender merged a run since): keep the new tail
+            skip = known - seq + 1
+            op = [INSERT, client, known + 1, op[3] + skip, client, known, op[6][skip:]]
+        # An op that targets ids which are not characters (a delete op id, for
+        # instance) has no effect, identically on every replica, but still
+        # takes its place in the sequence so later ops are not blocked
+        if op[0] == INSERT:
+            if op[4] is None or self._has_chars(op[4], op[5], 1):
+                self._integrate_insert(op)
+        elif all(self._has_chars(*target) for target in op[4]):
+            for target_client, target_seq, length in op[4]:
+                self._mark_deleted(target_client, target_seq, length)
+        self._vector[client] = _op_end(op)
+        self.lamport = max(self.lamport, op[3] + (len(op[6]) - 1 if op[0] == INSERT else 0))
+        self._append_log(op)
+        self._text = None
+        return True
+
+    def _integrate_insert(self, op: Op) -> None:
+        _, client, seq, ts, origin_client, origin_seq, text = op
+        blocks = self._blocks
+        if origin_client is None:
+            anchor, index = None, 0
+        else:
+            anchor = self._split_after(origin_client, origin_seq)
+            index = blocks.index(anchor) + 1
+        # RGA: skip the concurrent inserts at the same place that win (higher
+        # Lamport clock, then client id) along with everything inserted after them
+        position = index
+        while position < len(blocks) and (blocks[position].ts, blocks[position].client) > (ts, client):
+            position += 1
+        if (position == index and anchor is not None and not anchor.deleted
+                and anchor.client == client and anchor.seq + len(anchor.text) == seq
+                and anchor.ts + len(anchor.text) == ts):
+            # Continuous typing: extend the previous block
+            anchor.text += text
+            return
+        block = _Block(client, seq, ts, text)
+        blocks.insert(position, block)
+        self._index_block(block)
+
+    def _has_chars(self, client: int, seq: int, length: int) -> bool:
+        """Vrai si les numéros seq..seq+length-1 de `client` sont tous des caractères."""
+        blocks = self._by_client.get(client)
+        if not blocks:
+            return False
+        end = seq + length
+        while seq < end:
+            index = bisect_right(blocks, seq, key=_seq_key) - 1
+            if index < 0 or seq >= blocks[index].seq + len(blocks[index].text):
+                return False
+            seq = blocks[index].seq + len(blocks[index].text)
+        return True
+
+    def _find(self, client: int, seq: int) -> _Block:
+        blocks = self._by_client[client]
+        return blocks[bisect_right(blocks, seq, key=_seq_key) - 1]
+
+    def _split(self, block: _Block, offset: int) -> _Block:
+        """Coupe `block` avant le caractère `offset` ; retourne la partie droite."""
+        right = _Block(block.client, block.seq + offset, block.ts + offset,
+                       block.text[offset:], block.deleted)
+        block.text = block.text[:offset]
+        self._blocks.insert(self._blocks.index(block) + 1, right)
+        self._index_block(right)
+        return right
+
+    def _split_after(self, client: int, seq: int) -> _Block:
+        """Bloc qui se termine par le caractère (client, seq), en coupant si besoin."""
+        block = self._find(client, seq)
+        offset = seq - block.seq + 1
+        if offset < len(block.text):
+            self._split(block, offset)
+        return block
+
+    def _mark_deleted(self, client: int, seq: int, length: int) -> None:
+        end = seq + length
+        while seq < end:
+            block = self._find(client, seq)
+            if block.seq < seq:
+                block = self._split(block, seq - block.seq)
+            if block.seq + len(block.text) > end:
+                self._split(block, end - block.seq)
+            block.deleted = True
+            seq = block.seq + len(block.text)
+
+    def _index_block(self, block: _Block) -> None:
+        blocks = self._by_client.setdefault(block.client, [])
+        if not blocks or blocks[-1].seq < block.seq:
+            blocks.append(block)
+        else:
+            blocks.insert(bisect_right(blocks, block.seq, key=_seq_key), block)
+
+    def _append_log(self, op: Op) -> None:
+        log = self._log.setdefault(op[1], [])
+        last = log[-1] if log else None
+        if (last is not None and op[0] == INSERT and last[0] == INSERT
+                and _op_end(last) + 1 == op[2] and last[3] + len(last[6]) == op[3]
+                and op[4] == op[1] and op[5] == op[2] - 1):
+            # Same run continued: one op instead of one per keystroke
+            log[-1] = last[:6] + [last[6] + op[6]]
+        else:
+            log.append(op)
+
+    # --- Synchronisation ---
+
+    def encode_delta(self, state_vector: Optional[Dict[Any, int]] = None) -> List[Op]:
+        """
+        Opérations qu'une réplique de vecteur d'état `state_vector` n'a pas
+        encore (tout l'état si None), triées par horloge de Lamport.
+        """
+        known = {int(client): seq for client, seq in (state_vector or {}).items()}
+        delta = []
+        for client, log in self._log.items():
+            seen = known.get(client, 0)
+            start = bisect_right(log, seen, key=_op_end)
+            for op in log[start:]:
+                if op[2] <= seen:
+                    skip = seen - op[2] + 1
+                    op = [INSERT, client, seen + 1, op[3] + skip, client, seen, op[6][skip:]]
+                delta.append(op)
+        delta.sort(key=lambda op: (op[3], op[1]))
+        return delta
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'length': len(self),
+            'blocks': len(self._blocks),
+            'ops': sum(len(log) for log in self._log.values()),
+            'clients': len(self._vector),
+            'pending': len(self._pending),
+        }
+
+    def __repr__(self):
+        return f"<Document client={self.client_id} {len(self)} chars>"
@@ -1,61 +1,225 @@
 import re
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
 from loguru import logger
 
-# Configuration du logging pour le module 2
-logger.add("logs/debugger.log", rotation="1 MB", retention="10 days", level="INFO")
+from src.execution_result import ExceptionInfo, FrameInfo, as_exception_info
+from src.fingerprint import ErrorGroups
+from src.knowledge_base import DEFAULT_SUGGESTION, KnowledgeBase, Rule
+from src.profiler import diagnose
+from src.source_context import SourceContext, format_context
+
+HIGH_SEVERITY_TYPES = frozenset({"SyntaxError", "IndentationError"})
+LINE_PATTERN = re.compile(r"line (\d+)")
+
 
 class Debugger:
     """
     Module 2: Analyseur d'erreurs et suggestions.
     """
-    def __init__(self):
-        self.knowledge_base = {
-            "SyntaxError": "Vérifiez les deux-points (:), les parenthèses ou l'indentation.",
-            "NameError": "Variable non définie. Vérifiez l'orthographe ou l'initialisation.",
-            "ZeroDivisionError": "Division par zéro impossible. Ajoutez une condition 'if'.",
-            "TypeError": "Types incompatibles. Utilisez int() ou str() pour convertir.",
-            "IndexError": "Index hors limites. Vérifiez la taille de votre liste."
-        }
+    def __init__(self, knowledge_base: Optional[KnowledgeBase] = None, context_lines: int = 2):
+        self.knowledge_base = knowledge_base if knowledge_base is not None else KnowledgeBase()
+        self.source_context = SourceContext(context_lines=context_lines)
+        self.error_groups = ErrorGroups()
+
+    def analyze(self, execution_result, code: Optional[str] = None, submission_id: Optional[Any] = None):
+        """
+        Analyse le résultat du moteur d'exécution (ExecutionResult ou dictionnaire).
 
-    def analyze(self, execution_result):
-        """Analyse le dictionnaire de sortie du moteur d'exécution."""
+        Si le code source est fourni, l'analyse contient aussi la ligne fautive,
+        ses voisines et le soulignement de l'expression en cause (`context`).
+        Chaque échec est rattaché à un groupe d'erreurs identiques
+        (`error_groups`) ; seule la première occurrence d'un groupe est
+        journalisée au niveau ERROR.
+
+        Un résultat profilé (`execute_code(..., profile=True)`) ajoute une
+        section `performance`, en cas de succès comme d'échec.
+        """
+        profile = execution_result.get('profile')
         if execution_result.get('success'):
             logger.info("Exécution réussie.")
-            return {"status": "SUCCESS", "analysis": None}
+            analysis = {"status": "SUCCESS", "analysis": None}
+            if profile:
+                analysis["performance"] = self._performance(profile, code)
+            return analysis
+
+        error_type, error_msg, line_no, mro = self._extract(execution_result)
+        rule = self.knowledge_base.lookup(error_type, error_msg, mro)
+
+        analysis = {
+            "status": "FAILED",
+            "error_type": error_type,
+            "line_number": line_no,
+            "message": error_msg,
+            "suggestion": self._suggestion(rule),
+            "severity": self._severity(error_type, rule)
+        }
+        if code is not None and isinstance(line_no, int):
+            analysis["context"] = self._context(execution_result, code, line_no)
+        if profile:
+            analysis["performance"] = self._performance(profile, code)
+
+        frame = self._frame(execution_result)
+        group, created = self.error_groups.add(
+            error_type, error_msg, frame.name if frame else None,
+            frame.lineno if frame else (line_no if isinstance(line_no, int) else None),
+            submission_id=submission_id, timestamp=getattr(execution_result, 'created_at', None))
+        analysis["fingerprint"] = group.fingerprint
+        analysis["occurrences"] = group.count
+
+        if created:
+            logger.error(f"Erreur détectée: {error_type} à la ligne {line_no} (groupe {group.fingerprint})")
+        else:
+            logger.debug(f"Erreur déjà connue: groupe {group.fingerprint} ({group.count} occurrences)")
+        return analysis
+
+    def analyze_many(self, execution_results: Iterable[Mapping[str, Any]]) -> Dict[str, Any]:
+        """
+        Analyse un lot de résultats (liste ou itérateur consommé en flux).
+
+        Seuls des compteurs sont conservés pendant le parcours : la mémoire
+        utilisée dépend du nombre de types et de lignes distincts, pas du
+        nombre de résultats. Suggestion et sévérité sont résolues une seule
+        fois par type (règle générale du type, sans motif de message), et un
+        unique enregistrement de log résume le lot.
+
+        Retourne un résumé en colonnes, trié par nombre d'occurrences :
+        `error_types`, `counts`, `suggestions` et `severities` sont alignés,
+        `by_line` donne pour chaque type le nombre d'erreurs par ligne.
+        """
+        total = 0
+        by_type: Counter = Counter()
+        by_line: Dict[str, Counter] = defaultdict(Counter)
+        rules: Dict[str, Optional[Rule]] = {}
+
+        for execution_result in execution_results:
+            total += 1
+            if execution_result.get('success'):
+                continue
+            error_type, _, line_no, mro = self._extract(execution_result)
+            by_type[error_type] += 1
+            by_line[error_type][line_no] += 1
+            if error_type not in rules:
+                rules[error_type] = self.knowledge_base.lookup(error_type, mro=mro)
+
+        failures = sum(by_type.values())
+        error_types = [error_type for error_type, _ in by_type.most_common()]
+        summary = {
+            "total": total,
+            "successes": total - failures,
+            "failures": failures,
+            "error_types": error_types,
+            "counts": [by_type[error_type] for error_type in error_types],
+            "suggestions": [self._suggestion(rules[error_type]) for error_type in error_types],
+            "severities": [self._severity(error_type, rules[error_type]) for error_type in error_types],
+            "by_line": {error_type: dict(by_line[error_type]) for error_type in error_types},
+        }
+
+        if failures:
+            logger.error(f"Analyse par lot: {failures}/{total} échecs "
+                         f"({', '.join(f'{t}={c}' for t, c in zip(error_types, summary['counts']))})")
+        else:
+            logger.info(f"Analyse par lot: {total} exécutions réussies.")
+        return summary
+
+    def _extract(self, execution_result: Mapping[str, Any]) -> Tuple[str, str, Any, Tuple[str, ...]]:
+        """Type, message, ligne et classes parentes de l'erreur (MRO, vide si inconnue)."""
+        exception = self._exception(execution_result)
+        if exception is not None:
+            # Métadonnées structurées fournies par le moteur : lecture directe
+            return (exception.type, exception.message or "Pas de détails",
+                    exception.lineno or "Unknown", exception.mro)
 
         raw_error = execution_result.get('error', "")
-        
+
         # Extraction du type et du message
         parts = raw_error.split(':', 1)
         error_type = parts[0].strip()
         error_msg = parts[1].strip() if len(parts) > 1 else "Pas de détails"
 
         # Extraction de la ligne via Regex
-        line_match = re.search(r"line (\d+)", raw_error)
+        line_match = LINE_PATTERN.search(raw_error)
         line_no = int(line_match.group(1)) if line_match else "Unknown"
+        return error_type, error_msg, line_no, ()
 
-        analysis = {
-            "status": "FAILED",
-            "error_type": error_type,
-            "line_number": line_no,
-            "message": error_msg,
-            "suggestion": self.knowledge_base.get(error_type, "Consultez la documentation Python officielle."),
-            "severity": "High" if error_type in ["SyntaxError", "IndentationError"] else "Medium"
+    @staticmethod
+    def _exception(execution_result: Mapping[str, Any]) -> Optional[ExceptionInfo]:
+        """Métadonnées de l'exception, y compris sous la forme de `to_dict()`."""
+        return as_exception_info(execution_result.get('exception'))
+
+    @classmethod
+    def _frame(cls, execution_result: Mapping[str, Any]) -> Optional[FrameInfo]:
+        """Cadre utilisateur le plus interne, si le résultat est structuré."""
+        exception = cls._exception(execution_result)
+        return exception.frames[-1] if exception is not None and exception.frames else None
+
+    def _context(self, execution_result: Mapping[str, Any], code: str, line_no: int) -> Optional[Dict[str, Any]]:
+        frame = self._frame(execution_result)
+        if frame is None:
+            return self.source_context.extract(code, line_no)
+        return self.source_context.extract(code, line_no, frame.colno, frame.end_colno, frame.end_lineno)
+
+    def _performance(self, profile: Mapping[str, Any], code: Optional[str]) -> Dict[str, Any]:
+        index = self.source_context.index(code) if code is not None else None
+        hot_lines = [dict(hot, source=index.line(hot['line']) if index is not None else None)
+                     for hot in profile.get('hot_lines', ())]
+        return {
+            "wall_time": profile.get('wall_time'),
+            "cpu_time": profile.get('cpu_time'),
+            "peak_allocated_mb": profile.get('peak_allocated_mb'),
+            "hot_lines": hot_lines,
+            "findings": diagnose(profile),
         }
 
-        logger.error(f"Erreur détectée: {error_type} à la ligne {line_no}")
-        return analysis
+    @staticmethod
+    def _suggestion(rule: Optional[Rule]) -> str:
+        return rule.suggestion if rule is not None else DEFAULT_SUGGESTION
+
+    @staticmethod
+    def _severity(error_type: str, rule: Optional[Rule]) -> str:
+        if rule is not None and rule.severity:
+            return rule.severity
+        return "High" if error_type in HIGH_SEVERITY_TYPES else "Medium"
+
+    def top_errors(self, n: int = 10) -> List[Dict[str, Any]]:
+        """Les `n` erreurs les plus fréquentes parmi celles analysées."""
+        return [group.to_dict() for group in self.error_groups.top(n)]
 
     def format_report(self, analysis):
         """Génère un rapport lisible pour l'utilisateur."""
         if analysis["status"] == "SUCCESS":
+            if analysis.get("performance"):
+                return "\n".join(["Code valide."] + format_performance(analysis["performance"]))
             return "Code valide."
 
-        return (
-            f"\n--- RAPPORT DE DEBUGGING ---\n"
-            f"Type       : {analysis['error_type']}\n"
-            f"Ligne      : {analysis['line_number']}\n"
-            f"Message    : {analysis['message']}\n"
-            f"Suggestion : {analysis['suggestion']}\n"
-            f"---------------------------"
-        )
+        lines = [
+            "",
+            "--- RAPPORT DE DEBUGGING ---",
+            f"Type       : {analysis['error_type']}",
+            f"Ligne      : {analysis['line_number']}",
+            f"Message    : {analysis['message']}",
+            f"Suggestion : {analysis['suggestion']}",
+        ]
+        if analysis.get("occurrences", 1) > 1:
+            lines.append(f"Fréquence  : {analysis['occurrences']} occurrences de cette erreur")
+        if analysis.get("context"):
+            lines.append("Contexte   :")
+            lines.extend(format_context(analysis["context"]))
+        if analysis.get("performance"):
+            lines.extend(format_performance(analysis["performance"]))
+        lines.append("---------------------------")
+        return "\n".join(lines)
+
+
+def format_performance(performance: Mapping[str, Any]) -> List[str]:
+    """Lignes de la section performance d'un rapport."""
+    lines = [f"Performance: {performance['wall_time']:.3f} s réel, {performance['cpu_time']:.3f} s CPU, "
+             f"pic d'allocations {performance['peak_allocated_mb']:.1f} Mo"]
+    if performance["hot_lines"]:
+        lines.append("Lignes chaudes :")
+        for hot in performance["hot_lines"]:
+            source = f" | {hot['source'].strip()}" if hot.get('source') else ""
+            lines.append(f"  {hot['share']:>4.0%}  ligne {hot['line']}{source}")
+    lines.extend(f"Diagnostic : {finding}" for finding in performance["findings"])
+    return lines
@@ -0,0 +1,270 @@
+"""
+Module: Journal d'événements
+Description: Journal append-only des sessions de collaboration (arrivées,
+             départs, corrections). Chaque session a son fichier JSON Lines ;
+             les écritures vont immédiatement au système et sont synchronisées
+             sur disque (fsync) par lots. Des instantanés périodiques évitent
+             de rejouer tout l'historique au redémarrage.
+"""
+
+import abc
+import fcntl
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from loguru import logger
+
+SESSION_ID_PATTERN = re.compile(r'^[\w-][\w.-]{0,127}$')
+LOG_SUFFIX = '.jsonl'
+SNAPSHOT_SUFFIX = '.snapshot.json'
+# Taille lue à la fin d'un fichier pour retrouver le dernier numéro de séquence
+TAIL_BLOCK = 65536
+
+
+class EventLog(abc.ABC):
+    """
+    Interface d'un journal d'événements par session.
+
+    Chaque événement est un dictionnaire `{'seq', 'type', 'ts', 'data'}` ;
+    `seq` croît de 1 en 1 au sein d'une session, y compris quand plusieurs
+    écrivains (threads ou processus) partagent le journal.
+    """
+
+    @abc.abstractmethod
+    def append(self, session_id: str, kind: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        ...
+
+    @abc.abstractmethod
+    def replay(self, session_id: str, after_seq: int = 0) -> Iterator[Dict[str, Any]]:
+        """Événements de la session dont `seq` est supérieur à `after_seq`, dans l'ordre."""
+
+    @abc.abstractmethod
+    def save_snapshot(self, session_id: str, seq: int, state: Dict[str, Any]) -> None:
+        ...
+
+    @abc.abstractmethod
+    def load_snapshot(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Dernier instantané `{'seq', 'state'}` de la session, ou None."""
+
+    @abc.abstractmethod
+    def sessions(self) -> List[str]:
+        ...
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class _SessionFile:
+    """Descripteur ouvert sur le journal d'une session et sa position connue."""
+
+    __slots__ = ('fd', 'lock', 'seq', 'end', 'dirty', 'closed')
+
+    def __init__(self, path: str):
+        self.fd = os.open(path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        self.lock = threading.Lock()
+        self.seq = 0
+        self.end = -1
+        self.dirty = False
+        self.closed = False
+
+
+class FileEventLog(EventLog):
+    """
+    Journal sur fichiers locaux : `<directory>/<session_id>.jsonl`.
+
+    Les ajouts sont protégés par un verrou de thread et par `flock`, ce qui
+    permet à plusieurs processus d'écrire dans la même session. Un thread
+    synchronise les fichiers modifiés toutes les `fsync_interval` secondes :
+    un arrêt brutal du processus ne perd rien, une coupure de courant au
+    plus cet intervalle. Au plus `max_open_files` descripteurs restent
+    ouverts (les moins récemment utilisés sont fermés).
+
+    Une ligne incomplète en fin de fichier (écriture interrompue) est
+    ignorée à la relecture et supprimée au prochain ajout.
+    """
+
+    def __init__(self, directory: str = 'logs/events', fsync_interval: float = 0.05,
+                 max_open_files: int = 256):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.fsync_interval = fsync_interval
+        self.max_open_files = max_open_files
+        self._files: "OrderedDict[str, _SessionFile]" = OrderedDict()
+        # Dernière position connue (seq, fin de l'événement) pour reprendre une relecture
+        self._positions: Dict[str, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stop = threading.Event()
+        self._syncer = threading.Thread(target=self._sync_loop, name='event-log-fsync', daemon=True)
+        self._syncer.start()
+
+    def _path(self, session_id: str, suffix: str = LOG_SUFFIX) -> str:
+        if not SESSION_ID_PATTERN.match(session_id):
+            raise ValueError(f"Invalid session id '{session_id}'")
+        return os.path.join(self.directory, session_id + suffix)
+
+    def _handle(self, session_id: str) -> _SessionFile:
+        evicted = []
+        with self._lock:
+            handle = self._files.get(session_id)
+            if handle is not None:
+                self._files.move_to_end(session_id)
+                return handle
+            handle = self._files[session_id] = _SessionFile(self._path(session_id))
+            while len(self._files) > self.max_open_files:
+                evicted.append(self._files.popitem(last=False)[1])
+        for old in evicted:
+            self._close_handle(old)
+        return handle
+
+    def _close_handle(self, handle: _SessionFile) -> None:
+        with handle.lock:
+            if handle.closed:
+                return
+            if handle.dirty:
+                os.fsync(handle.fd)
+            os.close(handle.fd)
+            handle.closed = True
+
+    # --- Écriture ---
+
+    def append(self, session_id: str, kind: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        if self._closed:
+            raise RuntimeError("Event log is closed")
+        while True:
+            handle = self._handle(session_id)
+            with handle.lock:
+                if handle.closed:
+                    # Evicted between lookup and lock: reopen
+                    continue
+                fcntl.flock(handle.fd, fcntl.LOCK_EX)
+                try:
+                    size = os.fstat(handle.fd).st_size
+                    if size != handle.end:
+                        # Another writer appended (or first use): read its last event
+                        size = self._resync(handle, size)
+                    event = {'seq': handle.seq + 1, 'type': kind, 'ts': time.time(), 'data': data}
+                    line = (json.dumps(event, ensure_ascii=False) + '\n').encode('utf-8')
+                    os.write(handle.fd, line)
+                    handle.seq += 1
+                    handle.end = size + len(line)
+                    handle.dirty = True
+                finally:
+                    fcntl.flock(handle.fd, fcntl.LOCK_UN)
+            self._positions[session_id] = (handle.seq, handle.end)
+            return event
+
+    @staticmethod
+    def _resync(handle: _SessionFile, size: int) -> int:
+        start = max(0, size - TAIL_BLOCK)
+        tail = os.pread(handle.fd, size - start, start)
+        last_newline = tail.rfind(b'\n')
+        if start and tail.rfind(b'\n', 0, max(last_newline, 0)) < 0:
+            # Last event larger than the tail block: read the whole file
+            start, tail = 0, os.pread(handle.fd, size, 0)
+            last_newline = tail.rfind(b'\n')
+        complete = last_newline + 1
+        if start + complete < size:
+            # Torn write at the end of the file: drop the partial line
+            logger.warning(f"Ligne incomplète supprimée en fin de journal ({size - start - complete} octets)")
+            size = start + complete
+            os.ftruncate(handle.fd, size)
+        if last_newline < 0:
+            handle.seq = 0
+        else:
+            line_start = tail.rfind(b'\n', 0, last_newline) + 1
+            handle.seq = json.loads(tail[line_start:last_newline])['seq']
+        handle.end = size
+        return size
+
+    # --- Synchronisation disque ---
+
+    def _sync_loop(self) -> None:
+        while not self._stop.wait(self.fsync_interval):
+            self._sync_dirty()
+
+    def _sync_dirty(self) -> None:
+        with self._lock:
+            handles = [handle for handle in self._files.values() if handle.dirty]
+        for handle in handles:
+            with handle.lock:
+                if handle.dirty and not handle.closed:
+                    os.fsync(handle.fd)
+                    handle.dirty = False
+
+    def flush(self) -> None:
+        """Synchronise immédiatement sur disque tous les ajouts en attente."""
+        self._sync_dirty()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._stop.set()
+        self._syncer.join()
+        with self._lock:
+            handles = list(self._files.values())
+            self._files.clear()
+        for handle in handles:
+            self._close_handle(handle)
+
+    # --- Lecture ---
+
+    def replay(self, session_id: str, after_seq: int = 0) -> Iterator[Dict[str, Any]]:
+        path = self._path(session_id)
+        if not os.path.exists(path):
+            return
+        hint = self._positions.get(session_id)
+        offset = hint[1] if hint is not None and hint[0] <= after_seq else 0
+        seq = None
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                offset += len(line)
+                event = json.loads(line)
+                seq = event['seq']
+                if seq > after_seq:
+                    yield event
+        if seq is not None:
+            self._positions[session_id] = (seq, offset)
+
+    def save_snapshot(self, session_id: str, seq: int, state: Dict[str, Any]) -> None:
+        """Écrit l'instantané de façon atomique (fichier temporaire puis renommage)."""
+        path = self._path(session_id, SNAPSHOT_SUFFIX)
+        hint = self._positions.get(session_id)
+        snapshot = {'seq': seq, 'offset': hint[1] if hint is not None and hint[0] == seq else 0,
+                    'state': state}
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def load_snapshot(self, session_id: str) -> Optional[Dict[str, Any]]:
+        path = self._path(session_id, SNAPSHOT_SUFFIX)
+        try:
+            with open(path, encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Instantané illisible pour la session {session_id}, relecture complète: {e}")
+            return None
+        if snapshot.get('offset'):
+            self._positions.setdefault(session_id, (snapshot['seq'], snapshot['offset']))
+        return snapshot
+
+    def sessions(self) -> List[str]:
+        return sorted(name[:-len(LOG_SUFFIX)] for name in os.listdir(self.directory)
+                      if name.endswith(LOG_SUFFIX))
@@ -6,65 +6,297 @@ Description: Ce module permet l'exécution sécurisée de scripts Python
              avec capture des erreurs, timeout et isolation.
 """
 
-import sys
-import io
 import traceback
 import time
-from contextlib import redirect_stdout, redirect_stderr
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Tuple, Optional
 import psutil
 import os
+import marshal
+import asyncio
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Iterable, List, Union
+
+from src.capture import OutputCallback, OutputCapture, capture_output
+from src.code_cache import CodeCache
+from src.utils import code_hash
+from src.execution_result import ExceptionInfo, ExecutionResult
+from src.history import ExecutionHistory
+from src.history_store import HistoryStore
+from src.sandbox import DEFAULT_POLICY, SandboxPolicy
+from src.profiler import RunProfiler
+from src.result_cache import ResultCache
+from src.session import ExecutionSession
+from src.static_analysis import PreflightReport, StaticAnalyzer
+from src.limits import (Deadline, ExecutionInterrupted, memory_rlimit, peak_rss_mb,
+                        reset_peak_rss, set_cpu_rlimit)
+from src.worker_pool import WorkerPool, emit
+
+BACKENDS = ('inprocess', 'pool')
+# Delay granted to a pool worker past `timeout` before the parent kills it.
+KILL_GRACE = 1.0
+# Executor threads for the async API when running in-process
+INPROCESS_ASYNC_THREADS = 4
 
 class ExecutionEngine:
-    def __init__(self, timeout: int = 10, max_memory_mb: int = 100):
+    def __init__(self, timeout: int = 10, max_memory_mb: int = 100,
+                 backend: str = 'inprocess', workers: Optional[int] = None,
+                 cpu_time_limit: Optional[float] = None,
+                 code_cache_size: int = 1024, code_cache_dir: Optional[str] = None,
+                 sandbox_policy: Optional[SandboxPolicy] = None,
+                 history_size: int = 100, max_output_bytes: Optional[int] = 1_000_000,
+                 history_store: Optional[HistoryStore] = None,
+                 preflight: bool = False, result_cache_size: int = 0,
+                 result_cache_ttl: Optional[float] = 300.0):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}")
         self.timeout = timeout
         self.max_memory_mb = max_memory_mb
-        self.execution_history = []
-        
-    def execute_code(self, code: str, user_input: str = "") -> Dict[str, Any]:
-        result = {
-            'success': False,
-            'output': '',
-            'error': '',
-            'execution_time': 0.0,
-            'memory_used': 0.0,
-            'traceback': '',
-            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
-        }
+        self.cpu_time_limit = cpu_time_limit
+        self.max_output_bytes = max_output_bytes
+        self.backend = backend
+        # Restricted builtins are computed once per policy, not once per run
+        self.sandbox_policy = sandbox_policy or DEFAULT_POLICY
+        self.execution_history = ExecutionHistory(capacity=history_size)
+        # Optional persistent backend; writes are queued, never done inline
+        self.history_store = history_store
+        self.code_cache = CodeCache(maxsize=code_cache_size, cache_dir=code_cache_dir)
+        # Static pre-flight: reject code that is certain to fail before running it
+        self.preflight = preflight
+        self.static_analyzer = StaticAnalyzer(self.sandbox_policy, cache_size=code_cache_size)
+        # Opt-in memoization of deterministic submissions (0 disables it)
+        self.result_cache = ResultCache(result_cache_size, result_cache_ttl) if result_cache_size else None
+        # --- OPT-IN BACKEND: pre-forked warm workers ---
+        # Workers are forked from this engine, so they share its configuration.
+        # Each worker enforces max_memory_mb with a hard RLIMIT_AS and is
+        # recycled after a MemoryError so its heap starts clean again.
+        self.pool = WorkerPool(self._run_in_worker, size=workers,
+                               recycle=_is_memory_error) if backend == 'pool' else None
+        self._executor = None
+
+    def execute_code(self, code: str, user_input: str = "",
+                     timeout: Optional[float] = None,
+                     on_output: Optional[OutputCallback] = None,
+                     profile: bool = False) -> ExecutionResult:
+        """
+        Exécute `code` et retourne le dictionnaire résultat.
+        `timeout` remplace ponctuellement `self.timeout` pour cet appel.
+        `on_output(stream, text)` reçoit la sortie au fil de l'exécution.
+        `profile` remplit `result.profile` (temps CPU, pic d'allocations,
+        lignes chaudes) ; un tel appel ne passe jamais par le cache de résultats.
+        """
+        timeout = timeout or self.timeout
+        cache_key = None
+        if self.result_cache is not None and on_output is None and not profile:
+            digest = code_hash(code)
+            if self.result_cache.is_memoizable(digest, code):
+                cache_key = (digest, user_input, self.sandbox_policy.fingerprint)
+                result = self.result_cache.get(cache_key)
+                if result is not None:
+                    self._save_to_history(code, result)
+                    return result
+        result = self._execute(code, user_input, timeout, on_output, profile)
+        if cache_key is not None:
+            self.result_cache.put(cache_key, result)
+        self._save_to_history(code, result)
+        return result
+
+    def _execute(self, code: str, user_input: str, timeout: float,
+                 on_output: Optional[OutputCallback], profile: bool = False) -> ExecutionResult:
+        report = None
+        if self.preflight:
+            report = self.static_analyzer.analyze(code)
+            if not report.ok:
+                return report.to_result()
+        result = self._dispatch(code, user_input, timeout, on_output, profile)
+        if report is not None and report.issues:
+            result.preflight = [issue.to_dict() for issue in report.issues]
+        return result
+
+    def _dispatch(self, code: str, user_input: str, timeout: float,
+                  on_output: Optional[OutputCallback], profile: bool) -> ExecutionResult:
+        if self.pool is not None:
+            # Compile (or hit the cache) here and ship the marshalled code object,
+            # so workers never recompile and the cache stats stay in one place.
+            try:
+                blob = self.code_cache.dumps(code)
+            except ValueError:
+                blob = None
+            on_message = (lambda chunk: on_output(*chunk)) if on_output else None
+            return self.pool.submit(code, user_input, blob, timeout, on_output is not None, profile,
+                                    timeout=timeout + KILL_GRACE, on_message=on_message)
+        return self._run(code, user_input, timeout=timeout, on_output=on_output, profile=profile)
+
+    def create_session(self, session_id: Optional[str] = None,
+                       rollback_on_error: bool = True) -> ExecutionSession:
+        """
+        Ouvre une session dont l'espace de noms persiste entre les cellules.
+        Les cellules s'exécutent dans ce processus, même avec le backend 'pool'.
+        """
+        return ExecutionSession(self, session_id, rollback_on_error)
+
+    # --- ASYNC API ---
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            workers = self.pool.size if self.pool is not None else INPROCESS_ASYNC_THREADS
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='execution-engine')
+        return self._executor
+
+    async def execute_code_async(self, code: str, user_input: str = "",
+                                 timeout: Optional[float] = None) -> ExecutionResult:
+        """Version asynchrone de `execute_code` : n'occupe pas la boucle d'événements."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), self.execute_code, code, user_input, timeout)
+
+    async def execute_code_stream(self, code: str, user_input: str = "",
+                                  timeout: Optional[float] = None) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Exécute `code` en diffusant sa sortie : produit des `(flux, texte)` au
+        fur et à mesure des écritures, puis `('result', ExecutionResult)`.
+        Une erreur interne du moteur est relancée dans l'itération.
+        """
+        loop = asyncio.get_running_loop()
+        chunks: "asyncio.Queue[Optional[Tuple[str, Any]]]" = asyncio.Queue()
+
+        def on_output(stream, text):
+            loop.call_soon_threadsafe(chunks.put_nowait, (stream, text))
+
+        def run():
+            try:
+                return self.execute_code(code, user_input, timeout, on_output)
+            finally:
+                # End marker, queued after every chunk even if execute_code raised
+                loop.call_soon_threadsafe(chunks.put_nowait, None)
+
+        future = loop.run_in_executor(self._get_executor(), run)
+        while True:
+            item = await chunks.get()
+            if item is None:
+                break
+            yield item
+        yield ('result', await future)
+
+    async def execute_many(self, codes: Iterable[Union[str, Tuple[str, str]]], concurrency: int = 8,
+                           timeout: Optional[float] = None) -> AsyncIterator[Tuple[int, ExecutionResult]]:
+        """
+        Exécute un lot de soumissions et produit les `(index, résultat)` dans
+        l'ordre où ils se terminent. Au plus `concurrency` soumissions sont en
+        vol à la fois ; `timeout` s'applique à chaque soumission.
+
+        Chaque élément de `codes` est soit le code, soit un tuple `(code, user_input)`.
+        """
+        items = iter(enumerate(codes))
+        done: "asyncio.Queue[Optional[Tuple[int, ExecutionResult]]]" = asyncio.Queue()
+
+        async def run_one(index, item):
+            code, user_input = (item, "") if isinstance(item, str) else item
+            item_timeout = timeout or self.timeout
+            try:
+                # The engine enforces item_timeout itself; wait_for is the backstop
+                result = await asyncio.wait_for(
+                    self.execute_code_async(code, user_input, item_timeout),
+                    item_timeout + KILL_GRACE + 1)
+            except asyncio.TimeoutError:
+                result = ExecutionResult()
+                result.error = f"TimeoutError: Timeout: {item_timeout}s exceeded"
+            return index, result
+
+        async def feeder():
+            try:
+                for index, item in items:
+                    done.put_nowait(await run_one(index, item))
+            finally:
+                done.put_nowait(None)
+
+        feeders = [asyncio.create_task(feeder()) for _ in range(max(1, concurrency))]
+        try:
+            running = len(feeders)
+            while running:
+                item = await done.get()
+                if item is None:
+                    running -= 1
+                else:
+                    yield item
+            await asyncio.gather(*feeders)
+        finally:
+            for task in feeders:
+                task.cancel()
+
+    def close(self):
+        """Arrête les workers du pool, l'exécuteur asynchrone et l'historique persistant."""
+        if self.pool is not None:
+            self.pool.close()
+        if self.history_store is not None:
+            self.history_store.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _run_in_worker(self, code: str, user_input: str = "", blob: Optional[bytes] = None,
+                       timeout: Optional[float] = None, stream: bool = False,
+                       profile: bool = False) -> ExecutionResult:
+        # Kernel backstop in case the code is stuck where signals can't reach it
+        set_cpu_rlimit(self.cpu_time_limit or timeout or self.timeout)
+        reset_peak_rss()
+        compiled_code = marshal.loads(blob) if blob is not None else None
+        with memory_rlimit(self.max_memory_mb):
+            result = self._run(code, user_input, compiled_code, timeout,
+                               on_output=(lambda name, text: emit((name, text))) if stream else None,
+                               profile=profile)
+        result.peak_memory_mb = peak_rss_mb()
+        return result
+
+    def _run(self, code: str, user_input: str = "", compiled_code=None,
+             timeout: Optional[float] = None,
+             on_output: Optional[OutputCallback] = None,
+             exec_globals: Optional[Dict[str, Any]] = None,
+             profile: bool = False) -> ExecutionResult:
+        timeout = timeout or self.timeout
+        result = ExecutionResult()
+        # Profiling is opt-in: when off, the run only pays for a nullcontext
+        profiler = RunProfiler() if profile else None
         
-        stdout_capture = io.StringIO()
-        stderr_capture = io.StringIO()
-        start_time = time.time()
+        stdout_capture = OutputCapture(self.max_output_bytes, on_output, 'stdout')
+        stderr_capture = OutputCapture(self.max_output_bytes, on_output, 'stderr')
+        start_time = time.perf_counter()
         process = psutil.Process(os.getpid())
         initial_memory = process.memory_info().rss / 1024 / 1024 
         
         try:
             # --- SECURITY LAYER: Restricted Globals ---
-            # We remove dangerous builtins like __import__, open, eval
-            safe_builtins = __builtins__.copy() if isinstance(__builtins__, dict) else vars(__builtins__).copy()
-            dangerous_funcs = ['__import__', 'open', 'exit', 'quit', 'help', 'copyright']
-            for func in dangerous_funcs:
-                safe_builtins.pop(func, None)
-
-            exec_globals = {
-                '__builtins__': safe_builtins,
-                '__name__': '__main__',
-            }
+            # Dangerous builtins (__import__, open, ...) are left out by the policy;
+            # each run gets its own shallow copy of the precomputed namespace,
+            # unless a session passes in its persistent one.
+            if exec_globals is None:
+                exec_globals = {
+                    '__builtins__': self.sandbox_policy.builtins_view(),
+                    '__name__': '__main__',
+                }
             
             if user_input:
                 exec_globals['input'] = lambda prompt='': user_input
             
-            with redirect_stdout(stdout_capture), redirect_stderr(stderr_capture):
+            with capture_output(stdout_capture, stderr_capture):
                 # 1. Compile first to catch SyntaxErrors explicitly
-                compiled_code = compile(code, '<string>', 'exec')
+                if compiled_code is None:
+                    compiled_code = self.code_cache.compile(code)
                 
-                # 2. Execute
-                exec(compiled_code, exec_globals)
+                # 2. Execute under preemptive wall-clock / CPU limits
+                # The profiler wraps the deadline so an interrupt never lands in its teardown
+                with profiler or nullcontext(), Deadline(timeout, self.cpu_time_limit):
+                    exec(compiled_code, exec_globals)
             
             # --- POST-EXECUTION CHECKS ---
-            execution_time = time.time() - start_time
-            if execution_time > self.timeout:
-                raise TimeoutError(f"Timeout: {self.timeout}s exceeded")
+            execution_time = time.perf_counter() - start_time
+            if execution_time > timeout:
+                raise TimeoutError(f"Timeout: {timeout}s exceeded")
             
             final_memory = process.memory_info().rss / 1024 / 1024
             memory_used = final_memory - initial_memory
@@ -72,52 +304,92 @@ class ExecutionEngine:
             if memory_used > self.max_memory_mb:
                 raise MemoryError(f"Memory Limit Exceeded")
 
-            result['success'] = True
-            result['output'] = stdout_capture.getvalue()
-            result['execution_time'] = execution_time
-            result['memory_used'] = memory_used
+            result.success = True
+            result.output = stdout_capture.getvalue()
+            result.execution_time = execution_time
+            result.memory_used = memory_used
             
+        except ExecutionInterrupted as e:
+            if e.limit_kind == 'cpu':
+                message = f"CPU time limit {self.cpu_time_limit}s exceeded"
+            else:
+                message = f"Timeout: {timeout}s exceeded"
+            result.error = f"TimeoutError: {message}"
+            result.exception = ExceptionInfo.from_exception(e, 'TimeoutError', message)
+            result.execution_time = time.perf_counter() - start_time
+            result.traceback = traceback.format_exc()
+        except MemoryError as e:
+            message = str(e) or f'Memory limit of {self.max_memory_mb}MB exceeded'
+            result.error = f"MemoryError: {message}"
+            result.exception = ExceptionInfo.from_exception(e, message=message)
+            result.traceback = traceback.format_exc()
         except SyntaxError as e:
-            result['error'] = f"SyntaxError: {str(e)}"
-            result['traceback'] = traceback.format_exc()
-        except ImportError:
-            result['error'] = "ImportError: Import operations are restricted for security."
-            result['traceback'] = "Security Restriction"
+            result.error = f"SyntaxError: {str(e)}"
+            result.exception = ExceptionInfo.from_exception(e, message=e.msg)
+            result.traceback = traceback.format_exc()
+        except ImportError as e:
+            message = "Import operations are restricted for security."
+            result.error = f"ImportError: {message}"
+            result.exception = ExceptionInfo.from_exception(e, 'ImportError', message)
+            result.traceback = "Security Restriction"
         except NameError as e:
             # Special case for forbidden builtins which appear as NameError when removed
-            if any(forbidden in str(e) for forbidden in ['open', '__import__']):
-                result['error'] = f"SecurityError: Restricted function call: {str(e)}"
+            if self.sandbox_policy.is_denied(getattr(e, 'name', None)):
+                message = f"Restricted function call: {str(e)}"
+                result.error = f"SecurityError: {message}"
+                result.exception = ExceptionInfo.from_exception(e, 'SecurityError', message)
             else:
-                result['error'] = f"NameError: {str(e)}"
-            result['traceback'] = traceback.format_exc()
+                result.error = f"NameError: {str(e)}"
+                result.exception = ExceptionInfo.from_exception(e)
+            result.traceback = traceback.format_exc()
         except Exception as e:
-            result['error'] = f"{type(e).__name__}: {str(e)}"
-            result['traceback'] = traceback.format_exc()
+            result.error = f"{type(e).__name__}: {str(e)}"
+            result.exception = ExceptionInfo.from_exception(e)
+            result.traceback = traceback.format_exc()
         finally:
+            if profiler is not None:
+                result.profile = profiler.profile
+            result.output_truncated = stdout_capture.truncated or stderr_capture.truncated
             stderr_output = stderr_capture.getvalue()
             if stderr_output:
-                result['output'] += f"\n[STDERR]\n{stderr_output}"
+                result.output += f"\n[STDERR]\n{stderr_output}"
         
-        self._save_to_history(code, result)
         return result
     
     def _save_to_history(self, code: str, result: Dict[str, Any]):
-        history_entry = {'code': code[:100], 'result': result}
-        self.execution_history.append(history_entry)
-        if len(self.execution_history) > 50: self.execution_history.pop(0)
+        result = ExecutionResult.from_dict(result)
+        result.code_preview = code[:100]
+        self.execution_history.append(result)
+        if self.history_store is not None:
+            self.history_store.record(code, result)
+
+    def get_history(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Retourne les `limit` dernières exécutions (la plus récente en dernier)."""
+        return [{'code': r.code_preview, 'result': r} for r in self.execution_history.latest(limit)]
 
     def validate_code(self, code: str) -> Tuple[bool, str]:
         try:
-            compile(code, '<string>', 'exec')
+            self.code_cache.compile(code)
             return True, "Valid"
         except SyntaxError as e:
             return False, str(e)
 
+    def preflight_check(self, code: str) -> PreflightReport:
+        """Analyse statique seule : builtins interdits, imports et noms indéfinis."""
+        return self.static_analyzer.analyze(code)
+
     def get_stats(self) -> Dict[str, Any]:
-        total = len(self.execution_history)
-        if total == 0: return {'total_executions': 0}
-        successes = sum(1 for e in self.execution_history if e['result']['success'])
-        return {
-            'total_executions': total,
-            'success_rate': (successes / total) * 100
-        }
+        # O(1): counters are maintained incrementally by ExecutionHistory
+        stats = self.execution_history.stats()
+        stats['code_cache'] = self.code_cache.stats()
+        if self.preflight:
+            stats['preflight_cache'] = self.static_analyzer.stats()
+        if self.result_cache is not None:
+            stats['result_cache'] = self.result_cache.stats()
+        if self.pool is not None:
+            stats['pool'] = self.pool.stats()
+        return stats
+
+
+def _is_memory_error(result: ExecutionResult) -> bool:
+    return result.error.startswith('MemoryError')
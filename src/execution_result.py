@@ -0,0 +1,233 @@
+"""
+Module: Résultat d'exécution
+Description: Enregistrement compact (__slots__) retourné par `execute_code`
+             et conservé dans l'historique. Il reste utilisable comme un
+             dictionnaire (`result['success']`, `result.get('error')`,
+             `result['cle'] = valeur`, `dict(result)`) pour la compatibilité
+             avec le code existant.
+
+Ce n'est pas une sous-classe de `dict` : `isinstance(result, dict)` est
+faux et `json.dumps` attend `result.to_dict()`.
+"""
+
+import time
+import traceback as tb_module
+from collections.abc import Mapping, MutableMapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+# Nom de fichier sous lequel le moteur compile le code utilisateur
+USER_FILENAME = '<string>'
+
+
+class FrameInfo:
+    """
+    Position d'un cadre du code utilisateur.
+
+    Les colonnes (3.11+) sont des décalages en octets UTF-8 à partir de 0,
+    comme les positions des objets code.
+    """
+
+    __slots__ = ('name', 'lineno', 'end_lineno', 'colno', 'end_colno')
+
+    def __init__(self, name: str, lineno: Optional[int], end_lineno: Optional[int] = None,
+                 colno: Optional[int] = None, end_colno: Optional[int] = None):
+        self.name = name
+        self.lineno = lineno
+        self.end_lineno = end_lineno
+        self.colno = colno
+        self.end_colno = end_colno
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "FrameInfo":
+        return cls(data.get('name', '<module>'), data.get('lineno'), data.get('end_lineno'),
+                   data.get('colno'), data.get('end_colno'))
+
+    def __repr__(self):
+        return f"<FrameInfo {self.name} line {self.lineno}>"
+
+
+class ExceptionInfo:
+    """
+    Métadonnées structurées d'une exception levée par le code utilisateur.
+
+    `type` est le type affiché dans `error` (ex: 'SecurityError' pour un
+    builtin interdit), `qualname` le nom qualifié de la classe réellement
+    levée et `mro` ses classes parentes. `frames` ne contient que les cadres
+    du code utilisateur, du plus externe au plus interne.
+    """
+
+    __slots__ = ('type', 'qualname', 'message', 'mro', 'frames')
+
+    def __init__(self, type: str, qualname: str, message: str,
+                 mro: Tuple[str, ...] = (), frames: Tuple[FrameInfo, ...] = ()):
+        self.type = type
+        self.qualname = qualname
+        self.message = message
+        self.mro = mro
+        self.frames = frames
+
+    @property
+    def lineno(self) -> Optional[int]:
+        """Ligne du cadre utilisateur le plus interne (là où l'erreur s'est produite)."""
+        return self.frames[-1].lineno if self.frames else None
+
+    @classmethod
+    def from_exception(cls, exc: BaseException, type_name: Optional[str] = None,
+                       message: Optional[str] = None) -> "ExceptionInfo":
+        exc_type = type(exc)
+        qualname = exc_type.__qualname__
+        if exc_type.__module__ not in ('builtins', '__main__'):
+            qualname = f"{exc_type.__module__}.{qualname}"
+        mro = tuple(klass.__name__ for klass in exc_type.__mro__ if issubclass(klass, BaseException))
+        return cls(type=type_name or exc_type.__name__, qualname=qualname,
+                   message=str(exc) if message is None else message,
+                   mro=mro, frames=_user_frames(exc))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'type': self.type, 'qualname': self.qualname, 'message': self.message,
+                'mro': list(self.mro), 'frames': [frame.to_dict() for frame in self.frames]}
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "ExceptionInfo":
+        """Reconstruit l'enregistrement produit par `to_dict` (ex: après un passage par JSON)."""
+        return cls(type=data['type'], qualname=data.get('qualname', data['type']),
+                   message=data.get('message', ''), mro=tuple(data.get('mro', ())),
+                   frames=tuple(FrameInfo.from_dict(frame) for frame in data.get('frames', ())))
+
+    def __repr__(self):
+        return f"<ExceptionInfo {self.type} line {self.lineno}>"
+
+
+def as_exception_info(value: Any) -> Optional[ExceptionInfo]:
+    """`ExceptionInfo` d'un résultat, qu'il soit structuré ou sérialisé en dictionnaire."""
+    if value is None or isinstance(value, ExceptionInfo):
+        return value
+    return ExceptionInfo.from_dict(value)
+
+
+def _user_frames(exc: BaseException) -> Tuple[FrameInfo, ...]:
+    if isinstance(exc, SyntaxError):
+        if exc.filename != USER_FILENAME:
+            return ()
+        return (FrameInfo('<module>', exc.lineno, exc.end_lineno,
+                          _byte_offset(exc.text, exc.offset), _byte_offset(exc.text, exc.end_offset)),)
+    return tuple(
+        FrameInfo(frame.name, frame.lineno, getattr(frame, 'end_lineno', None),
+                  getattr(frame, 'colno', None), getattr(frame, 'end_colno', None))
+        for frame in tb_module.extract_tb(exc.__traceback__)
+        if frame.filename == USER_FILENAME
+    )
+
+
+def _byte_offset(text: Optional[str], offset: Optional[int]) -> Optional[int]:
+    """Convertit un décalage SyntaxError (caractères, à partir de 1) en octets à partir de 0."""
+    if text is None or not offset or offset < 1:
+        return None
+    return len(text[:offset - 1].encode('utf-8', 'surrogatepass'))
+
+
+class ExecutionResult(MutableMapping):
+    """
+    Résultat d'une exécution.
+
+    L'horodatage est conservé en secondes epoch (`created_at`) et n'est mis en
+    forme que lorsqu'on lit la clé `timestamp`. Les clés ajoutées par
+    l'appelant (`result['note'] = ...`) sont rangées à part, dans un
+    dictionnaire créé seulement au premier ajout.
+    """
+
+    __slots__ = ('success', 'output', 'error', 'execution_time', 'memory_used',
+                 'traceback', 'created_at', 'peak_memory_mb', 'output_truncated', 'exception',
+                 'preflight', 'cached', 'profile', 'code_preview', '_extra')
+
+    # Clés exposées par l'interface dictionnaire, dans l'ordre historique
+    KEYS = ('success', 'output', 'error', 'execution_time', 'memory_used',
+            'traceback', 'timestamp', 'peak_memory_mb', 'output_truncated', 'exception',
+            'preflight', 'cached', 'profile')
+    _KEY_SET = frozenset(KEYS)
+
+    def __init__(self, success: bool = False, output: str = '', error: str = '',
+                 execution_time: float = 0.0, memory_used: float = 0.0, traceback: str = '',
+                 created_at: Optional[float] = None, peak_memory_mb: Optional[float] = None,
+                 output_truncated: bool = False, exception: Optional[ExceptionInfo] = None,
+                 preflight: Optional[List[Dict[str, Any]]] = None, cached: bool = False,
+                 profile: Optional[Dict[str, Any]] = None):
+        self.success = success
+        self.output = output
+        self.error = error
+        self.execution_time = execution_time
+        self.memory_used = memory_used
+        self.traceback = traceback
+        self.created_at = time.time() if created_at is None else created_at
+        self.peak_memory_mb = peak_memory_mb
+        self.output_truncated = output_truncated
+        self.exception = exception
+        self.preflight = preflight
+        self.cached = cached
+        self.profile = profile
+        self.code_preview = None
+        self._extra: Optional[Dict[str, Any]] = None
+
+    @property
+    def timestamp(self) -> str:
+        return time.strftime(TIMESTAMP_FORMAT, time.localtime(self.created_at))
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "ExecutionResult":
+        """Construit un résultat à partir d'un dictionnaire (clés supplémentaires conservées)."""
+        if isinstance(data, cls):
+            return data
+        result = cls()
+        for key, value in data.items():
+            result[key] = value
+        result.exception = as_exception_info(result.exception)
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Copie sous forme de dictionnaire sérialisable en JSON."""
+        data = {key: self[key] for key in self}
+        if self.exception is not None:
+            data['exception'] = self.exception.to_dict()
+        return data
+
+    # --- Interface dictionnaire ---
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._KEY_SET:
+            return getattr(self, key)
+        if self._extra is not None:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in self._KEY_SET:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+        elif key == 'timestamp':
+            self.created_at = time.mktime(time.strptime(value, TIMESTAMP_FORMAT)) if value else time.time()
+        else:
+            setattr(self, key, value)
+
+    def __delitem__(self, key: str) -> None:
+        if key in self._KEY_SET:
+            raise TypeError(f"Result field '{key}' cannot be deleted")
+        if self._extra is None:
+            raise KeyError(key)
+        del self._extra[key]
+
+    def __iter__(self) -> Iterator[str]:
+        if not self._extra:
+            return iter(self.KEYS)
+        return iter(self.KEYS + tuple(self._extra))
+
+    def __len__(self) -> int:
+        return len(self.KEYS) + (len(self._extra) if self._extra else 0)
+
+    def __repr__(self):
+        status = 'success' if self.success else repr(self.error)
+        return f"<ExecutionResult {status} in {self.execution_time:.4f}s at {self.timestamp}>"
@@ -0,0 +1,123 @@
+"""
+Module: Empreintes d'erreurs
+Description: Regroupe les erreurs identiques venant de soumissions
+             différentes. L'empreinte combine le type d'erreur, le cadre
+             fautif et le message normalisé (littéraux retirés) ; chaque
+             groupe ne conserve qu'un compteur, les dates de première et
+             dernière occurrence et quelques identifiants de soumission.
+"""
+
+import hashlib
+import heapq
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Littéraux remplacés avant hachage, dans cet ordre (les chaînes d'abord pour
+# que les nombres qu'elles contiennent ne soient pas traités séparément).
+_LITERALS = (
+    (re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\""), "<str>"),
+    (re.compile(r"\b0x[0-9a-fA-F]+\b"), "<addr>"),
+    (re.compile(r"(?<![\w.])[-+]?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b"), "<num>"),
+)
+
+
+def normalize_message(message: str) -> str:
+    """Message sans littéraux : "name 'x' is not defined" -> "name <str> is not defined"."""
+    for pattern, placeholder in _LITERALS:
+        message = pattern.sub(placeholder, message)
+    return message.strip()
+
+
+def fingerprint(error_type: str, message: str, frame: Optional[str] = None,
+                lineno: Optional[int] = None) -> str:
+    """Empreinte (hex, 16 caractères) du type, du cadre fautif et du message normalisé."""
+    key = f"{error_type}\x00{frame or ''}:{lineno if lineno is not None else ''}\x00{normalize_message(message)}"
+    return hashlib.blake2b(key.encode('utf-8', 'surrogatepass'), digest_size=8).hexdigest()
+
+
+class ErrorGroup:
+    """Ensemble des occurrences d'une même erreur."""
+
+    __slots__ = ('fingerprint', 'error_type', 'message', 'frame', 'lineno',
+                 'count', 'first_seen', 'last_seen', 'samples')
+
+    def __init__(self, fingerprint: str, error_type: str, message: str, frame: Optional[str],
+                 lineno: Optional[int], timestamp: float, sample_size: int):
+        self.fingerprint = fingerprint
+        self.error_type = error_type
+        self.message = message
+        self.frame = frame
+        self.lineno = lineno
+        self.count = 0
+        self.first_seen = timestamp
+        self.last_seen = timestamp
+        self.samples: deque = deque(maxlen=sample_size)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {slot: getattr(self, slot) for slot in self.__slots__}
+        data['samples'] = list(self.samples)
+        return data
+
+    def __repr__(self):
+        return f"<ErrorGroup {self.error_type} x{self.count} {self.fingerprint}>"
+
+
+class ErrorGroups:
+    """
+    Index des groupes d'erreurs par empreinte.
+
+    La mémoire croît avec le nombre d'erreurs distinctes, pas avec le nombre
+    de soumissions. `sample_size` borne les identifiants de soumission
+    conservés par groupe (les premiers reçus sont gardés).
+    """
+
+    def __init__(self, sample_size: int = 5):
+        self.sample_size = sample_size
+        self._groups: Dict[str, ErrorGroup] = {}
+        self._lock = threading.Lock()
+
+    def add(self, error_type: str, message: str, frame: Optional[str] = None,
+            lineno: Optional[int] = None, submission_id: Optional[Any] = None,
+            timestamp: Optional[float] = None) -> Tuple[ErrorGroup, bool]:
+        """Enregistre une occurrence ; retourne son groupe et True si le groupe est nouveau."""
+        key = fingerprint(error_type, message, frame, lineno)
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            group = self._groups.get(key)
+            created = group is None
+            if created:
+                group = self._groups[key] = ErrorGroup(key, error_type, normalize_message(message),
+                                                       frame, lineno, timestamp, self.sample_size)
+            group.count += 1
+            group.first_seen = min(group.first_seen, timestamp)
+            group.last_seen = max(group.last_seen, timestamp)
+            if submission_id is not None and len(group.samples) < self.sample_size:
+                group.samples.append(submission_id)
+        return group, created
+
+    def get(self, key: str) -> Optional[ErrorGroup]:
+        return self._groups.get(key)
+
+    def top(self, n: int = 10) -> List[ErrorGroup]:
+        """Les `n` groupes les plus fréquents."""
+        with self._lock:
+            return heapq.nlargest(n, self._groups.values(), key=lambda group: group.count)
+
+    def total(self) -> int:
+        """Nombre total d'occurrences enregistrées."""
+        with self._lock:
+            return sum(group.count for group in self._groups.values())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._groups.clear()
+
+    def __len__(self) -> int:
+        return len(self._groups)
+
+    def __iter__(self) -> Iterator[ErrorGroup]:
+        with self._lock:
+            return iter(list(self._groups.values()))
@@ -0,0 +1,132 @@
+"""
+Module: Historique des exécutions
+Description: Tampon circulaire de capacité fixe pour les dernières exécutions
+             et statistiques cumulées, tenues à jour à chaque insertion pour
+             que `get_stats` reste O(1) quel que soit le volume traité.
+"""
+
+import math
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.execution_result import ExecutionResult
+
+
+class LatencyHistogram:
+    """
+    Histogramme à classes logarithmiques (précision relative ~`growth`),
+    pour les latences en secondes et, avec d'autres bornes, la mémoire en Mo.
+
+    Le nombre de classes est borné (≈ 450 entre 1 µs et 1 h pour 5 %), donc
+    les percentiles se calculent en temps constant par rapport au nombre de
+    valeurs enregistrées.
+    """
+
+    def __init__(self, min_value: float = 1e-6, max_value: float = 3600.0, growth: float = 1.05):
+        self.min_value = min_value
+        self._log_growth = math.log(growth)
+        self._counts = [0] * (self._index(max_value) + 2)
+        self.count = 0
+
+    def _index(self, value: float) -> int:
+        if value <= self.min_value:
+            return 0
+        return int(math.log(value / self.min_value) / self._log_growth) + 1
+
+    def add(self, value: float) -> None:
+        self._counts[min(self._index(value), len(self._counts) - 1)] += 1
+        self.count += 1
+
+    def percentile(self, pct: float) -> float:
+        """Borne supérieure de la classe contenant le percentile `pct` (0-100)."""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * pct / 100))
+        seen = 0
+        for index, bucket in enumerate(self._counts):
+            seen += bucket
+            if seen >= rank:
+                return self.min_value * math.exp(index * self._log_growth) if index else self.min_value
+        return self.min_value * math.exp((len(self._counts) - 1) * self._log_growth)
+
+
+class ExecutionHistory:
+    """
+    Historique circulaire des `capacity` dernières exécutions.
+
+    Les compteurs (total, succès, échecs par type d'erreur, sommes de temps et
+    de mémoire, histogrammes des latences et de la mémoire) couvrent toutes les exécutions
+    enregistrées depuis la création, pas seulement celles encore en mémoire.
+    """
+
+    def __init__(self, capacity: int = 100):
+        if capacity <= 0:
+            raise ValueError("History capacity must be positive")
+        self.capacity = capacity
+        self._entries: List[Optional[ExecutionResult]] = [None] * capacity
+        self._next = 0
+        self._size = 0
+        self._lock = threading.Lock()
+        self.total = 0
+        self.successes = 0
+        self.failures_by_type: Counter = Counter()
+        self.execution_time_sum = 0.0
+        self.memory_sum = 0.0
+        self.latency = LatencyHistogram()
+        self.memory = LatencyHistogram(min_value=1e-3, max_value=1e6)
+
+    def append(self, result: ExecutionResult) -> None:
+        """Ajoute un résultat en écrasant la plus ancienne entrée."""
+        execution_time = result.execution_time or 0.0
+        memory_used = result.memory_used or 0.0
+        with self._lock:
+            self._entries[self._next] = result
+            self._next = (self._next + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+            self.total += 1
+            if result.success:
+                self.successes += 1
+            else:
+                self.failures_by_type[_error_type(result)] += 1
+            self.execution_time_sum += execution_time
+            self.memory_sum += memory_used
+            self.latency.add(execution_time)
+            self.memory.add(memory_used)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[ExecutionResult]:
+        return iter(self.latest(self._size))
+
+    def latest(self, limit: int = 10) -> List[ExecutionResult]:
+        """Les `limit` entrées les plus récentes, de la plus ancienne à la plus récente."""
+        with self._lock:
+            limit = max(0, min(limit, self._size))
+            start = self._next - limit
+            return [self._entries[i % self.capacity] for i in range(start, self._next)]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            if not self.total:
+                return {'total_executions': 0}
+            return {
+                'total_executions': self.total,
+                'success_rate': (self.successes / self.total) * 100,
+                'failures_by_type': dict(self.failures_by_type),
+                'avg_execution_time': self.execution_time_sum / self.total,
+                'avg_memory_used': self.memory_sum / self.total,
+                'latency_p50': self.latency.percentile(50),
+                'latency_p95': self.latency.percentile(95),
+                'latency_p99': self.latency.percentile(99),
+                'memory_p50': self.memory.percentile(50),
+                'memory_p95': self.memory.percentile(95),
+                'memory_p99': self.memory.percentile(99),
+            }
+
+
+def _error_type(result: ExecutionResult) -> str:
+    if result.exception is not None:
+        return result.exception.type
+    return (result.error or 'UnknownError').split(':', 1)[0].strip() or 'UnknownError'
@@ -0,0 +1,231 @@
+"""
+Module: Persistance de l'historique
+Description: Conserve l'historique complet des exécutions au-delà du tampon
+             en mémoire. Les écritures sont mises en file et insérées par lots
+             dans un thread dédié pour ne pas ralentir `execute_code`.
+"""
+
+import abc
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from src.execution_result import as_exception_info
+from src.utils import code_hash
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snippets (
+    code_hash TEXT PRIMARY KEY,
+    code      TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS executions (
+    id             INTEGER PRIMARY KEY,
+    created_at     REAL NOT NULL,
+    code_hash      TEXT NOT NULL,
+    success        INTEGER NOT NULL,
+    error_type     TEXT,
+    error          TEXT,
+    execution_time REAL,
+    memory_used    REAL,
+    output         TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_executions_created_at ON executions (created_at);
+CREATE INDEX IF NOT EXISTS idx_executions_error_type ON executions (error_type, created_at);
+CREATE INDEX IF NOT EXISTS idx_executions_code_hash ON executions (code_hash, created_at);
+"""
+
+_STOP = object()
+
+
+class HistoryStore(abc.ABC):
+    """
+    Interface d'un backend de persistance de l'historique.
+
+    `record` ne doit pas bloquer : il est appelé sur le chemin critique de
+    chaque exécution.
+    """
+
+    @abc.abstractmethod
+    def record(self, code: str, result: Dict[str, Any]) -> None:
+        ...
+
+    @abc.abstractmethod
+    def query(self, error_type: Optional[str] = None, code_hash: Optional[str] = None,
+              success: Optional[bool] = None, since: Optional[float] = None,
+              until: Optional[float] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        ...
+
+    def failures(self, error_type: Optional[str] = None, last: float = 3600) -> List[Dict[str, Any]]:
+        """Échecs (d'un type donné) survenus dans les `last` dernières secondes."""
+        return self.query(error_type=error_type, success=False, since=time.time() - last)
+
+    def runs_of(self, code: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """Exécutions d'un snippet donné, de la plus récente à la plus ancienne."""
+        return self.query(code_hash=code_hash(code), limit=limit)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteHistoryStore(HistoryStore):
+    """
+    Backend SQLite (mode WAL) avec écritures asynchrones par lots.
+
+    Un thread écrivain vide la file toutes les `flush_interval` secondes ou
+    dès que `batch_size` entrées sont en attente. Les requêtes utilisent une
+    connexion par thread et profitent des index sur la date, le type
+    d'erreur et l'empreinte du code.
+    """
+
+    def __init__(self, path: str = 'logs/history.db', batch_size: int = 500,
+                 flush_interval: float = 0.5):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name='history-store-writer', daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+            conn.row_factory = sqlite3.Row
+        return conn
+
+    # --- Écriture ---
+
+    def record(self, code: str, result: Dict[str, Any]) -> None:
+        if self._closed:
+            return
+        error = result.get('error') or ''
+        exception = as_exception_info(result.get('exception'))
+        if exception is not None:
+            error_type = exception.type
+        else:
+            error_type = error.split(':', 1)[0].strip() if error else None
+        self._queue.put((
+            code,
+            code_hash(code),
+            getattr(result, 'created_at', None) or time.time(),
+            1 if result.get('success') else 0,
+            error_type,
+            error or None,
+            result.get('execution_time'),
+            result.get('memory_used'),
+            result.get('output'),
+        ))
+
+    def _write_loop(self) -> None:
+        conn = self._connect()
+        stopping = False
+        while not stopping:
+            batch, waiters = [], []
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is _STOP:
+                    stopping = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    batch.append(item)
+                if stopping or len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+            if batch:
+                self._write_batch(conn, batch)
+            for waiter in waiters:
+                waiter.set()
+        conn.close()
+
+    def _write_batch(self, conn: sqlite3.Connection, batch: List[tuple]) -> None:
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO snippets (code_hash, code) VALUES (?, ?)",
+                    [(row[1], row[0]) for row in batch])
+                conn.executemany(
+                    "INSERT INTO executions (code_hash, created_at, success, error_type, error,"
+                    " execution_time, memory_used, output) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [row[1:] for row in batch])
+        except sqlite3.Error as e:
+            logger.error(f"Échec d'écriture de {len(batch)} entrées d'historique: {e}")
+
+    def flush(self) -> None:
+        """Attend que toutes les entrées déjà enregistrées soient écrites."""
+        if self._closed:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._writer.join()
+
+    # --- Lecture ---
+
+    def query(self, error_type: Optional[str] = None, code_hash: Optional[str] = None,
+              success: Optional[bool] = None, since: Optional[float] = None,
+              until: Optional[float] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        clauses, params = [], []
+        if error_type is not None:
+            clauses.append("e.error_type = ?")
+            params.append(error_type)
+        if code_hash is not None:
+            clauses.append("e.code_hash = ?")
+            params.append(code_hash)
+        if success is not None:
+            clauses.append("e.success = ?")
+            params.append(1 if success else 0)
+        if since is not None:
+            clauses.append("e.created_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("e.created_at < ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._reader().execute(
+            f"SELECT e.*, s.code FROM executions e JOIN snippets s USING (code_hash) {where}"
+            f" ORDER BY e.created_at DESC LIMIT ?", (*params, limit)).fetchall()
+        return [_row_to_dict(row) for row in rows]
+
+    def count(self) -> int:
+        return self._reader().execute("SELECT COUNT(*) FROM executions").fetchone()[0]
+
+
+def _row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+    entry = dict(row)
+    entry['success'] = bool(entry['success'])
+    entry['timestamp'] = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry['created_at']))
+    return entry
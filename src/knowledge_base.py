@@ -0,0 +1,219 @@
+"""
+Module: Base de connaissances du Debugger
+Description: Règles de suggestion chargées depuis des fichiers JSON et
+             compilées en un index. Une règle s'applique à un type
+             d'exception et à ses sous-classes, éventuellement restreinte aux
+             messages correspondant à une expression régulière.
+"""
+
+import builtins
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Pattern, Sequence, Tuple
+
+from loguru import logger
+
+from src.utils import LRUCache
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(__file__), 'data', 'knowledge_base.json')
+DEFAULT_SUGGESTION = "Consultez la documentation Python officielle."
+# Messages d'erreur déjà résolus (ils se répètent beaucoup d'une exécution à l'autre)
+MESSAGE_CACHE_SIZE = 4096
+
+_MISSING = object()
+
+
+class Rule:
+    """Une suggestion pour un type d'exception (et un motif de message optionnel)."""
+
+    __slots__ = ('type', 'suggestion', 'pattern', 'severity', 'priority')
+
+    def __init__(self, type: str, suggestion: str, pattern: Optional[str] = None,
+                 severity: Optional[str] = None, priority: int = 0):
+        self.type = type
+        self.suggestion = suggestion
+        self.pattern = pattern
+        self.severity = severity
+        self.priority = priority
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "Rule":
+        if not data.get('type') or not data.get('suggestion'):
+            raise ValueError(f"Règle invalide (type et suggestion requis): {data!r}")
+        pattern = data.get('pattern')
+        if pattern is not None:
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                raise ValueError(f"Règle invalide (motif {pattern!r}): {e}") from e
+        return cls(type=data['type'], suggestion=data['suggestion'], pattern=pattern,
+                   severity=data.get('severity'), priority=int(data.get('priority', 0)))
+
+    def __repr__(self):
+        return f"<Rule {self.type} {self.pattern!r}>" if self.pattern else f"<Rule {self.type}>"
+
+
+class _Resolver:
+    """
+    Règles applicables à une hiérarchie de types, fusionnées en une seule regex.
+
+    Les motifs qui ne peuvent pas être fusionnés sans changer de sens (groupes
+    nommés ou numérotés, références arrière, drapeaux globaux `(?i)`) sont
+    essayés un par un, dans le même ordre.
+    """
+
+    __slots__ = ('matcher', 'patterns', 'rules', 'default', 'cache')
+
+    def __init__(self, pattern_rules: List[Rule], compiled: Dict[str, Pattern], default: Optional[Rule]):
+        self.rules = pattern_rules
+        self.default = default
+        self.matcher = None
+        self.patterns = None
+        self.cache = LRUCache(MESSAGE_CACHE_SIZE)
+        if pattern_rules:
+            self.matcher = _merge(pattern_rules, compiled)
+            if self.matcher is None:
+                self.patterns = [compiled[rule.pattern] for rule in pattern_rules]
+
+    def resolve(self, message: str) -> Optional[Rule]:
+        if not self.rules or not message:
+            return self.default
+        rule = self.cache.get(message, _MISSING)
+        if rule is _MISSING:
+            rule = self._match(message)
+            self.cache.put(message, rule)
+        return rule
+
+    def _match(self, message: str) -> Optional[Rule]:
+        if self.matcher is not None:
+            match = self.matcher.match(message)
+            return self.rules[int(match.lastgroup[1:])] if match is not None else self.default
+        for rule, pattern in zip(self.rules, self.patterns):
+            if pattern.search(message):
+                return rule
+        return self.default
+
+
+def _merge(pattern_rules: List[Rule], compiled: Dict[str, Pattern]) -> Optional[Pattern]:
+    """Regex unique équivalente aux motifs, ou None s'ils ne se fusionnent pas."""
+    if any(compiled[rule.pattern].groups for rule in pattern_rules):
+        # Group numbers and names would clash or shift once merged
+        return None
+    # Alternatives ancrées en début de message et essayées dans l'ordre :
+    # la première règle dont le motif apparaît gagne, quelle que soit sa
+    # position dans le message.
+    alternatives = '|'.join(f"(?=[\\s\\S]*?(?:{rule.pattern}))(?P<r{i}>)"
+                            for i, rule in enumerate(pattern_rules))
+    try:
+        return re.compile(alternatives)
+    except re.error:
+        # Global inline flags are only allowed at the start of a pattern
+        return None
+
+
+class _Index:
+    """Index immuable : type -> règles, plus un cache de résolution par hiérarchie."""
+
+    def __init__(self, rules: Iterable[Rule]):
+        self.by_type: Dict[str, Tuple[List[Rule], Optional[Rule]]] = {}
+        self.compiled: Dict[str, Pattern] = {}
+        ordered = sorted(rules, key=lambda rule: -rule.priority)
+        for rule in ordered:
+            pattern_rules, default = self.by_type.get(rule.type, ([], None))
+            if rule.pattern is not None:
+                if rule.pattern not in self.compiled:
+                    try:
+                        self.compiled[rule.pattern] = re.compile(rule.pattern)
+                    except re.error as e:
+                        raise ValueError(f"Règle invalide (motif {rule.pattern!r}): {e}") from e
+                pattern_rules.append(rule)
+            elif default is None:
+                default = rule
+            self.by_type[rule.type] = (pattern_rules, default)
+        self.size = len(ordered)
+        self._resolvers: Dict[Tuple[str, ...], _Resolver] = {}
+        self._lock = threading.Lock()
+
+    def resolver(self, hierarchy: Tuple[str, ...]) -> _Resolver:
+        resolver = self._resolvers.get(hierarchy)
+        if resolver is None:
+            # Les règles à motif de la classe la plus spécifique passent en
+            # premier ; la règle par défaut est celle du premier ancêtre qui en a une.
+            pattern_rules, default = [], None
+            for name in hierarchy:
+                type_rules, type_default = self.by_type.get(name, ((), None))
+                pattern_rules.extend(type_rules)
+                default = default or type_default
+            resolver = _Resolver(pattern_rules, self.compiled, default)
+            with self._lock:
+                resolver = self._resolvers.setdefault(hierarchy, resolver)
+        return resolver
+
+
+class KnowledgeBase:
+    """
+    Ensemble de règles de suggestion chargé depuis un ou plusieurs fichiers JSON.
+
+    Format d'un fichier : `{"rules": [{"type": "KeyError", "suggestion": "...",
+    "pattern": "regex optionnelle", "severity": "High", "priority": 10}]}`.
+    Pour une exception, les règles de son type puis de ses classes parentes
+    sont consultées ; à hiérarchie égale, une règle à motif qui correspond au
+    message l'emporte sur la règle générale du type.
+
+    `reload()` relit les fichiers et remplace l'index d'un bloc : les analyses
+    en cours continuent sur l'ancien index. Tous les motifs sont compilés à la
+    construction de l'index ; un motif invalide fait rejeter l'ensemble des
+    règles (`ValueError`).
+    """
+
+    def __init__(self, paths: Optional[Sequence[str]] = None, rules: Iterable[Rule] = ()):
+        self.paths = list(paths) if paths is not None else [DEFAULT_RULES_PATH]
+        self._extra_rules = list(rules)
+        self._file_rules = self._load()
+        self._index = _Index(self._file_rules + self._extra_rules)
+
+    def _load(self) -> List[Rule]:
+        rules = []
+        for path in self.paths:
+            with open(path, encoding='utf-8') as handle:
+                data = json.load(handle)
+            rules.extend(Rule.from_dict(entry) for entry in data.get('rules', []))
+        return rules
+
+    def reload(self) -> None:
+        """Relit les fichiers de règles ; en cas d'erreur, l'index actuel est conservé."""
+        self._file_rules = self._load()
+        self._index = _Index(self._file_rules + self._extra_rules)
+        logger.info(f"Base de connaissances rechargée ({len(self)} règles)")
+
+    def add_rule(self, rule: Rule) -> None:
+        """Ajoute une règle (conservée lors des rechargements) et reconstruit l'index."""
+        self._index = _Index(self._file_rules + self._extra_rules + [rule])
+        self._extra_rules.append(rule)
+
+    def lookup(self, error_type: str, message: str = '', mro: Sequence[str] = ()) -> Optional[Rule]:
+        """Règle applicable à l'exception, ou None si aucune ne correspond."""
+        return self._index.resolver(_hierarchy(error_type, mro)).resolve(message)
+
+    def suggest(self, error_type: str, message: str = '', mro: Sequence[str] = ()) -> str:
+        rule = self.lookup(error_type, message, mro)
+        return rule.suggestion if rule is not None else DEFAULT_SUGGESTION
+
+    def __len__(self) -> int:
+        return self._index.size
+
+    def __contains__(self, error_type: str) -> bool:
+        return error_type in self._index.by_type
+
+
+def _hierarchy(error_type: str, mro: Sequence[str]) -> Tuple[str, ...]:
+    if mro:
+        return (error_type,) + tuple(mro) if mro[0] != error_type else tuple(mro)
+    # Erreur connue seulement par son nom (résultat sous forme de dictionnaire) :
+    # on retrouve sa hiérarchie si c'est une exception intégrée.
+    klass = getattr(builtins, error_type, None)
+    if isinstance(klass, type) and issubclass(klass, BaseException):
+        return tuple(parent.__name__ for parent in klass.__mro__ if issubclass(parent, BaseException))
+    return (error_type,)
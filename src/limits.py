@@ -0,0 +1,268 @@
+"""
+Module: Limites d'exécution préemptives
+Description: Interrompt le code utilisateur dès que sa limite de temps réel
+             (wall-clock) ou de temps CPU est atteinte, au lieu de constater
+             le dépassement une fois l'exécution terminée.
+
+Limite connue : en mode in-process, l'interruption n'est levée qu'entre deux
+instructions Python. Un long appel C (`sum(range(10**9))`, `sorted` d'une
+très grande liste) va donc au bout avant d'être interrompu ; seul le mode
+`pool` (worker tué puis remplacé) borne strictement ces cas.
+"""
+
+import ctypes
+import signal
+import sys
+import threading
+import time
+from typing import Optional
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - plateformes sans rlimits (Windows)
+    resource = None
+
+# Intervalle de ré-armement : si le code utilisateur avale l'interruption
+# (ex: `except BaseException: pass`), elle est relevée jusqu'à sa sortie.
+REARM_INTERVAL = 0.05
+WATCHDOG_POLL = 0.01
+
+
+class ExecutionInterrupted(BaseException):
+    """
+    Levée dans le code utilisateur à l'échéance d'une limite.
+
+    Dérive de BaseException pour ne pas être capturée par un simple
+    `except Exception` dans la soumission.
+    """
+    limit_kind = 'wall'
+
+
+class WallTimeExceeded(ExecutionInterrupted):
+    limit_kind = 'wall'
+
+
+class CpuTimeExceeded(ExecutionInterrupted):
+    limit_kind = 'cpu'
+
+
+class Deadline:
+    """
+    Contexte qui arme une limite de temps réel et/ou de temps CPU.
+
+    Dans le thread principal, les limites sont portées par des timers POSIX
+    (SIGALRM / SIGPROF), ce qui interrompt aussi les appels bloquants comme
+    `time.sleep`. Dans les autres threads, un thread watchdog injecte
+    l'exception de manière asynchrone dans le thread surveillé.
+
+    Une échéance qui tombe pendant le désarmement (`__exit__`) est ignorée :
+    le bloc est déjà terminé et lever à cet endroit laisserait le timer armé.
+    """
+
+    def __init__(self, wall_time: Optional[float] = None, cpu_time: Optional[float] = None):
+        self.wall_time = wall_time if wall_time and wall_time > 0 else None
+        self.cpu_time = cpu_time if cpu_time and cpu_time > 0 else None
+        self._armed = False
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._use_signals = (
+            hasattr(signal, 'setitimer')
+            and threading.current_thread() is threading.main_thread()
+        )
+        self._old_handlers = {}
+        self._watchdog = None
+        self._thread_id = None
+
+    # --- Chemin signaux (thread principal) ---
+
+    def _on_signal(self, signum, frame):
+        if not self._armed or _in_teardown(frame):
+            return
+        if signum == signal.SIGPROF:
+            raise CpuTimeExceeded(f"CPU time limit {self.cpu_time}s exceeded")
+        raise WallTimeExceeded(f"Timeout: {self.wall_time}s exceeded")
+
+    def _arm_signals(self):
+        if self.wall_time:
+            self._old_handlers[signal.SIGALRM] = signal.signal(signal.SIGALRM, self._on_signal)
+            signal.setitimer(signal.ITIMER_REAL, self.wall_time, REARM_INTERVAL)
+        if self.cpu_time:
+            self._old_handlers[signal.SIGPROF] = signal.signal(signal.SIGPROF, self._on_signal)
+            signal.setitimer(signal.ITIMER_PROF, self.cpu_time, REARM_INTERVAL)
+
+    def _disarm_signals(self):
+        # Signaux bloqués le temps du désarmement : un SIGALRM en attente est
+        # consommé ici au lieu d'être livré au gestionnaire restauré.
+        signums = set(self._old_handlers)
+        signal.pthread_sigmask(signal.SIG_BLOCK, signums)
+        try:
+            if signal.SIGALRM in signums:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+            if signal.SIGPROF in signums:
+                signal.setitimer(signal.ITIMER_PROF, 0)
+            pending = signums & signal.sigpending()
+            if pending:
+                for _ in pending:
+                    signal.sigwait(pending)
+            for signum, handler in self._old_handlers.items():
+                signal.signal(signum, handler)
+            self._old_handlers.clear()
+        finally:
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, signums)
+
+    # --- Chemin watchdog (threads secondaires) ---
+
+    def _inject(self, exc_class):
+        with self._lock:
+            if self._armed and not _in_teardown(sys._current_frames().get(self._thread_id)):
+                ctypes.pythonapi.PyThreadState_SetAsyncExc(
+                    ctypes.c_ulong(self._thread_id), ctypes.py_object(exc_class))
+
+    def _watch(self):
+        start = time.monotonic()
+        cpu_clock = None
+        if self.cpu_time and hasattr(time, 'pthread_getcpuclockid'):
+            cpu_clock = time.pthread_getcpuclockid(self._thread_id)
+            cpu_start = time.clock_gettime(cpu_clock)
+        fired = None
+        while fired is None:
+            wait = self.wall_time - (time.monotonic() - start) if self.wall_time else WATCHDOG_POLL
+            if cpu_clock is not None:
+                wait = min(wait, WATCHDOG_POLL)
+            if self._done.wait(max(wait, 0)):
+                return
+            if self.wall_time and time.monotonic() - start >= self.wall_time:
+                fired = WallTimeExceeded
+            elif cpu_clock is not None and time.clock_gettime(cpu_clock) - cpu_start >= self.cpu_time:
+                fired = CpuTimeExceeded
+        while True:
+            self._inject(fired)
+            if self._done.wait(REARM_INTERVAL):
+                return
+
+    def _clear_pending(self):
+        ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(self._thread_id), None)
+
+    # --- Protocole de contexte ---
+
+    def __enter__(self):
+        if not (self.wall_time or self.cpu_time):
+            return self
+        self._armed = True
+        if self._use_signals:
+            self._arm_signals()
+        else:
+            self._thread_id = threading.get_ident()
+            self._watchdog = threading.Thread(target=self._watch, name='execution-deadline', daemon=True)
+            self._watchdog.start()
+        return self
+
+    def _disarm(self):
+        self._armed = False
+        if self._use_signals:
+            self._disarm_signals()
+        elif self._watchdog is not None:
+            with self._lock:
+                self._done.set()
+            self._watchdog.join()
+            self._clear_pending()
+
+    def __exit__(self, exc_type, exc, tb):
+        # Une interruption peut encore tomber pendant le désarmement : le code
+        # utilisateur est alors déjà terminé, on l'ignore et on recommence.
+        while True:
+            try:
+                self._disarm()
+                return False
+            except ExecutionInterrupted:
+                continue
+
+
+_TEARDOWN_CODES = frozenset(
+    method.__code__ for method in (Deadline.__exit__, Deadline._disarm, Deadline._disarm_signals))
+
+
+def _in_teardown(frame) -> bool:
+    """Vrai si `frame` exécute le désarmement d'une Deadline."""
+    return frame is not None and frame.f_code in _TEARDOWN_CODES
+
+
+def set_cpu_rlimit(seconds: Optional[float]) -> None:
+    """
+    Filet de sécurité noyau pour un processus worker : plafonne le temps CPU
+    restant à `seconds` (+1s de marge) au-delà de la consommation actuelle.
+    Si le code reste bloqué hors de portée des signaux Python, le noyau
+    envoie SIGXCPU et le worker est remplacé par le pool.
+    """
+    if resource is None or not seconds:
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    used = int(usage.ru_utime + usage.ru_stime)
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    soft = used + int(seconds) + 1
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+class memory_rlimit:
+    """
+    Plafonne l'espace d'adressage du processus courant (RLIMIT_AS) à sa
+    taille actuelle + `max_mb` pendant la durée du bloc.
+
+    À n'utiliser que dans un processus enfant : une allocation trop grosse
+    y échoue aussitôt en MemoryError au lieu de faire tuer l'hôte par l'OOM
+    killer.
+    """
+
+    def __init__(self, max_mb: Optional[float]):
+        self.max_mb = max_mb
+        self._previous = None
+
+    def __enter__(self):
+        if resource is None or not self.max_mb or self.max_mb <= 0:
+            return self
+        current = _read_status_kb('VmSize')
+        if current is None:
+            return self
+        self._previous = resource.getrlimit(resource.RLIMIT_AS)
+        soft = current * 1024 + int(self.max_mb * 1024 * 1024)
+        hard = self._previous[1]
+        if hard != resource.RLIM_INFINITY:
+            soft = min(soft, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (soft, hard))
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._previous is not None:
+            resource.setrlimit(resource.RLIMIT_AS, self._previous)
+        return False
+
+
+def _read_status_kb(field: str) -> Optional[int]:
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def reset_peak_rss() -> bool:
+    """Remet à zéro le pic RSS (VmHWM) du processus courant (Linux >= 4.0)."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as clear_refs:
+            clear_refs.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Pic de mémoire résidente du processus courant, en MB."""
+    peak_kb = _read_status_kb('VmHWM')
+    if peak_kb is None and resource is not None:
+        peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak_kb / 1024 if peak_kb is not None else None
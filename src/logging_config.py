@@ -0,0 +1,202 @@
+"""
+Module: Configuration du logging
+Description: Point unique de configuration de loguru pour la plateforme.
+             Les modules se contentent d'appeler `logger` ; l'application
+             appelle `configure_logging()` une fois au démarrage. Par défaut,
+             les enregistrements sont mis en file et sérialisés/écrits par un
+             thread dédié, hors du chemin de `analyze`/`execute_code`.
+"""
+
+import glob
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Mapping, Optional
+
+from loguru import logger
+
+DEFAULT_LOG_PATH = 'logs/platform.log'
+
+_STOP = object()
+
+
+class QueuedFileSink:
+    """
+    Sink loguru asynchrone vers un fichier, avec rotation par taille.
+
+    L'appel du sink ne fait que déposer l'enregistrement dans une file en
+    mémoire (sans sérialisation ni pickling) ; le thread écrivain le met en
+    forme (JSON d'une ligne si `serialize`), écrit par lots et fait tourner le
+    fichier au-delà de `rotation` octets en gardant `retention` archives.
+    """
+
+    def __init__(self, path: str, serialize: bool = True, rotation: int = 1_000_000,
+                 retention: int = 10, flush_interval: float = 0.2):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.serialize = serialize
+        self.rotation = rotation
+        self.retention = retention
+        self.flush_interval = flush_interval
+        self._queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._file = open(path, 'a', encoding='utf-8')
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name='log-writer', daemon=True)
+        self._writer.start()
+
+    def __call__(self, message) -> None:
+        self._queue.put(message)
+
+    def _write_loop(self) -> None:
+        stopping = False
+        while not stopping:
+            lines, waiters = [], []
+            item = self._queue.get()
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is _STOP:
+                    stopping = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    lines.append(self._format(item))
+                if stopping or waiters:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+            if lines:
+                self._write(''.join(lines))
+            for waiter in waiters:
+                waiter.set()
+        self._file.close()
+
+    def _format(self, message) -> str:
+        if not self.serialize:
+            return str(message)
+        record = message.record
+        data: Dict[str, Any] = {
+            'time': record['time'].isoformat(),
+            'level': record['level'].name,
+            'name': record['name'],
+            'function': record['function'],
+            'line': record['line'],
+            'message': record['message'],
+        }
+        if record['extra']:
+            data['extra'] = record['extra']
+        if record['exception'] is not None:
+            data['exception'] = repr(record['exception'].value)
+        return json.dumps(data, ensure_ascii=False, default=str) + '\n'
+
+    def _write(self, text: str) -> None:
+        try:
+            self._file.write(text)
+            self._file.flush()
+            if self._file.tell() >= self.rotation:
+                self._rotate()
+        except OSError as e:
+            print(f"Échec d'écriture du journal {self.path}: {e}", file=sys.stderr)
+
+    def _rotate(self) -> None:
+        self._file.close()
+        os.replace(self.path, f"{self.path}.{time.strftime('%Y%m%d-%H%M%S')}.{time.time_ns() % 10**9:09d}")
+        archives = sorted(glob.glob(glob.escape(self.path) + '.*'))
+        for old in archives[:max(len(archives) - self.retention, 0)]:
+            os.remove(old)
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def complete(self) -> None:
+        """Attend que les enregistrements déjà reçus soient écrits."""
+        if self._closed:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._writer.join()
+
+
+_lock = threading.Lock()
+_handler_ids: List[int] = []
+_sinks: List[QueuedFileSink] = []
+
+
+def configure_logging(path: Optional[str] = DEFAULT_LOG_PATH, level: str = 'INFO',
+                      levels: Optional[Mapping[str, str]] = None, serialize: bool = True,
+                      enqueue: bool = True, console: bool = False,
+                      rotation: int = 1_000_000, retention: int = 10) -> List[int]:
+    """
+    (Re)configure les sinks de la plateforme et retourne leurs identifiants.
+
+    - `path` : fichier de log (répertoire créé au besoin), None pour aucun fichier.
+    - `level` : niveau par défaut ; `levels` le surcharge par module, par
+      exemple `{'src.debugger': 'WARNING', 'src.worker_pool': 'DEBUG'}`.
+    - `serialize` : un enregistrement JSON par ligne dans le fichier.
+    - `enqueue` : mise en forme et écriture dans un thread dédié
+      (`QueuedFileSink`) ; sinon écriture synchrone par loguru.
+    - `console` : ajoute un sink texte sur stderr.
+    - `rotation` / `retention` : taille maximale du fichier en octets et
+      nombre d'archives conservées.
+
+    Idempotent : un nouvel appel remplace la configuration précédente, y
+    compris le sink stderr par défaut de loguru.
+    """
+    module_filter: Dict[str, str] = {'': level}
+    module_filter.update(levels or {})
+    # Le niveau minimal du sink doit laisser passer les surcharges plus verbeuses
+    sink_level = min(logger.level(name).no for name in module_filter.values())
+
+    with _lock:
+        _remove_handlers()
+        if path is not None and enqueue:
+            sink = QueuedFileSink(path, serialize=serialize, rotation=rotation, retention=retention)
+            _sinks.append(sink)
+            # La mise en forme JSON se fait dans le thread écrivain à partir de
+            # `message.record` : le format loguru minimal évite un double travail.
+            _handler_ids.append(logger.add(
+                sink, level=sink_level, filter=module_filter,
+                format="{message}" if serialize else "{time} | {level: <8} | {name}:{line} - {message}"))
+        elif path is not None:
+            _handler_ids.append(logger.add(
+                path, level=sink_level, filter=module_filter, serialize=serialize,
+                rotation=rotation, retention=retention, encoding='utf-8'))
+        if console:
+            _handler_ids.append(logger.add(sys.stderr, level=sink_level, filter=module_filter))
+        return list(_handler_ids)
+
+
+def flush_logging() -> None:
+    """Attend que les enregistrements en file soient écrits sur disque."""
+    with _lock:
+        for sink in _sinks:
+            sink.complete()
+
+
+def shutdown_logging() -> None:
+    """Vide les files en attente puis retire les sinks configurés."""
+    with _lock:
+        _remove_handlers()
+
+
+def _remove_handlers() -> None:
+    # Le sink stderr synchrone installé par loguru à l'import porte l'identifiant 0
+    for handler_id in [0] + _handler_ids:
+        try:
+            logger.remove(handler_id)
+        except ValueError:
+            pass
+    _handler_ids.clear()
+    for sink in _sinks:
+        sink.close()
+    _sinks.clear()
@@ -0,0 +1,126 @@
+"""
+Module: Profilage des exécutions
+Description: Mesures optionnelles d'une exécution : temps réel et temps CPU,
+             pic d'allocations tracées et lignes les plus coûteuses du code
+             utilisateur, obtenues par échantillonnage de la pile du thread
+             qui exécute le code.
+"""
+
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Dict, List, Mapping, Optional
+
+from src.execution_result import USER_FILENAME
+
+# Intervalle d'échantillonnage par défaut : de l'ordre de l'intervalle de
+# bascule du GIL (5 ms), en deçà le thread échantillonneur n'obtient pas la main.
+SAMPLE_INTERVAL = 0.005
+TOP_LINES = 5
+
+# Seuils du diagnostic de performance
+HOT_LINE_SHARE = 0.5
+IDLE_RATIO = 0.5
+MIN_IDLE_WALL_TIME = 0.05
+LARGE_ALLOCATION_MB = 50.0
+
+# tracemalloc est global au processus : partagé entre profilages simultanés
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+
+
+class RunProfiler:
+    """
+    Profile le bloc qu'il encadre, exécuté dans le thread courant.
+
+    Le temps CPU est celui du thread (`time.thread_time`), ce qui reste juste
+    quand plusieurs exécutions in-process tournent en parallèle. Le résultat
+    est disponible dans `profile` après la sortie du bloc, même si le code
+    a levé une exception (utile pour un timeout : la ligne chaude désigne la
+    boucle infinie).
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL, top: int = TOP_LINES):
+        self.interval = interval
+        self.top = top
+        self.profile: Optional[Dict[str, Any]] = None
+        self._lines: Counter = Counter()
+        self._samples = 0
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "RunProfiler":
+        _start_tracemalloc()
+        tracemalloc.reset_peak()
+        self._baseline = tracemalloc.get_traced_memory()[0]
+        self._target = threading.get_ident()
+        self._sampler = threading.Thread(target=self._sample_loop, name='run-profiler', daemon=True)
+        self._sampler.start()
+        self._wall = time.perf_counter()
+        self._cpu = time.thread_time()
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        cpu_time = time.thread_time() - self._cpu
+        wall_time = time.perf_counter() - self._wall
+        self._stop.set()
+        self._sampler.join()
+        peak = tracemalloc.get_traced_memory()[1]
+        _stop_tracemalloc()
+        self.profile = {
+            'wall_time': wall_time,
+            'cpu_time': cpu_time,
+            'peak_allocated_mb': max(peak - self._baseline, 0) / 1024 / 1024,
+            'samples': self._samples,
+            'hot_lines': [
+                {'line': line, 'samples': count, 'share': count / self._samples}
+                for line, count in self._lines.most_common(self.top)
+            ],
+        }
+        return False
+
+    def _sample_loop(self) -> None:
+        current_frames = sys._current_frames
+        while not self._stop.wait(self.interval):
+            frame = current_frames().get(self._target)
+            # Ligne la plus interne appartenant au code utilisateur
+            while frame is not None and frame.f_code.co_filename != USER_FILENAME:
+                frame = frame.f_back
+            if frame is not None:
+                self._lines[frame.f_lineno] += 1
+                self._samples += 1
+
+
+def diagnose(profile: Mapping[str, Any]) -> List[str]:
+    """Constats tirés d'un profil : ligne dominante, attente, allocations massives."""
+    findings = []
+    hot_lines = profile.get('hot_lines') or []
+    if hot_lines and hot_lines[0]['share'] >= HOT_LINE_SHARE:
+        findings.append(f"La ligne {hot_lines[0]['line']} concentre {hot_lines[0]['share']:.0%} "
+                        f"du temps d'exécution : c'est elle qu'il faut optimiser.")
+    wall_time, cpu_time = profile.get('wall_time', 0.0), profile.get('cpu_time', 0.0)
+    if wall_time >= MIN_IDLE_WALL_TIME and cpu_time < wall_time * IDLE_RATIO:
+        findings.append("Le code attend plus qu'il ne calcule (sleep, input, entrées/sorties).")
+    peak = profile.get('peak_allocated_mb', 0.0)
+    if peak >= LARGE_ALLOCATION_MB:
+        findings.append(f"Pic d'allocations de {peak:.1f} Mo : préférez un générateur "
+                        f"à une liste intermédiaire.")
+    return findings
+
+
+def _start_tracemalloc() -> None:
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _tracemalloc_users += 1
+
+
+def _stop_tracemalloc() -> None:
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0:
+            tracemalloc.stop()
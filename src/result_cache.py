@@ -0,0 +1,151 @@
+"""
+Module: Cache de résultats
+Description: Mémorise le résultat des soumissions déterministes pour ne pas
+             réexécuter un code identique soumis par de nombreux
+             utilisateurs. Une analyse de l'AST décide si un code est
+             mémorisable ; les entrées expirent par taille (LRU) et par âge.
+"""
+
+import ast
+import re
+import threading
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from src.execution_result import ExecutionResult
+from src.utils import LRUCache
+
+# Builtins dont le résultat dépend de l'instant, de l'adresse des objets ou
+# qui donnent accès à un état hors du code soumis.
+IMPURE_NAMES = frozenset({
+    'id', 'hash', 'open', '__import__', 'breakpoint', 'help',
+    'globals', 'locals', 'vars', 'eval', 'exec', 'compile',
+})
+
+# Builtins d'accès aux attributs par nom : un dunder passé en chaîne est
+# refusé comme un accès direct
+ATTRIBUTE_BUILTINS = frozenset({'getattr', 'setattr', 'delattr', 'hasattr'})
+
+# Erreurs liées aux ressources de la machine, pas au code : jamais mémorisées
+RESOURCE_ERRORS = ('TimeoutError', 'MemoryError', 'WorkerCrashedError')
+
+# Représentation par défaut d'un objet (`<Point object at 0x7f...>`) : l'adresse
+# change d'une exécution à l'autre
+OBJECT_ADDRESS = re.compile(r"<[^<>]* at 0x[0-9a-fA-F]+>")
+
+
+def is_pure(code: str) -> bool:
+    """
+    Vrai si le résultat de `code` ne dépend que du code et de `user_input`.
+
+    Refuse tout import (random, time, os...), les builtins de `IMPURE_NAMES`,
+    les accès aux dunders (directs ou via `getattr`...) et les erreurs de
+    syntaxe. `input()` est accepté : `user_input` fait
+    partie de la clé du cache.
+    """
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return False
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            return False
+        if isinstance(node, ast.Name) and node.id in IMPURE_NAMES:
+            return False
+        if isinstance(node, ast.Attribute) and node.attr.startswith('__') and node.attr != '__init__':
+            # Accès aux dunders (__class__, __subclasses__, __globals__...)
+            return False
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+                and node.func.id in ATTRIBUTE_BUILTINS and any(_is_dunder(arg) for arg in node.args)):
+            return False
+    return True
+
+
+def _is_dunder(node: ast.AST) -> bool:
+    return (isinstance(node, ast.Constant) and isinstance(node.value, str)
+            and node.value.startswith('__') and node.value != '__init__')
+
+
+def is_cacheable(result: ExecutionResult) -> bool:
+    """
+    Un échec dû aux limites de ressources peut réussir au prochain essai, et
+    une sortie qui affiche l'adresse d'un objet change à chaque exécution.
+    """
+    if OBJECT_ADDRESS.search(result.output) or OBJECT_ADDRESS.search(result.error):
+        return False
+    if result.success:
+        return not result.output_truncated
+    return not any(result.error.startswith(error) for error in RESOURCE_ERRORS)
+
+
+class ResultCache:
+    """
+    Cache LRU de résultats avec durée de vie (`ttl` secondes).
+
+    La pureté est vérifiée une fois par code (cache dédié). Un succès de
+    cache retourne une copie du résultat marquée `cached=True`, datée de
+    l'instant de la requête.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = 300.0):
+        self.ttl = ttl
+        self._results = LRUCache(maxsize)
+        self._purity = LRUCache(maxsize)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    def is_memoizable(self, code_key: Hashable, code: str) -> bool:
+        pure = self._purity.get(code_key)
+        if pure is None:
+            pure = is_pure(code)
+            self._purity.put(code_key, pure)
+        return pure
+
+    def get(self, key: Tuple[Hashable, ...]) -> Optional[ExecutionResult]:
+        entry = self._results.get(key)
+        if entry is not None and self.ttl is not None and entry[0] < time.monotonic():
+            self._results.pop(key)
+            with self._lock:
+                self.expired += 1
+            entry = None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return _cached_copy(entry[1])
+
+    def put(self, key: Tuple[Hashable, ...], result: ExecutionResult) -> None:
+        if not is_cacheable(result):
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else float('inf')
+        # Stored as a copy: the caller keeps (and may modify) the original
+        self._results.put(key, (expires_at, _cached_copy(result)))
+
+    def clear(self) -> None:
+        self._results.clear()
+        self._purity.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._results),
+                'maxsize': self._results.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'expired': self.expired,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+def _cached_copy(result: ExecutionResult) -> ExecutionResult:
+    return ExecutionResult(
+        success=result.success, output=result.output, error=result.error,
+        execution_time=result.execution_time, memory_used=result.memory_used,
+        traceback=result.traceback, peak_memory_mb=result.peak_memory_mb,
+        output_truncated=result.output_truncated, exception=result.exception,
+        preflight=result.preflight, cached=True)
@@ -0,0 +1,57 @@
+"""
+Module: Politique de sandbox
+Description: Construit une seule fois l'espace de noms `__builtins__` restreint
+             fourni au code utilisateur, à partir d'une liste blanche ou
+             d'une liste noire de builtins.
+"""
+
+import builtins
+import hashlib
+from typing import Dict, FrozenSet, Iterable, Optional
+
+# Builtins retirés par défaut (comportement historique du moteur)
+DEFAULT_DENY = ('__import__', 'open', 'exit', 'quit', 'help', 'copyright')
+
+# Toujours fourni en mode liste blanche : sans lui, `class A: ...` échoue.
+ESSENTIAL_BUILTINS = ('__build_class__',)
+
+
+class SandboxPolicy:
+    """
+    Politique immuable de builtins autorisés.
+
+    Le dictionnaire de base est calculé à la construction ; chaque exécution
+    en reçoit une copie superficielle via `builtins_view()`, si bien qu'une
+    soumission qui modifie `__builtins__` n'affecte jamais les suivantes.
+    """
+
+    def __init__(self, allow: Optional[Iterable[str]] = None,
+                 deny: Optional[Iterable[str]] = None):
+        if allow is not None and deny is not None:
+            raise ValueError("SandboxPolicy accepts either an allow-list or a deny-list, not both")
+        available = vars(builtins)
+        if allow is not None:
+            allowed = set(allow) | set(ESSENTIAL_BUILTINS)
+        else:
+            allowed = set(available) - set(DEFAULT_DENY if deny is None else deny)
+        # Built in one pass (no pops) so the dict stays compact and copies fast.
+        self._base: Dict[str, object] = {
+            name: value for name, value in available.items() if name in allowed
+        }
+        self.allowed: FrozenSet[str] = frozenset(self._base)
+        self.denied: FrozenSet[str] = frozenset(available) - self.allowed
+        self.fingerprint = hashlib.blake2b(
+            '\0'.join(sorted(self.allowed)).encode(), digest_size=8).hexdigest()
+
+    def builtins_view(self) -> Dict[str, object]:
+        """Copie isolée et bon marché des builtins autorisés."""
+        return self._base.copy()
+
+    def is_denied(self, name: str) -> bool:
+        return name in self.denied
+
+    def __repr__(self):
+        return f"SandboxPolicy(allowed={len(self.allowed)}, denied={sorted(self.denied)})"
+
+
+DEFAULT_POLICY = SandboxPolicy()
@@ -0,0 +1,288 @@
+"""
+Module: Sessions d'exécution
+Description: Exécution incrémentale façon notebook. Une session conserve son
+             espace de noms entre les cellules, si bien qu'un utilisateur qui
+             débogue ne réexécute plus son code de préparation à chaque essai.
+             Une cellule en échec est annulée en restaurant l'instantané pris
+             avant son exécution.
+"""
+
+import copy
+import functools
+import threading
+import uuid
+from types import CodeType, FunctionType, MethodType
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, Iterable, List, Optional, Set
+
+from src.capture import OutputCallback
+from src.execution_result import ExecutionResult
+
+if TYPE_CHECKING:
+    from src.execution_engine import ExecutionEngine
+
+# Noms gérés par la session elle-même, jamais copiés ni exposés
+RESERVED_NAMES = frozenset({'__builtins__', '__name__'})
+
+# Builtins donnant accès à tout l'espace de noms : l'annulation d'une cellule
+# qui les utilise repose sur un instantané complet.
+DYNAMIC_ACCESS = frozenset({'globals', 'vars', 'locals', 'eval', 'exec'})
+
+_MISSING = object()
+
+# Valeurs qui ne peuvent ni contenir ni désigner une fonction
+_ATOMIC_TYPES = frozenset({int, float, complex, bool, str, bytes, type(None)})
+
+
+class NamespaceSnapshot:
+    """
+    Copie figée d'un espace de noms, complète ou limitée à certains noms.
+
+    Les valeurs sont copiées en profondeur avec un mémo commun, ce qui
+    préserve les alias entre variables (`b = a` reste le même objet après
+    restauration). Les valeurs immuables (nombres, chaînes, fonctions,
+    classes, modules) sont partagées sans copie par `copy.deepcopy`. Les
+    objets impossibles à copier (générateurs, verrous...) sont conservés par
+    référence : leurs modifications ne sont pas annulées (`shared`).
+
+    Un instantané partiel (`names`) ne copie que ces variables et celles qui
+    désignent les mêmes objets ; à la restauration, les autres variables
+    sont gardées telles quelles et celles créées depuis sont supprimées.
+    """
+
+    __slots__ = ('_values', '_keys', '_builtins', '_partial', 'shared')
+
+    def __init__(self, namespace: Dict[str, Any], names: Optional[Iterable[str]] = None):
+        self._keys = frozenset(namespace) - RESERVED_NAMES
+        self._partial = names is not None
+        targets = self._keys if names is None else self._keys.intersection(names)
+        memo: Dict[int, Any] = {}
+        values, shared = {}, []
+        for name in targets:
+            try:
+                values[name] = copy.deepcopy(namespace[name], memo)
+            except Exception:
+                values[name] = namespace[name]
+                shared.append(name)
+        if self._partial:
+            # Variables non ciblées qui sont des alias d'un objet déjà copié
+            for name in self._keys - targets:
+                if id(namespace[name]) in memo:
+                    values[name] = memo[id(namespace[name])]
+        self._values = values
+        self._builtins = dict(namespace.get('__builtins__', {}))
+        self.shared: FrozenSet[str] = frozenset(shared)
+
+    def names(self) -> FrozenSet[str]:
+        return frozenset(self._values)
+
+    def restore_into(self, namespace: Dict[str, Any], consume: bool = False) -> None:
+        """
+        Ramène `namespace` à l'état de l'instantané.
+
+        Sans `consume`, les valeurs sont recopiées pour que l'instantané reste
+        réutilisable ; avec `consume`, elles sont rendues telles quelles
+        (annulation d'une cellule, où l'instantané n'est plus utilisé ensuite).
+        """
+        values = self._values if consume else _copy_values(self._values, self.shared)
+        builtins_view = namespace.get('__builtins__')
+        name = namespace.get('__name__', '__main__')
+        if self._partial:
+            for key in [key for key in namespace if key not in self._keys and key not in RESERVED_NAMES]:
+                del namespace[key]
+        else:
+            namespace.clear()
+        namespace.update(values)
+        if isinstance(builtins_view, dict):
+            builtins_view.clear()
+            builtins_view.update(self._builtins)
+        namespace['__builtins__'] = builtins_view if builtins_view is not None else dict(self._builtins)
+        namespace['__name__'] = name
+
+
+def _copy_values(values: Dict[str, Any], shared: FrozenSet[str]) -> Dict[str, Any]:
+    memo: Dict[int, Any] = {}
+    return {name: value if name in shared else copy.deepcopy(value, memo)
+            for name, value in values.items()}
+
+
+def touched_names(code: CodeType, namespace: Dict[str, Any]) -> Optional[Set[str]]:
+    """
+    Variables globales qu'une cellule compilée peut modifier, ou None si on
+    ne peut pas le déterminer (accès dynamique via `globals()`, `exec`...).
+
+    Part des noms utilisés par la cellule, puis ajoute ceux des fonctions et
+    méthodes de classes utilisateur qu'elle peut atteindre, jusqu'à point fixe :
+    directement, ou rangées dans des conteneurs, des attributs d'objets, des
+    fermetures, des méthodes liées ou des `functools.partial`.
+    """
+    names = _code_names(code)
+    pending = list(names)
+    while pending:
+        if not names.isdisjoint(DYNAMIC_ACCESS):
+            return None
+        value = namespace.get(pending.pop(), _MISSING)
+        if value is _MISSING:
+            continue
+        for function_code in _user_code(value):
+            new_names = _code_names(function_code) - names
+            names |= new_names
+            pending.extend(new_names)
+    return names if names.isdisjoint(DYNAMIC_ACCESS) else None
+
+
+def _code_names(code: CodeType) -> Set[str]:
+    names: Set[str] = set()
+    pending = [code]
+    while pending:
+        current = pending.pop()
+        names.update(current.co_names)
+        pending.extend(const for const in current.co_consts if isinstance(const, CodeType))
+    return names
+
+
+def _user_code(value: Any) -> List[CodeType]:
+    """Code des fonctions que `value` permet d'appeler."""
+    codes = []
+    pending, seen = [value], set()
+    while pending:
+        value = pending.pop()
+        if type(value) in _ATOMIC_TYPES or id(value) in seen:
+            continue
+        seen.add(id(value))
+        if isinstance(value, FunctionType):
+            codes.append(value.__code__)
+            pending.extend(cell.cell_contents for cell in value.__closure__ or ()
+                           if cell.cell_contents is not None)
+            pending.extend(value.__defaults__ or ())
+            pending.extend((value.__kwdefaults__ or {}).values())
+        elif isinstance(value, MethodType):
+            pending.extend((value.__func__, value.__self__))
+        elif isinstance(value, functools.partial):
+            pending.append(value.func)
+            pending.extend(value.args)
+            pending.extend(value.keywords.values())
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            pending.extend(item for item in value if type(item) not in _ATOMIC_TYPES)
+        elif isinstance(value, dict):
+            pending.extend(item for item in value.values() if type(item) not in _ATOMIC_TYPES)
+        else:
+            codes.extend(_class_code(value if isinstance(value, type) else type(value)))
+            if not isinstance(value, type) and type(value).__module__ == '__main__':
+                pending.extend(getattr(value, '__dict__', {}).values())
+    return codes
+
+
+def _class_code(klass: type) -> List[CodeType]:
+    codes = []
+    for base in klass.__mro__:
+        if getattr(base, '__module__', None) != '__main__':
+            continue
+        for attribute in vars(base).values():
+            function = getattr(attribute, '__func__', attribute)
+            if isinstance(function, FunctionType):
+                codes.append(function.__code__)
+            elif isinstance(attribute, property):
+                codes.extend(f.__code__ for f in (attribute.fget, attribute.fset, attribute.fdel)
+                             if isinstance(f, FunctionType))
+    return codes
+
+
+class ExecutionSession:
+    """
+    Espace de noms persistant associé à un moteur d'exécution.
+
+    Les cellules s'exécutent l'une après l'autre dans le processus courant
+    (quel que soit le backend du moteur), avec les mêmes builtins restreints,
+    limites de temps et capture de sortie que `execute_code`. Si
+    `rollback_on_error` est vrai, l'espace de noms est ramené à son état
+    d'avant la cellule lorsqu'elle échoue. L'instantané pris avant chaque
+    cellule ne copie que les variables qu'elle peut atteindre
+    (`touched_names`) : son coût ne dépend pas des données chargées par les
+    cellules précédentes si la cellule ne les utilise pas.
+    """
+
+    def __init__(self, engine: "ExecutionEngine", session_id: Optional[str] = None,
+                 rollback_on_error: bool = True):
+        self.engine = engine
+        self.session_id = session_id or uuid.uuid4().hex
+        self.rollback_on_error = rollback_on_error
+        self.namespace: Dict[str, Any] = {}
+        self.cells_run = 0
+        self.rollbacks = 0
+        self._lock = threading.Lock()
+        self.reset()
+
+    def run(self, code: str, user_input: str = "", timeout: Optional[float] = None,
+            on_output: Optional[OutputCallback] = None, profile: bool = False) -> ExecutionResult:
+        """Exécute une cellule dans l'espace de noms de la session."""
+        with self._lock:
+            compiled_code = self._compile(code)
+            before = None
+            if self.rollback_on_error and compiled_code is not None:
+                before = NamespaceSnapshot(self.namespace, touched_names(compiled_code, self.namespace))
+            result = self._execute(code, compiled_code, user_input, timeout, on_output, profile)
+            self.cells_run += 1
+            if not result.success and before is not None:
+                before.restore_into(self.namespace, consume=True)
+                self.rollbacks += 1
+        self.engine._save_to_history(code, result)
+        return result
+
+    def _compile(self, code: str) -> Optional[CodeType]:
+        try:
+            return self.engine.code_cache.compile(code)
+        except SyntaxError:
+            # Nothing will run: _run reports the cached SyntaxError
+            return None
+
+    def _execute(self, code: str, compiled_code: Optional[CodeType], user_input: str,
+                 timeout: Optional[float], on_output: Optional[OutputCallback],
+                 profile: bool) -> ExecutionResult:
+        """Exécute la cellule dans l'espace de noms, sans instantané ni historique."""
+        builtins_view = self.namespace['__builtins__']
+        previous_input = builtins_view.get('input')
+        if user_input:
+            builtins_view['input'] = lambda prompt='': user_input
+        try:
+            return self.engine._run(code, "", compiled_code, timeout=timeout,
+                                    on_output=on_output, exec_globals=self.namespace,
+                                    profile=profile)
+        finally:
+            if user_input:
+                _restore_entry(builtins_view, 'input', previous_input)
+
+    def snapshot(self) -> NamespaceSnapshot:
+        """Instantané réutilisable de l'état courant."""
+        with self._lock:
+            return NamespaceSnapshot(self.namespace)
+
+    def restore(self, snapshot: NamespaceSnapshot) -> None:
+        """Revient à l'état d'un instantané (qui reste utilisable ensuite)."""
+        with self._lock:
+            snapshot.restore_into(self.namespace)
+
+    def reset(self) -> None:
+        """Vide l'espace de noms (nouvelle copie des builtins autorisés)."""
+        with self._lock:
+            self.namespace.clear()
+            self.namespace['__builtins__'] = self.engine.sandbox_policy.builtins_view()
+            self.namespace['__name__'] = '__main__'
+
+    def variables(self) -> Dict[str, Any]:
+        """Variables définies par l'utilisateur (hors noms internes)."""
+        return {name: value for name, value in self.namespace.items()
+                if name not in RESERVED_NAMES}
+
+    def stats(self) -> Dict[str, Any]:
+        return {'session_id': self.session_id, 'cells_run': self.cells_run,
+                'rollbacks': self.rollbacks, 'variables': len(self.namespace) - len(RESERVED_NAMES)}
+
+    def __repr__(self):
+        return f"<ExecutionSession {self.session_id} cells={self.cells_run}>"
+
+
+def _restore_entry(mapping: Dict[str, Any], key: str, value: Any) -> None:
+    if value is None:
+        mapping.pop(key, None)
+    else:
+        mapping[key] = value
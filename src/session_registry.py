@@ -0,0 +1,374 @@
+"""
+Module: Registre de sessions réparties
+Description: Répartit les sessions de collaboration entre plusieurs
+             processus (shards) par hachage cohérent. Chaque shard garde en
+             mémoire ses sessions actives ; les sessions inactives sont
+             déchargées dans le journal d'événements et rechargées à la
+             demande, si bien que le nombre de sessions suit le nombre de
+             coeurs et non la mémoire d'un seul processus.
+"""
+
+import hashlib
+import multiprocessing
+import os
+import threading
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import psutil
+from loguru import logger
+
+from src.collaboration import SNAPSHOT_EVERY, CollaborationManager
+from src.event_log import FileEventLog
+from src.worker_pool import Worker
+
+# Points par shard sur l'anneau : plus il y en a, plus la charge est régulière
+VIRTUAL_NODES = 64
+IDLE_TIMEOUT = 300.0
+# Intervalle maximal entre deux passes de déchargement des sessions inactives
+EVICT_INTERVAL = 60.0
+MAX_SESSIONS_PER_SHARD = 10_000
+
+# Méthodes de CollaborationManager accessibles à travers le registre
+SESSION_METHODS = frozenset({
+    'register_collaborator', 'remove_collaborator', 'log_correction',
+    'get_session_summary', 'get_fixes_since', 'format_collab_report',
+    'insert_code', 'delete_code', 'edit_code', 'sync_code', 'refresh', 'snapshot',
+})
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class HashRing:
+    """
+    Anneau de hachage cohérent avec noeuds virtuels.
+
+    Ajouter ou retirer un noeud ne déplace qu'environ 1/n des clés.
+    """
+
+    def __init__(self, nodes: Iterable[Any] = (), vnodes: int = VIRTUAL_NODES):
+        self.vnodes = vnodes
+        self._points: List[int] = []
+        self._owners: List[Any] = []
+        self.nodes: List[Any] = []
+        for node in nodes:
+            self.add(node)
+
+    def add(self, node: Any) -> None:
+        self.nodes.append(node)
+        for replica in range(self.vnodes):
+            point = _hash(f"{node}#{replica}")
+            index = bisect_right(self._points, point)
+            self._points.insert(index, point)
+            self._owners.insert(index, node)
+
+    def remove(self, node: Any) -> None:
+        self.nodes.remove(node)
+        kept = [(point, owner) for point, owner in zip(self._points, self._owners) if owner != node]
+        self._points = [point for point, _ in kept]
+        self._owners = [owner for _, owner in kept]
+
+    def node_for(self, key: str) -> Any:
+        if not self._points:
+            raise LookupError("Hash ring is empty")
+        index = bisect_right(self._points, _hash(key)) % len(self._points)
+        return self._owners[index]
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+
+class _ShardHost:
+    """
+    Sessions d'un shard, dans le processus worker.
+
+    Le journal d'événements est ouvert au premier appel, après le fork, pour
+    que son thread de synchronisation appartienne au worker.
+    """
+
+    def __init__(self, shard_id: int, directory: str, idle_timeout: float,
+                 max_sessions: int, snapshot_every: int):
+        self.shard_id = shard_id
+        self.directory = directory
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.snapshot_every = snapshot_every
+        self.event_log: Optional[FileEventLog] = None
+        # session_id -> (manager, last use), least recently used first
+        self.sessions: "OrderedDict[str, Tuple[CollaborationManager, float]]" = OrderedDict()
+        self.calls = 0
+        self.rehydrated = 0
+        self.evicted = 0
+        self.peak_sessions = 0
+        self.busy_time = 0.0
+
+    def handle(self, op: str, *args: Any) -> Tuple[str, Any]:
+        start = time.perf_counter()
+        try:
+            return 'ok', getattr(self, f"_op_{op}")(*args)
+        except Exception as e:
+            return 'error', e
+        finally:
+            self.busy_time += time.perf_counter() - start
+
+    def _manager(self, session_id: str) -> CollaborationManager:
+        now = time.monotonic()
+        entry = self.sessions.pop(session_id, None)
+        if entry is None:
+            if self.event_log is None:
+                self.event_log = FileEventLog(self.directory)
+            manager = CollaborationManager(session_id, self.event_log, self.snapshot_every)
+            self.rehydrated += manager.last_seq > 1
+        else:
+            manager = entry[0]
+        # Evict before re-inserting so the session in use is never the victim
+        self._evict(now)
+        self.sessions[session_id] = (manager, now)
+        self.peak_sessions = max(self.peak_sessions, len(self.sessions))
+        return manager
+
+    def _evict(self, now: float, session_ids: Optional[Iterable[str]] = None,
+               max_idle: Optional[float] = None) -> int:
+        if session_ids is None:
+            max_idle = self.idle_timeout if max_idle is None else max_idle
+            session_ids = []
+            for session_id, (_, last_use) in self.sessions.items():
+                if now - last_use < max_idle and len(self.sessions) - len(session_ids) < self.max_sessions:
+                    break
+                session_ids.append(session_id)
+        count = 0
+        for session_id in session_ids:
+            entry = self.sessions.pop(session_id, None)
+            if entry is not None:
+                # The log already holds every event; the snapshot makes reloading cheap
+                entry[0].snapshot()
+                count += 1
+        self.evicted += count
+        return count
+
+    def _op_call(self, session_id: str, method: str, args: tuple, kwargs: dict) -> Any:
+        self.calls += 1
+        manager = self._manager(session_id)
+        if method == 'code':
+            return manager.code
+        return getattr(manager, method)(*args, **kwargs)
+
+    def _op_evict(self, session_ids: Optional[List[str]] = None, max_idle: Optional[float] = None) -> int:
+        return self._evict(time.monotonic(), session_ids, max_idle)
+
+    def _op_sessions(self) -> List[str]:
+        return list(self.sessions)
+
+    def _op_stats(self) -> Dict[str, Any]:
+        return {
+            'shard': self.shard_id,
+            'pid': os.getpid(),
+            'sessions': len(self.sessions),
+            'peak_sessions': self.peak_sessions,
+            'calls': self.calls,
+            'rehydrated': self.rehydrated,
+            'evicted': self.evicted,
+            'busy_time': self.busy_time,
+            'rss_mb': psutil.Process().memory_info().rss / 1024 / 1024,
+        }
+
+    def _op_shutdown(self) -> int:
+        count = self._evict(time.monotonic(), list(self.sessions))
+        if self.event_log is not None:
+            self.event_log.close()
+            self.event_log = None
+        return count
+
+
+class _Shard:
+    """Processus d'un shard et verrou qui sérialise ses échanges sur le pipe."""
+
+    __slots__ = ('shard_id', 'worker', 'lock')
+
+    def __init__(self, shard_id: int, worker: Worker):
+        self.shard_id = shard_id
+        self.worker = worker
+        self.lock = threading.Lock()
+
+
+class SessionRegistry:
+    """
+    Point d'entrée unique vers des milliers de sessions de collaboration.
+
+    Chaque session appartient au shard désigné par l'anneau de hachage ;
+    ses appels y sont routés (`call` ou `session(session_id).methode(...)`).
+    Une session inutilisée depuis `idle_timeout` secondes, ou au-delà de
+    `max_sessions_per_shard`, est déchargée (instantané dans le journal
+    `directory`) puis rechargée au prochain appel. Un thread passe sur tous
+    les shards toutes les `evict_interval` secondes (par défaut la moitié de
+    `idle_timeout`, au plus `EVICT_INTERVAL` ; 0 le désactive), si bien
+    qu'un shard qui ne reçoit plus d'appels libère aussi ses sessions. Les shards partagent le
+    répertoire du journal : une session déplacée par `add_shard` est
+    simplement rechargée par son nouveau shard.
+    """
+
+    def __init__(self, shards: Optional[int] = None, directory: str = 'logs/events',
+                 vnodes: int = VIRTUAL_NODES, idle_timeout: float = IDLE_TIMEOUT,
+                 max_sessions_per_shard: int = MAX_SESSIONS_PER_SHARD,
+                 snapshot_every: int = SNAPSHOT_EVERY, evict_interval: Optional[float] = None):
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise RuntimeError("SessionRegistry requires the 'fork' start method")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.idle_timeout = idle_timeout
+        self.max_sessions_per_shard = max_sessions_per_shard
+        self.snapshot_every = snapshot_every
+        self._ctx = multiprocessing.get_context('fork')
+        self._shards: Dict[int, _Shard] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self.ring = HashRing(vnodes=vnodes)
+        for _ in range(shards or os.cpu_count() or 1):
+            self._spawn()
+        if evict_interval is None:
+            evict_interval = min(max(idle_timeout / 2, 1.0), EVICT_INTERVAL)
+        self.evict_interval = evict_interval
+        self._stop_evicting = threading.Event()
+        self._evictor = None
+        if evict_interval > 0:
+            self._evictor = threading.Thread(target=self._evict_loop, daemon=True,
+                                             name="session-registry-evictor")
+            self._evictor.start()
+        logger.info(f"SessionRegistry démarré avec {len(self._shards)} shards")
+
+    def _spawn(self) -> _Shard:
+        shard_id = max(self._shards, default=-1) + 1
+        shard = self._shards[shard_id] = _Shard(shard_id, self._start_worker(shard_id))
+        self.ring.add(shard_id)
+        return shard
+
+    def _start_worker(self, shard_id: int) -> Worker:
+        host = _ShardHost(shard_id, self.directory, self.idle_timeout,
+                          self.max_sessions_per_shard, self.snapshot_every)
+        return Worker(self._ctx, host.handle)
+
+    # --- Routage ---
+
+    def shard_for(self, session_id: str) -> int:
+        return self.ring.node_for(session_id)
+
+    def _request(self, shard: _Shard, *task: Any) -> Any:
+        with shard.lock:
+            try:
+                status, payload = shard.worker.request(*task)
+            except (EOFError, OSError):
+                exitcode = shard.worker.process.exitcode
+                logger.warning(f"Shard {shard.shard_id} perdu (exitcode={exitcode}), redémarrage")
+                shard.worker.stop()
+                shard.worker = self._start_worker(shard.shard_id)
+                raise RuntimeError(f"Shard {shard.shard_id} crashed; its sessions will be reloaded")
+        if status == 'error':
+            raise payload
+        return payload
+
+    def call(self, session_id: str, method: str, *args: Any, **kwargs: Any) -> Any:
+        """Appelle `method` du CollaborationManager de la session, dans son shard."""
+        if self._closed:
+            raise RuntimeError("SessionRegistry is closed")
+        if method not in SESSION_METHODS and method != 'code':
+            raise AttributeError(f"Unknown session method '{method}'")
+        shard = self._shards[self.shard_for(session_id)]
+        return self._request(shard, 'call', session_id, method, args, kwargs)
+
+    def session(self, session_id: str) -> "SessionProxy":
+        return SessionProxy(self, session_id)
+
+    def run_code(self, session_id: str, engine, user_input: str = "", **kwargs: Any):
+        """Exécute dans ce processus le code partagé de la session."""
+        return engine.execute_code(self.call(session_id, 'code'), user_input, **kwargs)
+
+    # --- Gestion des shards ---
+
+    def evict_idle(self, max_idle: Optional[float] = None) -> int:
+        """
+        Décharge dès maintenant les sessions inactives depuis `max_idle`
+        secondes (`idle_timeout` par défaut, 0 pour toutes) ; retourne leur nombre.
+        """
+        return sum(self._request(shard, 'evict', None, max_idle) for shard in list(self._shards.values()))
+
+    def _evict_loop(self) -> None:
+        while not self._stop_evicting.wait(self.evict_interval):
+            try:
+                self.evict_idle()
+            except Exception as e:
+                # A crashed shard is restarted by _request; try again next round
+                logger.warning(f"Déchargement périodique des sessions interrompu: {e!r}")
+
+    def add_shard(self) -> int:
+        """
+        Ajoute un shard ; les sessions chargées qui changent de propriétaire
+        sont déchargées de leur ancien shard. Retourne leur nombre.
+        """
+        with self._lock:
+            shard = self._spawn()
+            moved = 0
+            for other in list(self._shards.values()):
+                if other is shard:
+                    continue
+                leaving = [session_id for session_id in self._request(other, 'sessions')
+                           if self.shard_for(session_id) != other.shard_id]
+                if leaving:
+                    moved += self._request(other, 'evict', leaving)
+        logger.info(f"Shard {shard.shard_id} ajouté, {moved} sessions déplacées")
+        return moved
+
+    def stats(self) -> Dict[str, Any]:
+        """Charge de chaque shard et totaux."""
+        shards = [self._request(shard, 'stats') for shard in list(self._shards.values())]
+        return {
+            'shards': shards,
+            'sessions': sum(shard['sessions'] for shard in shards),
+            'calls': sum(shard['calls'] for shard in shards),
+        }
+
+    def close(self) -> None:
+        """Décharge toutes les sessions (instantanés) puis arrête les shards."""
+        if self._closed:
+            return
+        self._closed = True
+        self._stop_evicting.set()
+        if self._evictor is not None:
+            self._evictor.join()
+        for shard in self._shards.values():
+            try:
+                self._request(shard, 'shutdown')
+            except RuntimeError:
+                pass
+            shard.worker.stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class SessionProxy:
+    """Accès à une session du registre avec l'interface de CollaborationManager."""
+
+    __slots__ = ('registry', 'session_id')
+
+    def __init__(self, registry: SessionRegistry, session_id: str):
+        self.registry = registry
+        self.session_id = session_id
+
+    @property
+    def code(self) -> str:
+        return self.registry.call(self.session_id, 'code')
+
+    def __getattr__(self, name: str):
+        if name not in SESSION_METHODS:
+            raise AttributeError(name)
+        return lambda *args, **kwargs: self.registry.call(self.session_id, name, *args, **kwargs)
+
+    def __repr__(self):
+        return f"<SessionProxy {self.session_id} shard={self.registry.shard_for(self.session_id)}>"
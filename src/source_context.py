@@ -0,0 +1,116 @@
+"""
+Module: Contexte source des rapports
+Description: Index des débuts de ligne d'une soumission, mis en cache, pour
+             extraire la ligne fautive et ses voisines sans redécouper le code
+             à chaque rapport, et souligner l'expression en cause à partir des
+             colonnes fournies par les tracebacks 3.11+.
+"""
+
+from array import array
+from typing import Any, Dict, List, Optional
+
+from src.utils import LRUCache
+
+
+class LineIndex:
+    """Décalages de début de chaque ligne d'un texte (construit en une passe)."""
+
+    __slots__ = ('code', '_starts')
+
+    def __init__(self, code: str):
+        self.code = code
+        starts = array('L', [0])
+        find, position = code.find, code.find('\n')
+        while position != -1:
+            starts.append(position + 1)
+            position = find('\n', position + 1)
+        self._starts = starts
+
+    def __len__(self) -> int:
+        # Un retour à la ligne final n'ouvre pas de ligne supplémentaire
+        count = len(self._starts)
+        return count - 1 if count > 1 and self._starts[-1] == len(self.code) else count
+
+    def line(self, lineno: int) -> Optional[str]:
+        """Texte de la ligne `lineno` (à partir de 1), sans le retour à la ligne."""
+        if not 1 <= lineno <= len(self):
+            return None
+        start = self._starts[lineno - 1]
+        end = self._starts[lineno] - 1 if lineno < len(self._starts) else len(self.code)
+        return self.code[start:end].rstrip('\r')
+
+
+class SourceContext:
+    """
+    Extrait la ligne en erreur et son contexte à partir d'index mis en cache.
+
+    Le cache est indexé par le texte de la soumission lui-même : Python
+    mémorise le hash d'une chaîne, donc un nouveau rapport sur une soumission
+    déjà indexée ne coûte qu'une recherche dans le dictionnaire, même pour un
+    code de plusieurs milliers de lignes (un `code_hash` recalculerait
+    l'empreinte du texte complet à chaque appel).
+    """
+
+    def __init__(self, maxsize: int = 256, context_lines: int = 2):
+        self.context_lines = context_lines
+        self._indexes = LRUCache(maxsize)
+
+    def index(self, code: str) -> LineIndex:
+        index = self._indexes.get(code)
+        if index is None:
+            index = LineIndex(code)
+            self._indexes.put(code, index)
+        return index
+
+    def extract(self, code: str, lineno: int, colno: Optional[int] = None,
+                end_colno: Optional[int] = None, end_lineno: Optional[int] = None,
+                context_lines: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Ligne `lineno`, lignes voisines et soulignement de l'expression.
+
+        `colno`/`end_colno` sont des décalages en octets UTF-8 ; si
+        l'expression continue sur les lignes suivantes, elle est soulignée
+        jusqu'à la fin de la ligne fautive.
+        """
+        index = self.index(code)
+        source = index.line(lineno)
+        if source is None:
+            return None
+        radius = self.context_lines if context_lines is None else context_lines
+        first, last = max(1, lineno - radius), min(len(index), lineno + radius)
+        return {
+            'line': lineno,
+            'source': source,
+            'context': [(number, index.line(number)) for number in range(first, last + 1)],
+            'caret': _caret(source, colno, end_colno if end_lineno in (None, lineno) else None),
+        }
+
+    def stats(self) -> Dict[str, int]:
+        return {'size': len(self._indexes), 'hits': self._indexes.hits, 'misses': self._indexes.misses}
+
+
+def _caret(source: str, colno: Optional[int], end_colno: Optional[int]) -> Optional[str]:
+    if colno is None:
+        return None
+    encoded = source.encode('utf-8', 'surrogatepass')
+    start = _char_offset(encoded, colno)
+    end = _char_offset(encoded, end_colno) if end_colno is not None else len(source.rstrip())
+    # Les tabulations sont conservées pour que le soulignement reste aligné
+    padding = ''.join(char if char == '\t' else ' ' for char in source[:start])
+    return padding + '^' * max(1, end - start)
+
+
+def _char_offset(encoded: bytes, byte_offset: int) -> int:
+    return len(encoded[:byte_offset].decode('utf-8', 'replace'))
+
+
+def format_context(context: Dict[str, Any]) -> List[str]:
+    """Lignes numérotées du contexte, la ligne fautive marquée par '>'."""
+    width = len(str(context['context'][-1][0]))
+    lines = []
+    for number, text in context['context']:
+        marker = '>' if number == context['line'] else ' '
+        lines.append(f"{marker} {number:>{width}} | {text}")
+        if number == context['line'] and context['caret']:
+            lines.append(f"  {' ' * width} | {context['caret']}")
+    return lines
@@ -0,0 +1,267 @@
+"""
+Module: Analyse statique avant exécution
+Description: Parcourt l'AST d'une soumission une seule fois pour détecter ce
+             qui échouera à coup sûr dans le bac à sable : appels de builtins
+             interdits, instructions `import` et noms jamais définis. Le
+             moteur peut ainsi rejeter ces soumissions sans les exécuter.
+
+Un problème protégé par un `try` dont un `except` intercepte l'erreur
+produite n'est pas signalé. Un problème dans du code qui peut ne jamais
+s'exécuter (branche de `if`, corps de boucle ou de fonction, `except`,
+instruction d'un `try` après la première...) n'est qu'un avertissement : la
+soumission est exécutée quand même. Un nom indéfini l'est aussi quand le
+module utilise `exec`, `eval`, `globals`, `vars` ou `locals`.
+"""
+
+import ast
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from src.execution_result import ExceptionInfo, ExecutionResult, FrameInfo
+from src.sandbox import DEFAULT_POLICY, SandboxPolicy
+from src.session import DYNAMIC_ACCESS
+from src.utils import LRUCache, code_hash
+
+# Noms fournis par le moteur dans les globals de chaque exécution
+ENGINE_GLOBALS = frozenset({'__name__', '__builtins__'})
+
+IMPORT_MESSAGE = "Import operations are restricted for security."
+
+_DEFINITIONS = frozenset({ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef})
+# Noeuds qui lient un nom via un attribut `name` optionnel
+_CAPTURES = frozenset({ast.ExceptHandler, ast.MatchAs, ast.MatchStar})
+# Champs qui peuvent ne jamais s'exécuter, par type de noeud
+_CONDITIONAL_FIELDS = {
+    ast.If: ('body', 'orelse'),
+    ast.IfExp: ('body', 'orelse'),
+    ast.While: ('body', 'orelse'),
+    ast.For: ('body', 'orelse'),
+    ast.AsyncFor: ('body', 'orelse'),
+    ast.FunctionDef: ('body',),
+    ast.AsyncFunctionDef: ('body',),
+    ast.Lambda: ('body',),
+    ast.ExceptHandler: ('body',),
+    ast.match_case: ('guard', 'body'),
+    ast.ListComp: ('elt',),
+    ast.SetComp: ('elt',),
+    ast.GeneratorExp: ('elt',),
+    ast.DictComp: ('key', 'value'),
+}
+_TRY_NODES = frozenset({ast.Try, ast.TryStar} if hasattr(ast, 'TryStar') else {ast.Try})
+_NO_CATCH: FrozenSet[str] = frozenset()
+
+
+class Issue:
+    """Problème détecté statiquement. Les colonnes sont en octets UTF-8, comme `FrameInfo`."""
+
+    __slots__ = ('kind', 'name', 'lineno', 'col_offset', 'end_col_offset', 'warning')
+
+    # Type d'erreur que l'exécution aurait produit, et message associé
+    KINDS = {
+        'forbidden': ('SecurityError', ('NameError', 'Exception', 'BaseException')),
+        'import': ('ImportError', ('ImportError', 'Exception', 'BaseException')),
+        'undefined': ('NameError', ('NameError', 'Exception', 'BaseException')),
+    }
+
+    def __init__(self, kind: str, name: str, lineno: int, col_offset: Optional[int] = None,
+                 end_col_offset: Optional[int] = None, warning: bool = False):
+        self.kind = kind
+        self.name = name
+        self.lineno = lineno
+        self.col_offset = col_offset
+        self.end_col_offset = end_col_offset
+        self.warning = warning
+
+    @property
+    def error_type(self) -> str:
+        return self.KINDS[self.kind][0]
+
+    @property
+    def message(self) -> str:
+        if self.kind == 'import':
+            return IMPORT_MESSAGE
+        undefined = f"name '{self.name}' is not defined"
+        return f"Restricted function call: {undefined}" if self.kind == 'forbidden' else undefined
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {slot: getattr(self, slot) for slot in self.__slots__}
+        data['message'] = self.message
+        return data
+
+    def __repr__(self):
+        level = " (warning)" if self.warning else ""
+        return f"<Issue {self.kind} {self.name!r} line {self.lineno}{level}>"
+
+
+class PreflightReport:
+    """
+    Résultat de l'analyse : problèmes triés par position dans le code.
+
+    `ok` est vrai s'il n'y a que des avertissements (`warnings`) ; seules les
+    `errors` justifient de rejeter la soumission.
+    """
+
+    __slots__ = ('issues',)
+
+    def __init__(self, issues: Tuple[Issue, ...] = ()):
+        self.issues = issues
+
+    @property
+    def errors(self) -> Tuple[Issue, ...]:
+        return tuple(issue for issue in self.issues if not issue.warning)
+
+    @property
+    def warnings(self) -> Tuple[Issue, ...]:
+        return tuple(issue for issue in self.issues if issue.warning)
+
+    @property
+    def ok(self) -> bool:
+        return all(issue.warning for issue in self.issues)
+
+    def to_result(self) -> ExecutionResult:
+        """
+        Résultat d'échec équivalent à celui de l'exécution, sans exécution.
+
+        `error` et `exception` décrivent le premier problème (celui que
+        l'exécution aurait rencontré) ; `preflight` les liste tous.
+        """
+        first = self.errors[0]
+        error_type, mro = Issue.KINDS[first.kind]
+        frame = FrameInfo('<module>', first.lineno, first.lineno, first.col_offset, first.end_col_offset)
+        return ExecutionResult(
+            error=f"{error_type}: {first.message}",
+            traceback="Rejected by static analysis",
+            exception=ExceptionInfo(error_type, mro[0], first.message, mro, (frame,)),
+            preflight=[issue.to_dict() for issue in self.issues])
+
+    def __repr__(self):
+        return f"<PreflightReport {len(self.issues)} issues>"
+
+
+class StaticAnalyzer:
+    """
+    Analyseur AST lié à une politique de sandbox, avec cache par empreinte.
+
+    L'analyse est volontairement prudente : un nom n'est signalé comme
+    indéfini que s'il n'est lié nulle part dans le module (affectation,
+    paramètre, définition, import, cible de boucle...), sans tenir compte de
+    la portée, et seul le code exécuté à coup sûr produit des erreurs, pour
+    ne jamais rejeter un code valide.
+    """
+
+    def __init__(self, policy: SandboxPolicy = DEFAULT_POLICY, cache_size: int = 1024):
+        self.policy = policy
+        self._known = frozenset(policy.allowed) | ENGINE_GLOBALS
+        self._cache = LRUCache(cache_size)
+
+    def analyze(self, code: str) -> PreflightReport:
+        key = code_hash(code)
+        report = self._cache.get(key)
+        if report is None:
+            report = self._analyze(code)
+            self._cache.put(key, report)
+        return report
+
+    def _analyze(self, code: str) -> PreflightReport:
+        try:
+            tree = ast.parse(code, '<string>')
+        except (SyntaxError, ValueError):
+            # Laissé à l'exécution, qui produit le rapport SyntaxError habituel
+            return PreflightReport()
+
+        bound: Set[str] = set()
+        loads: List[Tuple[ast.Name, FrozenSet[str], bool]] = []
+        issues: List[Issue] = []
+        imports_denied = self.policy.is_denied('__import__')
+        star_import = False
+
+        # Single iterative traversal; dispatch on the exact node type is
+        # noticeably cheaper than ast.walk plus an isinstance chain. Each
+        # entry carries the exception names caught around the node and
+        # whether the node may never run.
+        stack: List[Tuple[ast.AST, FrozenSet[str], bool]] = [(tree, _NO_CATCH, False)]
+        while stack:
+            node, caught, conditional = stack.pop()
+            node_type = type(node)
+            if node_type is ast.Name:
+                if type(node.ctx) is ast.Load:
+                    loads.append((node, caught, conditional))
+                else:
+                    bound.add(node.id)
+                continue
+            if node_type in _DEFINITIONS:
+                bound.add(node.name)
+            elif node_type is ast.arg:
+                bound.add(node.arg)
+                continue
+            elif node_type is ast.Import or node_type is ast.ImportFrom:
+                for alias in node.names:
+                    if alias.name == '*':
+                        star_import = True
+                    else:
+                        bound.add(alias.asname or alias.name.split('.')[0])
+                if imports_denied:
+                    _report(issues, 'import', _import_name(node), node, caught, conditional)
+                continue
+            elif node_type in _CAPTURES and node.name:
+                bound.add(node.name)
+            elif node_type is ast.MatchMapping and node.rest:
+                bound.add(node.rest)
+            conditional_fields = _CONDITIONAL_FIELDS.get(node_type, ())
+            body_caught = _caught_names(node.handlers) | caught if node_type in _TRY_NODES else caught
+            for field in node._fields:
+                value = getattr(node, field, None)
+                state = (body_caught if field == 'body' else caught,
+                         conditional or field in conditional_fields)
+                if field == 'body' and node_type in _TRY_NODES:
+                    # Each statement after the first runs only if the previous ones did not raise
+                    stack.extend((child, state[0], True) for child in value[1:])
+                    stack.extend((child,) + state for child in value[:1])
+                elif type(value) is list:
+                    stack.extend((child,) + state for child in value if isinstance(child, ast.AST))
+                elif isinstance(value, ast.AST):
+                    stack.append((value,) + state)
+
+        # exec("y = 1") or globals()['y'] = 1 can bind names the AST does not show
+        dynamic = any(node.id in DYNAMIC_ACCESS and node.id not in bound for node, _, _ in loads)
+        for node, caught, conditional in loads:
+            name = node.id
+            if name in bound:
+                continue
+            if self.policy.is_denied(name):
+                _report(issues, 'forbidden', name, node, caught, conditional)
+            elif name not in self._known and not star_import:
+                _report(issues, 'undefined', name, node, caught, conditional or dynamic)
+
+        issues.sort(key=lambda issue: (issue.lineno, issue.col_offset or 0))
+        return PreflightReport(tuple(issues))
+
+    def stats(self) -> Dict[str, int]:
+        return {'size': len(self._cache), 'hits': self._cache.hits, 'misses': self._cache.misses}
+
+
+def _report(issues: List[Issue], kind: str, name: str, node: ast.AST,
+            caught: FrozenSet[str], conditional: bool) -> None:
+    if caught.isdisjoint(Issue.KINDS[kind][1]):
+        issues.append(Issue(kind, name, node.lineno, node.col_offset, node.end_col_offset,
+                            warning=conditional))
+
+
+def _caught_names(handlers: List[ast.ExceptHandler]) -> FrozenSet[str]:
+    """Noms des exceptions interceptées par des `except` (`BaseException` pour un `except:` nu)."""
+    names = set()
+    for handler in handlers:
+        types = handler.type.elts if isinstance(handler.type, ast.Tuple) else [handler.type]
+        for exc_type in types:
+            if exc_type is None:
+                names.add('BaseException')
+            elif isinstance(exc_type, ast.Name):
+                names.add(exc_type.id)
+            elif isinstance(exc_type, ast.Attribute):
+                names.add(exc_type.attr)
+    return frozenset(names)
+
+
+def _import_name(node: ast.AST) -> str:
+    if isinstance(node, ast.ImportFrom):
+        return node.module or '.'
+    return node.names[0].name
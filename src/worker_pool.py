@@ -0,0 +1,210 @@
+"""
+Module: Pool de workers pré-forkés
+Description: Exécute les soumissions dans des processus workers "chauds",
+             forkés une seule fois, pour utiliser tous les coeurs et isoler
+             le processus hôte des soumissions lentes ou qui plantent.
+"""
+
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+from src.execution_result import ExecutionResult
+
+
+# Extrémité enfant du pipe, définie uniquement dans un processus worker
+_channel = None
+
+
+def emit(message: Any) -> None:
+    """
+    Envoie un message intermédiaire au parent pendant une tâche (ex: un
+    morceau de sortie). Sans effet hors d'un processus worker.
+    """
+    if _channel is not None:
+        _channel.send(('message', message))
+
+
+def _worker_main(conn, handler: Callable[..., Dict[str, Any]]):
+    """Boucle d'un worker : reçoit une tâche, renvoie le dictionnaire résultat."""
+    global _channel
+    _channel = conn
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            break
+        if task is None:
+            break
+        conn.send(('result', handler(*task)))
+    conn.close()
+
+
+class Worker:
+    """
+    Un processus worker et l'extrémité parent de son pipe.
+
+    `WorkerPool` en gère plusieurs ; un worker seul sert aux processus dédiés
+    (ex: un shard de `SessionRegistry`) via `request`.
+    """
+    __slots__ = ('process', 'conn')
+
+    def __init__(self, ctx, handler):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn, handler), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def request(self, *task: Any) -> Any:
+        """
+        Envoie une tâche et attend son résultat (bloquant, sans délai). Les
+        messages `emit` sont ignorés ; `EOFError`/`OSError` si le worker meurt.
+        """
+        self.conn.send(task)
+        while True:
+            kind, payload = self.conn.recv()
+            if kind == 'result':
+                return payload
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class WorkerPool:
+    """
+    Pool de processus pré-forkés partageant un même handler.
+
+    Chaque appel à `submit` emprunte un worker libre, lui envoie la tâche et
+    attend le résultat ; les appels concurrents (threads) s'exécutent donc en
+    parallèle sur des workers distincts. Un worker qui meurt en cours de tâche
+    est remplacé et la tâche revient sous forme de résultat en échec.
+
+    Le handler est hérité par fork : il n'a pas besoin d'être picklable.
+    Si `recycle` renvoie True pour un résultat, le worker qui l'a produit est
+    remplacé par un processus neuf (ex: après un MemoryError).
+    """
+
+    def __init__(self, handler: Callable[..., Dict[str, Any]], size: Optional[int] = None,
+                 recycle: Optional[Callable[[Dict[str, Any]], bool]] = None):
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise RuntimeError("WorkerPool requires the 'fork' start method")
+        self.size = size or os.cpu_count() or 1
+        self._ctx = multiprocessing.get_context('fork')
+        self._handler = handler
+        self._recycle = recycle
+        self._idle: "queue.Queue[Worker]" = queue.Queue()
+        self._workers: List[Worker] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self.tasks_completed = 0
+        self.restarts = 0
+        for _ in range(self.size):
+            self._spawn()
+        logger.info(f"WorkerPool démarré avec {self.size} workers")
+
+    def _spawn(self) -> Worker:
+        worker = Worker(self._ctx, self._handler)
+        with self._lock:
+            self._workers.append(worker)
+        self._idle.put(worker)
+        return worker
+
+    def _replace(self, worker: Worker) -> None:
+        with self._lock:
+            self._workers.remove(worker)
+            self.restarts += 1
+        worker.stop()
+        if not self._closed:
+            self._spawn()
+
+    def submit(self, *task: Any, timeout: Optional[float] = None,
+               on_message: Optional[Callable[[Any], None]] = None) -> Dict[str, Any]:
+        """
+        Exécute une tâche sur le premier worker libre (bloquant).
+
+        Si `timeout` est fourni et que le worker n'a pas répondu à temps, il
+        est tué et remplacé : c'est le filet de sécurité pour du code bloqué
+        hors de portée des limites internes au worker. Les messages envoyés
+        par le handler via `emit` sont transmis à `on_message` au fil de l'eau.
+        """
+        if self._closed:
+            raise RuntimeError("WorkerPool is closed")
+        worker = self._idle.get()
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        try:
+            worker.conn.send(task)
+            while True:
+                if deadline is not None and not worker.conn.poll(max(deadline - time.monotonic(), 0)):
+                    logger.warning(f"Worker {worker.process.pid} sans réponse après {timeout}s, arrêt forcé")
+                    worker.process.kill()
+                    self._replace(worker)
+                    return _failed_result(f"TimeoutError: worker killed after {timeout}s")
+                kind, payload = worker.conn.recv()
+                if kind == 'result':
+                    result = payload
+                    break
+                if on_message is not None:
+                    on_message(payload)
+        except (EOFError, OSError):
+            worker.process.join(timeout=1)
+            exitcode = worker.process.exitcode
+            logger.warning(f"Worker {worker.process.pid} perdu (exitcode={exitcode}), remplacement")
+            self._replace(worker)
+            if exitcode == -signal.SIGXCPU:
+                return _failed_result("TimeoutError: CPU time limit exceeded (SIGXCPU)")
+            return _failed_result(f"WorkerCrashedError: worker process exited with code {exitcode}")
+        with self._lock:
+            self.tasks_completed += 1
+        if self._recycle is not None and self._recycle(result):
+            self._replace(worker)
+        else:
+            self._idle.put(worker)
+        return result
+
+    def map(self, tasks: Iterable[Tuple[Any, ...]]) -> List[Dict[str, Any]]:
+        """Répartit un lot de tâches sur tous les workers et conserve l'ordre."""
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            return list(executor.map(lambda task: self.submit(*task), tasks))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'workers': len(self._workers),
+                'tasks_completed': self.tasks_completed,
+                'restarts': self.restarts,
+            }
+
+    def close(self) -> None:
+        """Arrête proprement tous les workers."""
+        if self._closed:
+            return
+        self._closed = True
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _failed_result(error: str) -> ExecutionResult:
+    return ExecutionResult(error=error)
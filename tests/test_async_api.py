@@ -0,0 +1,43 @@
+import asyncio
+import pytest
+from src.execution_engine import ExecutionEngine
+
+@pytest.fixture
+def engine():
+    engine = ExecutionEngine(timeout=2)
+    yield engine
+    engine.close()
+
+def test_execute_code_async(engine):
+    result = asyncio.run(engine.execute_code_async("print('async')"))
+    assert result['success'] is True
+    assert "async" in result['output']
+
+def test_execute_many_streams_all_results(engine):
+    async def collect():
+        return [item async for item in engine.execute_many(
+            ["print(1)", ("print(input())", "hi"), "1 / 0"], concurrency=2)]
+    results = dict(asyncio.run(collect()))
+    assert sorted(results) == [0, 1, 2]
+    assert "hi" in results[1]['output']
+    assert "ZeroDivisionError" in results[2]['error']
+
+def test_execute_many_per_item_timeout(engine):
+    async def collect():
+        return [item async for item in engine.execute_many(
+            ["while True: pass", "print('ok')"], concurrency=2, timeout=0.2)]
+    results = dict(asyncio.run(collect()))
+    assert results[0]['error'].startswith("TimeoutError")
+    assert results[1]['success'] is True
+
+def test_event_loop_not_blocked(engine):
+    async def scenario():
+        ticks = 0
+        task = asyncio.ensure_future(engine.execute_code_async("while True: pass", timeout=0.3))
+        while not task.done():
+            ticks += 1
+            await asyncio.sleep(0.01)
+        return ticks, task.result()
+    ticks, result = asyncio.run(scenario())
+    assert ticks > 5
+    assert result['error'].startswith("TimeoutError")
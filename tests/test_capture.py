@@ -0,0 +1,79 @@
+import asyncio
+import sys
+import threading
+import pytest
+from src.capture import OutputCapture, capture_output
+from src.execution_engine import ExecutionEngine
+
+def test_capture_truncates_at_byte_limit():
+    capture = OutputCapture(max_bytes=5)
+    capture.write("hello world")
+    capture.write("ignored")
+    assert capture.truncated is True
+    assert capture.getvalue().startswith("hello")
+    assert "ignored" not in capture.getvalue()
+
+def test_capture_counts_utf8_bytes():
+    capture = OutputCapture(max_bytes=4)
+    capture.write("éé")
+    assert capture.truncated is False
+    capture.write("é")
+    assert capture.truncated is True
+
+def test_capture_is_per_thread():
+    original = sys.stdout
+    captures = [OutputCapture(), OutputCapture()]
+
+    def worker(capture, text):
+        with capture_output(capture, OutputCapture()):
+            for _ in range(200):
+                print(text)
+
+    threads = [threading.Thread(target=worker, args=(c, str(i))) for i, c in enumerate(captures)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert set(captures[0].getvalue().split()) == {"0"}
+    assert set(captures[1].getvalue().split()) == {"1"}
+    assert sys.stdout is original
+
+def test_engine_flags_truncated_output():
+    engine = ExecutionEngine(max_output_bytes=100)
+    result = engine.execute_code("while True: print('spam')", timeout=0.2)
+    assert result['output_truncated'] is True
+    assert len(result['output']) < 200
+
+def test_engine_streams_chunks():
+    chunks = []
+    ExecutionEngine().execute_code("print('a'); print('b')", on_output=lambda s, t: chunks.append(t))
+    assert "".join(chunks) == "a\nb\n"
+
+def test_execute_code_stream():
+    async def collect():
+        return [item async for item in ExecutionEngine().execute_code_stream("print(1)")]
+    items = asyncio.run(collect())
+    assert items[0] == ('stdout', '1')
+    assert items[-1][0] == 'result'
+    assert items[-1][1]['success'] is True
+
+def test_execute_code_stream_raises_engine_errors(monkeypatch):
+    engine = ExecutionEngine()
+    def broken(*args):
+        args[-1]('stdout', 'partial')
+        raise RuntimeError("engine failure")
+    monkeypatch.setattr(engine, "execute_code", broken)
+    items = []
+    async def collect():
+        async for item in engine.execute_code_stream("print(1)"):
+            items.append(item)
+    with pytest.raises(RuntimeError, match="engine failure"):
+        asyncio.run(asyncio.wait_for(collect(), 5))
+    assert items == [('stdout', 'partial')]
+
+def test_pool_streams_chunks():
+    chunks = []
+    with ExecutionEngine(backend='pool', workers=1) as engine:
+        result = engine.execute_code("print('live')", on_output=lambda s, t: chunks.append(t))
+    assert "live" in "".join(chunks)
+    assert "live" in result['output']
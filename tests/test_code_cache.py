@@ -0,0 +1,43 @@
+import pytest
+from src.code_cache import CodeCache
+from src.execution_engine import ExecutionEngine
+
+@pytest.fixture
+def cache():
+    return CodeCache(maxsize=2)
+
+def test_hit_returns_same_code_object(cache):
+    first = cache.compile("x = 1")
+    assert cache.compile("x = 1") is first
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+def test_syntax_error_is_cached(cache):
+    with pytest.raises(SyntaxError) as first:
+        cache.compile("if True print(1)")
+    with pytest.raises(SyntaxError) as second:
+        cache.compile("if True print(1)")
+    assert str(first.value) == str(second.value)
+    assert second.value.lineno == 1
+    assert cache.stats()['hits'] == 1
+
+def test_lru_eviction(cache):
+    for code in ("a = 1", "b = 2", "c = 3"):
+        cache.compile(code)
+    assert cache.stats()['size'] == 2
+    cache.compile("a = 1")
+    assert cache.stats()['misses'] == 4
+
+def test_disk_cache_survives_restart(tmp_path):
+    CodeCache(cache_dir=str(tmp_path)).compile("print('warm')")
+    warm = CodeCache(cache_dir=str(tmp_path))
+    warm.compile("print('warm')")
+    assert warm.stats()['disk_hits'] == 1
+
+def test_engine_shares_cache_between_validate_and_execute():
+    engine = ExecutionEngine()
+    engine.validate_code("print(1)")
+    engine.execute_code("print(1)")
+    stats = engine.get_stats()['code_cache']
+    assert stats['misses'] == 1
+    assert stats['hits'] == 1
@@ -0,0 +1,116 @@
+import asyncio
+import json
+import pytest
+from src.collab_server import CollaborationClient, CollaborationError, CollaborationServer, encode
+from src.event_log import FileEventLog
+
+def run(scenario):
+    async def main():
+        async with CollaborationServer(port=0) as server:
+            return await scenario(server)
+    return asyncio.run(main())
+
+def test_events_are_broadcast_to_subscribers():
+    async def scenario(server):
+        async with CollaborationClient(server.host, server.port) as alice, \
+                CollaborationClient(server.host, server.port) as bob:
+            await alice.subscribe("tp1", user="Alice")
+            reply = await bob.subscribe("tp1", user="Bob")
+            assert reply["collaborators"] == ["Alice", "Bob"]
+            await alice.log_correction("tp1", "Alice", "NameError", "Variable définie")
+            seen = [(await bob.next_event(1))["event"]["type"] for _ in range(2)]
+            assert seen == ["join", "correction"]
+            assert (await alice.next_event(1))["event"]["data"]["user"] == "Alice"
+        return server.manager("tp1").get_session_summary()
+    summary = run(scenario)
+    assert summary["total_collaborators"] == 2 and summary["total_fixes"] == 1
+
+def test_sessions_are_isolated():
+    async def scenario(server):
+        async with CollaborationClient(server.host, server.port) as client:
+            await client.subscribe("a")
+            await client.join("b", "Carol")
+            await client.join("a", "Dave")
+            event = await client.next_event(1)
+            assert event["session"] == "a" and event["event"]["data"]["user"] == "Dave"
+            assert client.events.empty()
+    run(scenario)
+
+def test_invalid_requests_return_errors():
+    async def scenario(server):
+        async with CollaborationClient(server.host, server.port) as client:
+            with pytest.raises(CollaborationError):
+                await client.request("explode", "tp1")
+            with pytest.raises(CollaborationError):
+                await client.request("correction", "tp1", user="Alice")
+            assert (await client.join("tp1", "Alice"))["seq"] == 2
+    run(scenario)
+
+def test_slow_consumer_is_disconnected():
+    async def main():
+        async with CollaborationServer(port=0, max_queue=5) as server:
+            async with CollaborationClient(server.host, server.port) as client:
+                await client.subscribe("busy")
+                manager = server.manager("busy")
+                # A burst published within one loop iteration overflows the queue
+                for i in range(10):
+                    manager.log_correction("bot", "TypeError", str(i))
+                await asyncio.sleep(0.05)
+                return server.stats()
+    stats = asyncio.run(main())
+    assert stats["slow_consumers"] == 1
+    assert stats["subscriptions"] == 0
+
+def test_reconnecting_subscriber_catches_up(tmp_path):
+    async def main():
+        log = FileEventLog(str(tmp_path))
+        async with CollaborationServer(log, port=0) as server:
+            async with CollaborationClient(server.host, server.port) as writer:
+                await writer.join("tp2", "Alice")
+                await writer.log_correction("tp2", "Alice", "SyntaxError")
+            async with CollaborationClient(server.host, server.port) as late:
+                await late.subscribe("tp2", after_seq=1)
+                return [(await late.next_event(1))["event"]["seq"] for _ in range(2)]
+    assert asyncio.run(main()) == [2, 3]
+
+def test_polling_summary_and_fixes():
+    async def scenario(server):
+        async with CollaborationClient(server.host, server.port) as client:
+            for i in range(3):
+                await client.log_correction("tp3", "Alice", "NameError", str(i))
+            summary = await client.summary("tp3")
+            assert summary["fixes_by_error"] == {"NameError": 3} and "fixes" not in summary
+            page = await client.fixes_since("tp3", cursor=1)
+            assert [fix["description"] for fix in page["fixes"]] == ["1", "2"]
+            assert page["cursor"] == 3 and not page["has_more"]
+    run(scenario)
+
+def test_unexpected_failure_keeps_connection_open():
+    async def scenario(server):
+        async with CollaborationClient(server.host, server.port) as client:
+            with pytest.raises(CollaborationError, match="OverflowError"):
+                await client.fixes_since("s1", cursor=float("inf"))
+            with pytest.raises(CollaborationError):
+                await client.edit("s1", "mallory", [["i"]])
+            await client.join("s1", "Alice")
+        return server.manager("s1").get_session_summary()["total_collaborators"]
+    assert run(scenario) == 1
+
+def test_client_that_stops_reading_is_slowed_not_dropped():
+    async def main():
+        async with CollaborationServer(port=0, max_queue=8) as server:
+            manager = server.manager("big")
+            for i in range(200):
+                manager.log_correction("Alice", "NameError", "x" * 100)
+            reader, writer = await asyncio.open_connection(server.host, server.port, limit=2 ** 20)
+            requests = 300
+            for i in range(requests):
+                writer.write(encode({"op": "fixes", "session": "big", "id": i, "limit": 200}))
+            await writer.drain()
+            await asyncio.sleep(0.3)  # replies (~6 MB) pile up while nobody reads
+            replies = [json.loads(await reader.readline()) for _ in range(requests)]
+            writer.close()
+            return replies, server.stats()
+    replies, stats = asyncio.run(main())
+    assert [reply["id"] for reply in replies] == list(range(300))
+    assert stats["slow_consumers"] == 0
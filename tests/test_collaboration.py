@@ -24,3 +24,34 @@ def test_session_summary(manager):
     assert summary["total_collaborators"] == 1
     assert summary["total_fixes"] == 1
     assert "Membre2" in manager.format_collab_report()
+
+def test_incremental_counters(manager):
+    manager.log_correction("Alice", "NameError", "a")
+    manager.log_correction("Bob", "NameError", "b")
+    manager.log_correction("Alice", "TypeError", "c")
+    summary = manager.get_session_summary(include_fixes=False)
+    assert "fixes" not in summary
+    assert summary["fixes_by_user"] == {"Alice": 2, "Bob": 1}
+    assert summary["fixes_by_error"] == {"NameError": 2, "TypeError": 1}
+    assert summary["cursor"] == summary["total_fixes"] == 3
+
+def test_fixes_pagination(manager):
+    for i in range(5):
+        manager.log_correction("Alice", "NameError", str(i))
+    page = manager.get_fixes_since(0, limit=2)
+    assert [fix["description"] for fix in page["fixes"]] == ["0", "1"]
+    assert page["has_more"]
+    page = manager.get_fixes_since(page["cursor"], limit=10)
+    assert [fix["description"] for fix in page["fixes"]] == ["2", "3", "4"]
+    assert not page["has_more"]
+    manager.log_correction("Bob", "TypeError", "5")
+    assert manager.get_fixes_since(page["cursor"])["fixes"][0]["user"] == "Bob"
+
+def test_report_is_built_in_chunks(manager):
+    manager.register_collaborator("Alice")
+    for i in range(5):
+        manager.log_correction("Alice", "NameError", str(i))
+    chunks = list(manager.iter_collab_report(page_size=2))
+    assert len(chunks) == 5 and chunks[-1] == "*" * 40
+    report = manager.format_collab_report()
+    assert report.count("Alice a corrigé NameError") == 5
@@ -0,0 +1,108 @@
+import asyncio
+import json
+import random
+import pytest
+from src.collab_server import CollaborationClient, CollaborationServer
+from src.collaboration import CollaborationManager
+from src.crdt import Document
+from src.event_log import FileEventLog
+from src.execution_engine import ExecutionEngine
+
+def roundtrip(ops):
+    # Ops travel as JSON between replicas
+    return json.loads(json.dumps(ops))
+
+def test_local_edits():
+    doc = Document(1, "print('hi')")
+    doc.insert(len(doc), "\nprint(2)")
+    doc.delete(0, 5)
+    assert doc.text() == "('hi')\nprint(2)"
+    doc.replace("x = 1")
+    assert str(doc) == "x = 1"
+
+def test_concurrent_edits_converge_in_any_order():
+    rnd = random.Random(7)
+    for _ in range(50):
+        docs = [Document(client) for client in (1, 2, 3)]
+        base = docs[0].insert(0, "def f(x):\n    return x\n")
+        for doc in docs[1:]:
+            doc.apply(roundtrip(base))
+        sent = []
+        for _ in range(20):
+            doc = rnd.choice(docs)
+            if len(doc) and rnd.random() < 0.3:
+                ops = doc.delete(rnd.randrange(len(doc)), rnd.randint(1, 3))
+            else:
+                ops = doc.insert(rnd.randint(0, len(doc)), rnd.choice(["a", "bc", "\n"]))
+            sent.extend(ops)
+        for doc in docs:
+            shuffled = roundtrip(sent)
+            rnd.shuffle(shuffled)
+            doc.apply(shuffled)
+            doc.apply(roundtrip(sent[:5]))  # duplicates are ignored
+        assert len({doc.text() for doc in docs}) == 1
+        assert all(doc.pending() == 0 for doc in docs)
+
+def test_concurrent_runs_do_not_interleave():
+    alice, bob = Document(1, "x"), Document(2)
+    bob.apply(alice.encode_delta())
+    typed_a = alice.insert(1, "a") + alice.insert(2, "b")
+    typed_b = bob.insert(1, "y") + bob.insert(2, "z")
+    alice.apply(typed_b)
+    bob.apply(typed_a)
+    assert alice.text() == bob.text() and alice.text() in ("xabyz", "xyzab")
+
+def test_state_vector_delta_and_compact_log():
+    alice = Document(1)
+    for i, char in enumerate("while True:\n    pass\n"):
+        alice.insert(i, char)
+    assert alice.stats()['ops'] == 1 and alice.stats()['blocks'] == 1
+    bob = Document.from_state(roundtrip(alice.encode_delta()), client_id=2)
+    alice.insert(len(alice), "# fin")
+    delta = alice.encode_delta(roundtrip(bob.state_vector()))
+    assert len(delta) == 1 and delta[0][6] == "# fin"
+    bob.apply(delta)
+    assert bob.text() == alice.text()
+
+def test_manager_document_persists_and_runs(tmp_path):
+    manager = CollaborationManager("code-1", FileEventLog(str(tmp_path)))
+    manager.insert_code("Alice", 0, "print(6 * 7)")
+    replica = Document(99)
+    replica.apply(manager.sync_code()[0])
+    manager.edit_code("Bob", replica.insert(len(replica), "\nprint('ok')"))
+    restored = CollaborationManager("code-1", FileEventLog(str(tmp_path)))
+    assert restored.code == "print(6 * 7)\nprint('ok')"
+    result = restored.run_code(ExecutionEngine())
+    assert result.output == "42\nok\n"
+
+def test_server_relays_edits():
+    async def main():
+        async with CollaborationServer(port=0) as server:
+            async with CollaborationClient(server.host, server.port) as alice, \
+                    CollaborationClient(server.host, server.port) as bob:
+                await bob.subscribe("pair")
+                doc_a, doc_b = Document(1), Document(2)
+                await alice.edit("pair", "Alice", doc_a.insert(0, "x = 1"))
+                doc_b.apply((await bob.next_event(1))["event"]["data"]["ops"])
+                doc_b.apply(await bob.sync("pair", doc_b.state_vector()))
+                return doc_b.text(), server.manager("pair").code
+    assert asyncio.run(main()) == ("x = 1", "x = 1")
+
+def test_malformed_and_far_ahead_ops_are_rejected(tmp_path):
+    doc = Document(1, "abc")
+    for bad in ([['i']], [['i', 2, 1, 1, None, None, 5]], [['d', 2, 1, 1, []]], "ops",
+                [['i', 2, 10 ** 9, 1, None, None, "x"]]):
+        with pytest.raises(ValueError):
+            doc.apply(bad)
+    assert doc.text() == "abc" and doc.pending() == 0
+    # Well formed but pointing at a delete id: no effect, later ops still apply
+    other = Document(2)
+    other.apply(doc.encode_delta())
+    deleted = other.delete(0, 1)
+    doc.apply(deleted + [['d', 3, 1, 9, [[2, deleted[0][2], 1]]], ['i', 3, 2, 10, None, None, "z"]])
+    assert doc.text() == "zbc" and doc.pending() == 0
+    manager = CollaborationManager("guarded", FileEventLog(str(tmp_path)))
+    with pytest.raises(ValueError):
+        manager.edit_code("mallory", [['i']])
+    manager.insert_code("Alice", 0, "ok")
+    assert CollaborationManager("guarded", FileEventLog(str(tmp_path))).code == "ok"
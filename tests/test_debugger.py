@@ -1,5 +1,8 @@
+import json
 import pytest
 from src.debugger import Debugger
+from src.execution_engine import ExecutionEngine
+from src.execution_result import ExecutionResult
 
 @pytest.fixture
 def db():
@@ -32,3 +35,61 @@ def test_formatting_failure(db):
     }
     report = db.format_report(analysis)
     assert "NameError" in report
+
+def test_analyze_structured_exception(db):
+    result = ExecutionEngine().execute_code("x = 1\ndef f():\n    return x / 0\nf()")
+    assert [frame.lineno for frame in result.exception.frames] == [4, 3]
+    analysis = db.analyze(result)
+    assert analysis["error_type"] == "ZeroDivisionError"
+    assert analysis["line_number"] == 3
+    assert analysis["message"] == "division by zero"
+
+def test_analyze_structured_uses_mro(db):
+    result = ExecutionEngine().execute_code("def f():\n  x = 1\n   y = 2")
+    analysis = db.analyze(result)
+    assert analysis["error_type"] == "IndentationError"
+    assert analysis["line_number"] == 3
+    assert "deux-points" in analysis["suggestion"]
+
+def test_analyze_many_summary(db):
+    results = [
+        {'success': True, 'output': ''},
+        {'success': False, 'error': 'SyntaxError: invalid syntax (line 5)'},
+        {'success': False, 'error': 'NameError: x (line 2)'},
+        {'success': False, 'error': 'NameError: y (line 2)'},
+        {'success': False, 'error': 'NameError: z (line 7)'},
+    ]
+    summary = db.analyze_many(results)
+    assert (summary["total"], summary["successes"], summary["failures"]) == (5, 1, 4)
+    assert summary["error_types"] == ["NameError", "SyntaxError"]
+    assert summary["counts"] == [3, 1]
+    assert summary["severities"] == ["Medium", "High"]
+    assert "deux-points" in summary["suggestions"][1]
+    assert summary["by_line"]["NameError"] == {2: 2, 7: 1}
+
+def test_analyze_many_streams_iterator(db):
+    results = ({'success': False, 'error': f'RuntimeError: boom {i}'} for i in range(1000))
+    summary = db.analyze_many(results)
+    assert summary["counts"] == [1000]
+    assert summary["by_line"] == {"RuntimeError": {"Unknown": 1000}}
+    assert db.analyze_many([])["error_types"] == []
+
+def test_report_shows_source_context(db):
+    code = "data = {'a': 1}\nvaleur = data['b'] + 1\nprint(valeur)"
+    analysis = db.analyze(ExecutionEngine().execute_code(code), code=code)
+    assert analysis["context"]["source"] == "valeur = data['b'] + 1"
+    report = db.format_report(analysis)
+    assert "> 2 | valeur = data['b'] + 1" in report
+    assert "|          ^^^^^^^^^" in report
+
+def test_analyze_serialized_results():
+    engine = ExecutionEngine()
+    code = "def f(items):\n    return items[3]\nf([])"
+    result = engine.execute_code(code)
+    data = json.loads(json.dumps(result.to_dict()))
+    analysis = Debugger().analyze(data, code=code)
+    assert analysis["error_type"] == "IndexError"
+    assert analysis["line_number"] == 2
+    assert analysis["context"]["line"] == 2
+    summary = Debugger().analyze_many([data, result.to_dict(), ExecutionResult.from_dict(data)])
+    assert summary["counts"] == [3] and summary["by_line"]["IndexError"] == {2: 3}
@@ -0,0 +1,101 @@
+import os
+import threading
+import pytest
+from src.collaboration import CollaborationManager
+from src.event_log import EventLog, FileEventLog
+
+@pytest.fixture
+def log_dir(tmp_path):
+    return str(tmp_path / "events")
+
+def test_append_and_replay(log_dir):
+    log = FileEventLog(log_dir)
+    for i in range(5):
+        log.append("s1", "join", {"user": f"u{i}"})
+    log.close()
+    events = list(FileEventLog(log_dir).replay("s1", after_seq=2))
+    assert [event["seq"] for event in events] == [3, 4, 5]
+    assert events[0]["data"] == {"user": "u2"}
+    with pytest.raises(ValueError):
+        FileEventLog(log_dir).append("../evil", "join", {})
+
+def test_concurrent_writers_get_contiguous_sequence(log_dir):
+    # Two instances on the same directory behave like two processes (separate flock)
+    logs = [FileEventLog(log_dir), FileEventLog(log_dir)]
+
+    def write(log):
+        for i in range(200):
+            log.append("shared", "correction", {"i": i})
+
+    threads = [threading.Thread(target=write, args=(log,)) for log in logs for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seqs = [event["seq"] for event in logs[0].replay("shared")]
+    assert seqs == list(range(1, 801))
+
+def test_torn_last_line_is_dropped(log_dir):
+    log = FileEventLog(log_dir)
+    log.append("s1", "join", {"user": "a"})
+    log.close()
+    with open(os.path.join(log_dir, "s1.jsonl"), "ab") as f:
+        f.write(b'{"seq": 2, "type": "jo')
+    log = FileEventLog(log_dir)
+    assert [event["seq"] for event in log.replay("s1")] == [1]
+    assert log.append("s1", "join", {"user": "b"})["seq"] == 2
+    assert [event["data"]["user"] for event in log.replay("s1")] == ["a", "b"]
+
+def test_manager_restarts_from_snapshot_and_tail(log_dir):
+    log = FileEventLog(log_dir)
+    manager = CollaborationManager("room-1", log, snapshot_every=10)
+    manager.register_collaborator("Alice")
+    manager.register_collaborator("Bob")
+    manager.remove_collaborator("Bob")
+    for i in range(12):
+        manager.log_correction("Alice", "NameError", f"fix {i}")
+    log.close()
+
+    restored = CollaborationManager("room-1", FileEventLog(log_dir), snapshot_every=10)
+    assert restored.collaborators == {"Alice"}
+    assert restored.get_session_summary()["total_fixes"] == 12
+    assert restored.last_seq == manager.last_seq
+    assert restored.session_start == manager.session_start
+    assert os.path.exists(os.path.join(log_dir, "room-1.snapshot.json"))
+
+def test_manager_is_thread_safe(log_dir):
+    log = FileEventLog(log_dir)
+    manager = CollaborationManager("room-2", log)
+
+    def work(user):
+        manager.register_collaborator(user)
+        for i in range(50):
+            manager.log_correction(user, "TypeError", str(i))
+
+    threads = [threading.Thread(target=work, args=(f"user{n}",)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(manager.correction_history) == 200
+    other = CollaborationManager("room-2", FileEventLog(log_dir))
+    assert other.get_session_summary()["total_fixes"] == 200
+    assert len(other.collaborators) == 4
+
+def test_malformed_events_never_poison_the_session(log_dir):
+    log = FileEventLog(log_dir)
+    manager = CollaborationManager("room-2", log)
+    with pytest.raises(ValueError):
+        manager.register_collaborator(["not", "a", "name"])
+    assert manager.last_seq == 1 and len(list(log.replay("room-2"))) == 1
+    # An event written by another (older) writer without validation
+    log.append("room-2", "join", {"user": ["bad"]})
+    manager.register_collaborator("Alice")
+    log.close()
+    restored = CollaborationManager("room-2", FileEventLog(log_dir))
+    assert restored.collaborators == {"Alice"}
+    assert restored.last_seq == 3
+
+def test_event_log_is_abstract():
+    with pytest.raises(TypeError):
+        EventLog()
@@ -0,0 +1,55 @@
+import json
+import pickle
+import pytest
+from src.debugger import Debugger
+from src.execution_engine import ExecutionEngine
+from src.execution_result import ExecutionResult
+
+def test_dict_compatible_access():
+    result = ExecutionResult(success=True, output="hi")
+    assert result['success'] is True
+    assert result.get('error') == ''
+    assert result.get('missing', 'default') == 'default'
+    assert set(result) == set(ExecutionResult.KEYS)
+    result['output'] += "!"
+    assert result.output == "hi!"
+    result['custom'] = 1
+    assert result['custom'] == 1 and result.to_dict()['custom'] == 1
+    assert len(result) == len(ExecutionResult.KEYS) + 1
+    del result['custom']
+    with pytest.raises(KeyError):
+        result['custom']
+    with pytest.raises(TypeError):
+        del result['success']
+
+def test_lazy_timestamp_and_to_dict():
+    result = ExecutionResult(created_at=0.0)
+    assert len(result['timestamp']) == len("2026-01-28 00:00:00")
+    assert result.to_dict() == dict(result)
+
+def test_slots_and_pickle():
+    result = ExecutionResult(success=False, error="ZeroDivisionError: division by zero")
+    assert not hasattr(result, '__dict__')
+    assert pickle.loads(pickle.dumps(result)) == result
+
+def test_engine_and_debugger_use_result():
+    result = ExecutionEngine().execute_code("1 / 0")
+    assert isinstance(result, ExecutionResult)
+    assert Debugger().analyze(result)['error_type'] == "ZeroDivisionError"
+
+def test_exception_info_survives_pool_and_serialization():
+    with ExecutionEngine(backend='pool', workers=1) as engine:
+        result = engine.execute_code("items = []\nitems[3]")
+    info = result.exception
+    assert info.type == "IndexError" and info.lineno == 2
+    assert "LookupError" in info.mro
+    data = result.to_dict()
+    assert data['exception']['frames'][0]['lineno'] == 2
+    assert json.loads(json.dumps(data))['exception']['type'] == "IndexError"
+
+def test_json_goes_through_to_dict():
+    result = ExecutionEngine().execute_code("1 / 0")
+    assert not isinstance(result, dict)
+    data = json.loads(json.dumps(result.to_dict()))
+    restored = ExecutionResult.from_dict(data)
+    assert restored.exception.type == "ZeroDivisionError" and restored.exception.lineno == 1
@@ -0,0 +1,40 @@
+from src.debugger import Debugger
+from src.execution_engine import ExecutionEngine
+from src.fingerprint import ErrorGroups, fingerprint, normalize_message
+
+def test_normalize_message_strips_literals():
+    assert normalize_message("name 'total' is not defined") == "name <str> is not defined"
+    assert normalize_message('invalid literal for int() with base 10: "abc"') == \
+        "invalid literal for int() with base <num>: <str>"
+    assert normalize_message("list index 3.5e2 at 0x7f3a") == "list index <num> at <addr>"
+    assert normalize_message("var_2 failed") == "var_2 failed"
+
+def test_fingerprint_groups_equivalent_errors():
+    assert fingerprint("NameError", "name 'a' is not defined", "f", 3) == \
+        fingerprint("NameError", "name 'b' is not defined", "f", 3)
+    assert fingerprint("NameError", "name 'a' is not defined", "f", 3) != \
+        fingerprint("NameError", "name 'a' is not defined", "g", 3)
+    assert fingerprint("KeyError", "'a'") != fingerprint("IndexError", "'a'")
+
+def test_error_groups_fold_duplicates():
+    groups = ErrorGroups(sample_size=2)
+    for i in range(100):
+        group, created = groups.add("ZeroDivisionError", "division by zero", "<module>", 4,
+                                    submission_id=f"s{i}", timestamp=1000 + i)
+        assert created == (i == 0)
+    groups.add("KeyError", "'x'", "<module>", 1)
+    assert len(groups) == 2 and groups.total() == 101
+    top = groups.top(1)[0]
+    assert (top.count, top.first_seen, top.last_seen) == (100, 1000, 1099)
+    assert list(top.samples) == ["s0", "s1"]
+
+def test_debugger_reports_fingerprint_and_top_errors():
+    engine, debugger = ExecutionEngine(), Debugger()
+    for i, name in enumerate(["alpha", "beta", "gamma"]):
+        analysis = debugger.analyze(engine.execute_code(f"x = 1\nprint({name})"), submission_id=i)
+    debugger.analyze(engine.execute_code("1 / 0"), submission_id="other")
+    assert analysis["occurrences"] == 3
+    assert "3 occurrences" in debugger.format_report(analysis)
+    top = debugger.top_errors(2)
+    assert [(g["error_type"], g["count"]) for g in top] == [("NameError", 3), ("ZeroDivisionError", 1)]
+    assert top[0]["samples"] == [0, 1, 2] and top[0]["lineno"] == 2
@@ -0,0 +1,48 @@
+import pytest
+from src.execution_engine import ExecutionEngine
+from src.execution_result import ExecutionResult
+from src.history import ExecutionHistory, LatencyHistogram
+
+def _entry(success=True, error='', execution_time=0.01):
+    return ExecutionResult(success=success, error=error, execution_time=execution_time, memory_used=1.0)
+
+def test_ring_buffer_keeps_latest_entries():
+    history = ExecutionHistory(capacity=3)
+    for i in range(5):
+        history.append(ExecutionResult(success=True, output=f"out_{i}"))
+    assert len(history) == 3
+    assert [r.output for r in history] == ["out_2", "out_3", "out_4"]
+    assert [r.output for r in history.latest(2)] == ["out_3", "out_4"]
+
+def test_counters_cover_all_runs():
+    history = ExecutionHistory(capacity=2)
+    history.append(_entry())
+    history.append(_entry(False, "ZeroDivisionError: division by zero"))
+    history.append(_entry(False, "ZeroDivisionError: division by zero"))
+    history.append(_entry(False, "NameError: name 'x' is not defined"))
+    stats = history.stats()
+    assert stats['total_executions'] == 4
+    assert stats['success_rate'] == 25.0
+    assert stats['failures_by_type'] == {'ZeroDivisionError': 2, 'NameError': 1}
+    assert stats['avg_memory_used'] == 1.0
+    assert stats['memory_p50'] == pytest.approx(1.0, rel=0.05)
+    assert stats['memory_p99'] == pytest.approx(1.0, rel=0.05)
+
+def test_latency_percentiles():
+    histogram = LatencyHistogram()
+    for i in range(1, 101):
+        histogram.add(i / 1000)
+    assert histogram.percentile(50) == pytest.approx(0.050, rel=0.05)
+    assert histogram.percentile(99) == pytest.approx(0.099, rel=0.05)
+
+def test_engine_history_and_stats():
+    engine = ExecutionEngine(history_size=5)
+    for _ in range(7):
+        engine.execute_code("print(1)")
+    assert len(engine.execution_history) == 5
+    assert len(engine.get_history(limit=2)) == 2
+    assert engine.get_history(limit=1)[0]['code'] == "print(1)"
+    stats = engine.get_stats()
+    assert stats['total_executions'] == 7
+    assert stats['success_rate'] == 100.0
+    assert stats['latency_p95'] > 0
@@ -0,0 +1,52 @@
+import time
+import pytest
+from src.execution_engine import ExecutionEngine
+from src.history_store import HistoryStore, SQLiteHistoryStore
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteHistoryStore(str(tmp_path / "history.db"), flush_interval=0.05)
+    yield store
+    store.close()
+
+def test_engine_persists_runs(store):
+    engine = ExecutionEngine(history_store=store)
+    engine.execute_code("print(1)")
+    engine.execute_code("1 / 0")
+    store.flush()
+    assert store.count() == 2
+    failures = store.failures("ZeroDivisionError", last=60)
+    assert len(failures) == 1
+    assert failures[0]['code'] == "1 / 0"
+    assert failures[0]['success'] is False
+
+def test_runs_of_snippet(store):
+    for _ in range(3):
+        store.record("x = 1", {'success': True, 'execution_time': 0.1})
+    store.record("y = 2", {'success': True})
+    store.flush()
+    assert len(store.runs_of("x = 1")) == 3
+
+def test_time_window_query(store):
+    store.record("a", {'success': False, 'error': "NameError: name 'a' is not defined"})
+    store.flush()
+    assert store.query(error_type="NameError", since=time.time() + 10) == []
+    assert len(store.query(error_type="NameError", since=time.time() - 10)) == 1
+
+def test_history_survives_restart(tmp_path):
+    path = str(tmp_path / "history.db")
+    first = SQLiteHistoryStore(path)
+    first.record("print(1)", {'success': True})
+    first.close()
+    second = SQLiteHistoryStore(path)
+    assert second.count() == 1
+    second.close()
+
+def test_history_store_is_abstract():
+    with pytest.raises(TypeError):
+        HistoryStore()
+    class Partial(HistoryStore):
+        def record(self, code, result):
+            pass
+    with pytest.raises(TypeError):
+        Partial()
@@ -0,0 +1,83 @@
+import json
+import pytest
+from src.debugger import Debugger
+from src.knowledge_base import KnowledgeBase, Rule
+
+@pytest.fixture
+def rules_file(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({"rules": [
+        {"type": "LookupError", "suggestion": "lookup advice"},
+        {"type": "KeyError", "pattern": "'id'", "suggestion": "id advice", "severity": "High"},
+        {"type": "ValueError", "suggestion": "value advice"},
+    ]}), encoding="utf-8")
+    return path
+
+def test_default_rules_cover_common_errors():
+    kb = KnowledgeBase()
+    assert "deux-points" in kb.suggest("SyntaxError", "invalid syntax")
+    assert "Module introuvable" in kb.suggest("ModuleNotFoundError", "No module named 'numpy'")
+    assert "None" in kb.suggest("AttributeError", "'NoneType' object has no attribute 'x'")
+    assert "documentation" in kb.suggest("RuntimeError", "boom")
+
+def test_hierarchy_and_message_patterns(rules_file):
+    kb = KnowledgeBase([str(rules_file)])
+    assert kb.suggest("IndexError") == "lookup advice"
+    assert kb.suggest("KeyError", "'name'") == "lookup advice"
+    rule = kb.lookup("KeyError", "'id'")
+    assert rule.suggestion == "id advice" and rule.severity == "High"
+    assert kb.suggest("Custom", mro=("Custom", "KeyError", "LookupError")) == "lookup advice"
+    assert kb.lookup("OSError") is None
+
+def test_reload_and_add_rule(rules_file):
+    kb = KnowledgeBase([str(rules_file)])
+    kb.add_rule(Rule("OSError", "os advice"))
+    rules_file.write_text(json.dumps({"rules": [
+        {"type": "ValueError", "suggestion": "new value advice"}]}), encoding="utf-8")
+    kb.reload()
+    assert kb.suggest("ValueError") == "new value advice"
+    assert kb.suggest("IndexError") != "lookup advice"
+    assert kb.suggest("OSError") == "os advice"
+    rules_file.write_text("{not json", encoding="utf-8")
+    with pytest.raises(ValueError):
+        kb.reload()
+    assert kb.suggest("ValueError") == "new value advice"
+
+def test_priority_and_many_rules():
+    rules = [Rule("ValueError", f"advice {i}", pattern=f"code-{i}\\b") for i in range(3000)]
+    rules.append(Rule("ValueError", "urgent", pattern="code-1", priority=5))
+    kb = KnowledgeBase(paths=[], rules=rules)
+    assert len(kb) == 3001
+    assert kb.suggest("ValueError", "failed with code-2999") == "advice 2999"
+    assert kb.suggest("ValueError", "failed with code-17") == "urgent"
+    assert "documentation" in kb.suggest("ValueError", "no code")
+
+def test_patterns_that_cannot_be_merged(rules_file):
+    kb = KnowledgeBase(paths=[], rules=[
+        Rule("ValueError", "flags", pattern="(?i)^BAD VALUE"),
+        Rule("ValueError", "named", pattern="(?P<word>\\w+) is (?P=word)"),
+        Rule("ValueError", "backref", pattern="'(\\w)\\1'"),
+        Rule("ValueError", "plain", pattern="plain"),
+    ])
+    assert kb.suggest("ValueError", "bad value here") == "flags"
+    assert kb.suggest("ValueError", "x is x") == "named"
+    assert kb.suggest("ValueError", "got 'aa'") == "backref"
+    assert kb.suggest("ValueError", "got 'ab' plain") == "plain"
+    assert "documentation" in kb.suggest("ValueError", "got 'ab'")
+
+def test_invalid_pattern_rejects_rule_set(rules_file):
+    kb = KnowledgeBase([str(rules_file)])
+    with pytest.raises(ValueError):
+        kb.add_rule(Rule("KeyError", "never", pattern="(unclosed"))
+    rules_file.write_text(json.dumps({"rules": [
+        {"type": "KeyError", "pattern": "(unclosed", "suggestion": "never"}]}), encoding="utf-8")
+    with pytest.raises(ValueError):
+        kb.reload()
+    assert len(kb) == 3
+    assert kb.suggest("KeyError", "'id'") == "id advice"
+
+def test_debugger_uses_knowledge_base(rules_file):
+    debugger = Debugger(KnowledgeBase([str(rules_file)]))
+    analysis = debugger.analyze({'success': False, 'error': "KeyError: 'id'"})
+    assert analysis["suggestion"] == "id advice"
+    assert analysis["severity"] == "High"
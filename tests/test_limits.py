@@ -0,0 +1,76 @@
+import threading
+import time
+from types import SimpleNamespace
+import pytest
+from src.execution_engine import ExecutionEngine
+from src.limits import Deadline, WallTimeExceeded
+
+@pytest.fixture
+def engine():
+    return ExecutionEngine(timeout=0.2)
+
+def test_infinite_loop_is_interrupted(engine):
+    start = time.monotonic()
+    result = engine.execute_code("while True: pass")
+    assert result['success'] is False
+    assert result['error'].startswith("TimeoutError")
+    assert time.monotonic() - start < 0.2 + 0.5
+
+def test_swallowed_interrupt_is_rearmed(engine):
+    code = "while True:\n    try:\n        pass\n    except BaseException:\n        pass"
+    result = engine.execute_code(code)
+    assert result['error'].startswith("TimeoutError")
+
+def test_interrupt_from_worker_thread(engine):
+    results = []
+    thread = threading.Thread(target=lambda: results.append(engine.execute_code("while True: pass")))
+    thread.start()
+    thread.join(timeout=2)
+    assert not thread.is_alive()
+    assert results[0]['error'].startswith("TimeoutError")
+
+def test_cpu_time_limit():
+    engine = ExecutionEngine(timeout=5, cpu_time_limit=0.1)
+    result = engine.execute_code("while True: pass")
+    assert "CPU time limit" in result['error']
+
+def test_deadline_disarmed_after_exit():
+    with Deadline(wall_time=0.05):
+        pass
+    time.sleep(0.1)  # aucune interruption tardive
+
+def test_deadline_raises_wall_time():
+    with pytest.raises(WallTimeExceeded):
+        with Deadline(wall_time=0.05):
+            time.sleep(1)
+
+def test_pool_kills_unresponsive_worker():
+    from src.worker_pool import WorkerPool
+    with WorkerPool(lambda s: time.sleep(s), size=1) as pool:
+        result = pool.submit(5, timeout=0.2)
+        assert result['error'].startswith("TimeoutError")
+        assert pool.stats()['restarts'] == 1
+        assert pool.submit(0, timeout=1) is None
+
+def test_allocation_bomb_fails_fast_in_pool():
+    with ExecutionEngine(backend='pool', workers=1, max_memory_mb=50) as engine:
+        result = engine.execute_code("x = bytearray(10 * 1024 ** 3)")
+        assert result['success'] is False
+        assert result['error'].startswith("MemoryError")
+        assert engine.pool.stats()['restarts'] == 1
+        ok = engine.execute_code("x = bytearray(20 * 1024 ** 2)")
+        assert ok['success'] is True
+        assert ok['peak_memory_mb'] >= 20
+
+def test_late_signal_during_exit_leaves_no_timer():
+    import signal
+    previous = signal.getsignal(signal.SIGALRM)
+    with Deadline(wall_time=5) as deadline:
+        # Échéance tombée pendant le désarmement : ignorée
+        exit_frame = SimpleNamespace(f_code=Deadline.__exit__.__code__)
+        assert deadline._on_signal(signal.SIGALRM, exit_frame) is None
+    engine = ExecutionEngine(timeout=0.05)
+    for _ in range(20):
+        engine.execute_code("sorted(range(3 * 10 ** 5))")
+    assert signal.getitimer(signal.ITIMER_REAL) == (0.0, 0.0)
+    assert signal.getsignal(signal.SIGALRM) is previous
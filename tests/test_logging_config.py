@@ -0,0 +1,58 @@
+import json
+import sys
+import pytest
+from loguru import logger
+from src.debugger import Debugger
+from src.logging_config import configure_logging, flush_logging, shutdown_logging
+
+@pytest.fixture
+def log_path(tmp_path):
+    yield tmp_path / "logs" / "platform.log"
+    shutdown_logging()
+    logger.add(sys.stderr)
+
+def read_records(path):
+    flush_logging()
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+def test_debugger_import_adds_no_sink():
+    import importlib
+    import src.debugger
+    before = len(logger._core.handlers)
+    importlib.reload(src.debugger)
+    assert len(logger._core.handlers) == before
+
+def test_queued_json_records(log_path):
+    configure_logging(path=str(log_path))
+    Debugger().analyze({'success': False, 'error': 'NameError: x (line 2)'})
+    records = read_records(log_path)
+    assert records[-1]["level"] == "ERROR"
+    assert records[-1]["name"] == "src.debugger"
+    assert "NameError" in records[-1]["message"]
+
+def test_configure_is_idempotent(log_path):
+    first = configure_logging(path=str(log_path))
+    handlers = len(logger._core.handlers)
+    second = configure_logging(path=str(log_path))
+    assert len(first) == len(second) == 1
+    assert len(logger._core.handlers) == handlers
+    logger.info("une seule fois")
+    assert [r["message"] for r in read_records(log_path)].count("une seule fois") == 1
+
+def test_per_module_levels(log_path):
+    configure_logging(path=str(log_path), level="WARNING", levels={"src.debugger": "INFO"})
+    Debugger().analyze({'success': True})
+    logger.info("ignoré")
+    messages = [r["message"] for r in read_records(log_path)]
+    assert "Exécution réussie." in messages
+    assert "ignoré" not in messages
+
+def test_rotation_keeps_limited_archives(log_path):
+    configure_logging(path=str(log_path), rotation=2_000, retention=2)
+    for i in range(200):
+        logger.info(f"message {i}")
+        if i % 20 == 0:
+            flush_logging()
+    flush_logging()
+    archives = list(log_path.parent.glob("platform.log.*"))
+    assert 1 <= len(archives) <= 2
@@ -0,0 +1,51 @@
+import tracemalloc
+from src.debugger import Debugger
+from src.execution_engine import ExecutionEngine
+from src.profiler import diagnose
+
+HOT_LOOP = "total = 0\nfor i in range(200000):\n    total += i * i\nprint(total)\n"
+
+def test_profile_is_off_by_default():
+    engine = ExecutionEngine()
+    result = engine.execute_code("print(1)")
+    assert result.profile is None
+    assert result['profile'] is None
+    assert not tracemalloc.is_tracing()
+
+def test_profile_reports_cpu_allocations_and_hot_lines():
+    engine = ExecutionEngine()
+    result = engine.execute_code(HOT_LOOP + "data = [str(i) for i in range(20000)]\n", profile=True)
+    profile = result.profile
+    assert result.success
+    assert 0 < profile['cpu_time'] <= profile['wall_time'] * 1.1
+    assert profile['peak_allocated_mb'] > 0.5
+    assert profile['samples'] > 0
+    assert profile['hot_lines'][0]['line'] == 3
+    assert not tracemalloc.is_tracing()
+
+def test_profiled_timeout_points_at_the_loop():
+    engine = ExecutionEngine()
+    code = "n = 0\nwhile True:\n    n += 1\n"
+    result = engine.execute_code(code, timeout=0.3, profile=True)
+    assert result.error.startswith("TimeoutError")
+    assert result.profile['hot_lines'][0]['line'] in (2, 3)
+    analysis = Debugger().analyze(result, code)
+    assert analysis['performance']['hot_lines'][0]['source']
+    assert "Lignes chaudes" in Debugger().format_report(analysis)
+
+def test_profiled_runs_bypass_result_cache():
+    engine = ExecutionEngine(result_cache_size=16)
+    engine.execute_code("print(2)")
+    result = engine.execute_code("print(2)", profile=True)
+    assert not result.cached and result.profile is not None
+
+def test_diagnose_flags_waiting_and_large_allocations():
+    findings = diagnose({'wall_time': 1.0, 'cpu_time': 0.1, 'peak_allocated_mb': 120.0,
+                         'hot_lines': [{'line': 4, 'samples': 3, 'share': 0.3}]})
+    assert len(findings) == 2
+    assert "attend" in findings[0] and "120.0" in findings[1]
+
+def test_pool_worker_profiles():
+    with ExecutionEngine(backend='pool', workers=1) as engine:
+        result = engine.execute_code(HOT_LOOP, profile=True)
+    assert result.success and result.profile['hot_lines']
@@ -0,0 +1,56 @@
+import time
+from src.execution_engine import ExecutionEngine
+from src.execution_result import ExecutionResult
+from src.result_cache import ResultCache, is_pure
+from src.sandbox import SandboxPolicy
+
+def test_purity_check():
+    assert is_pure("x = [i * i for i in range(10)]\nprint(sum(x))")
+    assert is_pure("name = input()\nprint(name.upper())")
+    assert not is_pure("import random\nprint(random.random())")
+    assert not is_pure("print(id([]))")
+    assert not is_pure("print(().__class__.__subclasses__())")
+    assert not is_pure("if True print(1)")
+    assert not is_pure("print(getattr((), '__class__'))")
+    assert not is_pure("setattr(obj, '__dict__', {})")
+    assert is_pure("print(getattr('abc', 'upper')())")
+
+def test_engine_memoizes_pure_submissions():
+    engine = ExecutionEngine(result_cache_size=16)
+    first = engine.execute_code("print(sum(range(100)))")
+    second = engine.execute_code("print(sum(range(100)))")
+    assert not first.cached and second.cached
+    assert second.output == first.output == "4950\n"
+    assert engine.execute_code("print(input())", user_input="a").output == "a\n"
+    assert engine.execute_code("print(input())", user_input="b").output == "b\n"
+    stats = engine.get_stats()
+    assert stats['total_executions'] == 4
+    assert stats['result_cache']['hits'] == 1
+    assert stats['result_cache']['hit_rate'] == 0.25
+
+def test_impure_and_resource_failures_are_not_cached():
+    engine = ExecutionEngine(timeout=0.2, result_cache_size=16)
+    assert not engine.execute_code("print(id(1))").cached
+    assert not engine.execute_code("print(id(1))").cached
+    for _ in range(2):
+        result = engine.execute_code("while True:\n    pass")
+        assert result.error.startswith("TimeoutError") and not result.cached
+    engine.execute_code("1 / 0")
+    assert engine.execute_code("1 / 0").cached
+
+def test_object_addresses_are_not_cached():
+    engine = ExecutionEngine(result_cache_size=16)
+    for code in ("print(object())", "class Point:\n    pass\nprint(Point())"):
+        assert "at 0x" in engine.execute_code(code).output
+        assert not engine.execute_code(code).cached
+
+def test_ttl_and_policy_in_key():
+    cache = ResultCache(maxsize=2, ttl=0.05)
+    cache.put(("h", "", "p1"), ExecutionResult(success=True, output="x"))
+    assert cache.get(("h", "", "p1")).cached
+    assert cache.get(("h", "", "p2")) is None
+    time.sleep(0.06)
+    assert cache.get(("h", "", "p1")) is None
+    assert cache.stats()['expired'] == 1
+    strict = ExecutionEngine(result_cache_size=16, sandbox_policy=SandboxPolicy(allow=['print']))
+    assert strict.execute_code("print(len('ab'))").error.startswith("SecurityError")
@@ -0,0 +1,30 @@
+import pytest
+from src.execution_engine import ExecutionEngine
+from src.sandbox import DEFAULT_POLICY, SandboxPolicy
+
+def test_default_policy_denies_dangerous_builtins():
+    view = DEFAULT_POLICY.builtins_view()
+    assert 'open' not in view and '__import__' not in view
+    assert 'print' in view
+    assert DEFAULT_POLICY.is_denied('open')
+
+def test_each_run_gets_isolated_copy():
+    engine = ExecutionEngine()
+    engine.execute_code("__builtins__['len'] = None")
+    result = engine.execute_code("print(len([1, 2]))")
+    assert "2" in result['output']
+
+def test_allow_list_policy():
+    engine = ExecutionEngine(sandbox_policy=SandboxPolicy(allow=['print']))
+    assert engine.execute_code("print('ok')")['success'] is True
+    result = engine.execute_code("print(len([]))")
+    assert result['error'].startswith("SecurityError")
+    assert engine.execute_code("class A: pass")['success'] is True
+
+def test_deny_list_policy():
+    engine = ExecutionEngine(sandbox_policy=SandboxPolicy(deny=['eval']))
+    assert "SecurityError" in engine.execute_code("eval('1')")['error']
+
+def test_allow_and_deny_are_exclusive():
+    with pytest.raises(ValueError):
+        SandboxPolicy(allow=['print'], deny=['open'])
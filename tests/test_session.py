@@ -0,0 +1,59 @@
+import pytest
+from src.execution_engine import ExecutionEngine
+from src.session import NamespaceSnapshot, touched_names
+
+@pytest.fixture
+def session():
+    return ExecutionEngine(timeout=2).create_session()
+
+def test_namespace_persists_between_cells(session):
+    assert session.run("class Point:\n    def __init__(self, x):\n        self.x = x\np = Point(3)").success
+    result = session.run("print(p.x * 2)")
+    assert result.output == "6\n"
+    assert set(session.variables()) == {"Point", "p"}
+    assert session.run("f = open('x')").error.startswith("SecurityError")
+
+def test_failed_cell_is_rolled_back(session):
+    session.run("data = [1, 2]\nalias = data\nclass Acc:\n    def add(self, v):\n        data.append(v)\nacc = Acc()")
+    result = session.run("acc.add(3)\nnew_name = 1\nraise ValueError('boom')")
+    assert not result.success
+    assert session.namespace["data"] == [1, 2]
+    assert session.namespace["alias"] is session.namespace["data"]
+    assert "new_name" not in session.namespace
+    assert session.stats()["rollbacks"] == 1
+
+def test_snapshot_restore_is_reusable(session):
+    session.run("items = {'a': [1]}")
+    snapshot = session.snapshot()
+    session.run("items['a'].append(2)\nitems['b'] = []")
+    session.restore(snapshot)
+    assert session.namespace["items"] == {'a': [1]}
+    session.run("items.clear()")
+    session.restore(snapshot)
+    assert session.namespace["items"] == {'a': [1]}
+
+def test_rollback_follows_functions_stored_in_containers(session):
+    assert session.run("counter = 0\ndef inc():\n    global counter\n    counter += 1\nfs = [inc]\nhandlers = {'k': (inc,)}")
+    assert session.run("fs[0]()\nhandlers['k'][0]()\n1/0").error.startswith("ZeroDivisionError")
+    assert session.namespace["counter"] == 0
+    assert session.run("class Box:\n    pass\nbox = Box()\nbox.cb = inc").success
+    assert session.run("box.cb()\n1/0").error.startswith("ZeroDivisionError")
+    assert session.namespace["counter"] == 0
+
+def test_touched_names_limits_rollback_copy():
+    namespace = {"big": list(range(10)), "n": 0, "helper": None}
+    exec("def helper():\n    return big\n", namespace)
+    assert touched_names(compile("n += 1", "<string>", "exec"), namespace) == {"n"}
+    assert "big" in touched_names(compile("helper()", "<string>", "exec"), namespace)
+    assert touched_names(compile("globals()['n'] = 2", "<string>", "exec"), namespace) is None
+    snapshot = NamespaceSnapshot(namespace, {"n"})
+    assert snapshot.names() == {"n"}
+
+def test_sessions_are_isolated_and_feed_history():
+    engine = ExecutionEngine()
+    first, second = engine.create_session("a"), engine.create_session("b")
+    first.run("x = 1")
+    assert not second.run("print(x)").success
+    assert second.run("print(input())", user_input="hello").output == "hello\n"
+    assert "input" not in second.namespace
+    assert engine.get_stats()["total_executions"] == 3
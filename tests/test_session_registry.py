@@ -0,0 +1,73 @@
+import time
+import pytest
+from src.execution_engine import ExecutionEngine
+from src.session_registry import HashRing, SessionRegistry
+
+@pytest.fixture
+def registry(tmp_path):
+    registry = SessionRegistry(shards=2, directory=str(tmp_path))
+    yield registry
+    registry.close()
+
+def test_hash_ring_is_balanced_and_stable():
+    ring = HashRing(range(4))
+    keys = [f"session-{i}" for i in range(4000)]
+    before = {key: ring.node_for(key) for key in keys}
+    counts = [list(before.values()).count(node) for node in range(4)]
+    assert min(counts) > 500
+    ring.add(4)
+    moved = sum(ring.node_for(key) != before[key] for key in keys)
+    assert moved < len(keys) * 0.35
+    assert all(ring.node_for(key) == 4 for key in keys if ring.node_for(key) != before[key])
+
+def test_calls_are_routed_to_one_shard(registry):
+    session = registry.session("tp-1")
+    session.register_collaborator("Alice")
+    session.log_correction("Alice", "NameError", "x défini")
+    session.insert_code("Alice", 0, "print(6 * 7)")
+    assert session.get_session_summary()["total_fixes"] == 1
+    assert registry.run_code("tp-1", ExecutionEngine()).output == "42\n"
+    shards = registry.stats()["shards"]
+    assert sorted(shard["calls"] for shard in shards) == [0, 5]
+    with pytest.raises(ValueError):
+        registry.call("../bad", "register_collaborator", "Eve")
+    with pytest.raises(AttributeError):
+        session.run_forever()
+
+def test_idle_sessions_are_evicted_and_rehydrated(tmp_path):
+    with SessionRegistry(shards=2, directory=str(tmp_path), idle_timeout=0, evict_interval=0) as registry:
+        for i in range(10):
+            registry.session(f"s{i}").log_correction("Bob", "TypeError", str(i))
+        assert registry.evict_idle() > 0
+        assert registry.stats()["sessions"] == 0
+        summary = registry.session("s3").get_session_summary()
+        assert summary["fixes"][0]["description"] == "3"
+        assert sum(shard["rehydrated"] for shard in registry.stats()["shards"]) == 1
+
+def test_idle_sessions_are_evicted_without_further_calls(tmp_path):
+    with SessionRegistry(shards=2, directory=str(tmp_path), idle_timeout=0.2,
+                         evict_interval=0.1) as registry:
+        for i in range(6):
+            registry.session(f"quiet-{i}").register_collaborator("Dan")
+        deadline = time.monotonic() + 5
+        while registry.stats()["sessions"] and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert registry.stats()["sessions"] == 0
+        assert registry.session("quiet-2").get_session_summary()["total_collaborators"] == 1
+
+def test_add_shard_moves_sessions_without_losing_state(registry):
+    ids = [f"room-{i}" for i in range(40)]
+    for session_id in ids:
+        registry.session(session_id).register_collaborator(session_id)
+    owners = {session_id: registry.shard_for(session_id) for session_id in ids}
+    moved = registry.add_shard()
+    assert moved == sum(registry.shard_for(s) != owners[s] for s in ids) > 0
+    for session_id in ids:
+        assert registry.session(session_id).get_session_summary()["total_collaborators"] == 1
+    assert len(registry.stats()["shards"]) == 3
+
+def test_state_survives_registry_restart(tmp_path):
+    with SessionRegistry(shards=2, directory=str(tmp_path)) as registry:
+        registry.session("persist").log_correction("Carol", "SyntaxError", "deux-points")
+    with SessionRegistry(shards=3, directory=str(tmp_path)) as registry:
+        assert registry.session("persist").get_session_summary(include_fixes=False)["fixes_by_user"] == {"Carol": 1}
@@ -0,0 +1,31 @@
+from src.source_context import LineIndex, SourceContext, format_context
+
+def test_line_index():
+    index = LineIndex("a = 1\r\nb = 2\n\nc = 3\n")
+    assert len(index) == 4
+    assert [index.line(n) for n in range(1, 5)] == ["a = 1", "b = 2", "", "c = 3"]
+    assert index.line(0) is None and index.line(5) is None
+    assert LineIndex("").line(1) == ""
+
+def test_extract_context_and_caret():
+    code = "x = 1\ny = 2\nz = x / (y - 2)\nprint(z)\n"
+    context = SourceContext(context_lines=1).extract(code, 3, colno=4, end_colno=15)
+    assert context["source"] == "z = x / (y - 2)"
+    assert context["context"] == [(2, "y = 2"), (3, "z = x / (y - 2)"), (4, "print(z)")]
+    assert context["caret"] == "    " + "^" * 11
+    lines = format_context(context)
+    assert lines[1].startswith("> 3 |") and lines[2].endswith("^" * 11)
+
+def test_caret_uses_byte_offsets():
+    source = "é = f(ç)"
+    # 'f(ç)' commence à l'octet 5 et finit à l'octet 10 en UTF-8
+    context = SourceContext().extract(source, 1, colno=5, end_colno=10)
+    assert context["caret"] == "    ^^^^"
+
+def test_index_is_cached_per_submission():
+    contexts = SourceContext()
+    code = "".join(f"line_{i} = {i}\n" for i in range(10_000))
+    assert contexts.extract(code, 9_999)["source"] == "line_9998 = 9998"
+    assert contexts.extract(code, 10_000)["context"][-1] == (10_000, "line_9999 = 9999")
+    assert contexts.stats() == {'size': 1, 'hits': 1, 'misses': 1}
+    assert contexts.extract(code, 10_001) is None
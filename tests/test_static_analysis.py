@@ -0,0 +1,82 @@
+import time
+import pytest
+from src.execution_engine import ExecutionEngine
+from src.sandbox import SandboxPolicy
+from src.static_analysis import StaticAnalyzer
+
+@pytest.fixture
+def analyzer():
+    return StaticAnalyzer()
+
+def test_detects_forbidden_calls_imports_and_undefined_names(analyzer):
+    code = "import os\ndata = open('f.txt')\nprint(totl)\n"
+    issues = analyzer.analyze(code).issues
+    assert [(i.kind, i.name, i.lineno) for i in issues] == [
+        ('import', 'os', 1), ('forbidden', 'open', 2), ('undefined', 'totl', 3)]
+    assert (issues[1].col_offset, issues[1].end_col_offset) == (7, 11)
+
+def test_valid_code_is_not_flagged(analyzer):
+    code = (
+        "def f(x, *args, k=1, **kw):\n    return g(x) + helper\n"
+        "def g(y):\n    return [i for i in range(y)]\n"
+        "helper = 2\n"
+        "try:\n    f(1)\nexcept Exception as err:\n    print(err, __name__)\n"
+        "class A:\n    pass\n"
+        "match [1, 2]:\n    case [a, *rest]:\n        print(a, rest, (n := 3), n)\n"
+    )
+    assert analyzer.analyze(code).ok
+    assert analyzer.analyze("if True print(1)").ok  # erreurs de syntaxe laissées à l'exécution
+
+def test_guarded_and_conditional_code_is_not_rejected(analyzer):
+    guarded = (
+        "try:\n    import numpy as np\nexcept ImportError:\n    np = None\n"
+        "try:\n    open('x')\nexcept NameError:\n    pass\n"
+        "try:\n    print(totl)\nexcept (ValueError, Exception):\n    pass\n"
+    )
+    assert analyzer.analyze(guarded).issues == ()
+    report = analyzer.analyze("try:\n    open('x')\nexcept ValueError:\n    pass\n")
+    assert [(i.kind, i.warning) for i in report.issues] == [('forbidden', False)]
+    report = analyzer.analyze("if False:\n    open('x')\ndef f():\n    import os\nprint(1)\n")
+    assert report.ok
+    assert [(i.kind, i.lineno) for i in report.warnings] == [('forbidden', 2), ('import', 4)]
+
+def test_preflight_accepts_code_that_runs_without_it():
+    engine = ExecutionEngine(preflight=True)
+    programs = {
+        'try:\n    1/0\n    open("x")\nexcept ZeroDivisionError:\n    print("ok")': "ok\n",
+        'exec("y = 1")\nprint(y)': "1\n",
+        'globals()["z"] = 3\nprint(z)': "3\n",
+    }
+    for code, output in programs.items():
+        result = engine.execute_code(code)
+        assert result.success and result.output == output, code
+        assert all(issue['warning'] for issue in result.preflight)
+
+def test_engine_runs_code_with_warnings_only():
+    engine = ExecutionEngine(preflight=True)
+    result = engine.execute_code("if False:\n    open('x')\nprint('ok')")
+    assert result.success and result.output == "ok\n"
+    assert result.preflight[0]['warning'] is True
+
+def test_policy_controls_what_is_forbidden():
+    report = StaticAnalyzer(SandboxPolicy(allow=['print', '__import__'])).analyze("import math\nprint(len([]))")
+    assert [(i.kind, i.name) for i in report.issues] == [('forbidden', 'len')]
+
+def test_engine_short_circuits_with_structured_result():
+    engine = ExecutionEngine(preflight=True)
+    result = engine.execute_code("print('avant')\nf = open('x')")
+    assert not result.success and result.output == ""
+    assert result.error == "SecurityError: Restricted function call: name 'open' is not defined"
+    assert result.exception.type == "SecurityError" and result.exception.lineno == 2
+    assert result.preflight[0]['kind'] == 'forbidden'
+    assert engine.execute_code("print('ok')").output == "ok\n"
+    stats = engine.get_stats()
+    assert stats['total_executions'] == 2 and stats['preflight_cache']['misses'] == 2
+
+def test_analysis_is_fast_for_student_sized_code(analyzer):
+    code = "\n".join(f"def f{i}(notes):\n    total = 0\n    for n in notes:\n        total += n\n"
+                     f"    return total / len(notes)\n" for i in range(10)) + "print(f0([1, 2]))\n"
+    start = time.perf_counter()
+    for i in range(20):
+        analyzer._analyze(code)
+    assert (time.perf_counter() - start) / 20 < 0.005
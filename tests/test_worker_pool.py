@@ -0,0 +1,39 @@
+import os
+import pytest
+from src.execution_engine import ExecutionEngine
+from src.worker_pool import WorkerPool
+
+@pytest.fixture
+def engine():
+    engine = ExecutionEngine(timeout=2, backend='pool', workers=2)
+    yield engine
+    engine.close()
+
+def test_pool_execution_matches_inprocess(engine):
+    result = engine.execute_code("print(6 * 7)")
+    assert result['success'] is True
+    assert "42" in result['output']
+    assert set(result) == set(ExecutionEngine().execute_code("pass"))
+
+def test_pool_runtime_error(engine):
+    result = engine.execute_code("1 / 0")
+    assert result['success'] is False
+    assert "ZeroDivisionError" in result['error']
+
+def test_crashed_worker_is_replaced(engine):
+    victim = engine.pool._workers[0]
+    os.kill(victim.process.pid, 9)
+    victim.process.join()
+    results = [engine.execute_code("print('ok')") for _ in range(3)]
+    assert engine.pool.stats()['workers'] == 2
+    assert engine.pool.stats()['restarts'] == 1
+    assert "WorkerCrashedError" in results[0]['error']
+    assert all(r['success'] for r in results[1:])
+
+def test_map_preserves_order():
+    with WorkerPool(lambda x: x * 2, size=2) as pool:
+        assert pool.map([(i,) for i in range(6)]) == [0, 2, 4, 6, 8, 10]
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        ExecutionEngine(backend='gpu')